@@ -2,23 +2,33 @@
 Enhanced Flask Backend Server for NASA Meteor Mastery
 Features: Authentication, Validation, Caching, Monitoring, and Microservices Architecture
 """
+# eventlet must patch the stdlib before anything else imports socket/threading;
+# EVENTLET_NO_MONKEY_PATCH=1 imports the app unpatched (e.g. under a test runner)
 import os
-import json
+import eventlet
+if os.getenv('EVENTLET_NO_MONKEY_PATCH') != '1':
+    eventlet.monkey_patch()
+
+import re
 import logging
+import math
+import msgspec
+import orjson
 import redis
-from datetime import datetime, timedelta
+import threading
+import time
+import types
+from datetime import date, datetime, timedelta, timezone
 from functools import wraps
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, request, make_response, g
 from flask_cors import CORS
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask_jwt_extended import (
-    JWTManager, create_access_token, jwt_required, get_jwt_identity
+    JWTManager, create_access_token, get_jwt, get_jwt_identity, verify_jwt_in_request
 )
 from flask_socketio import SocketIO
-from werkzeug.security import generate_password_hash, check_password_hash
+import bcrypt
 from dotenv import load_dotenv
 
 # Import WebSocket service
@@ -31,62 +41,255 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Environment-derived settings, read once at import
+CFG = types.SimpleNamespace(
+    secret_key=os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production'),
+    jwt_secret_key=os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-me'),
+    cors_origins=tuple(os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')),
+    redis_url=os.getenv('REDIS_URL', 'redis://localhost:6379'),
+    port=int(os.getenv('PORT', 5000)),
+    debug=os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+)
+
 # Initialize Flask application
 app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-me')
+app.config['SECRET_KEY'] = CFG.secret_key
+app.config['JWT_SECRET_KEY'] = CFG.jwt_secret_key
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
 
 # Enable CORS
-CORS(app, origins=os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(','))
+CORS(app, origins=list(CFG.cors_origins))
+
+class OrjsonSocketCodec:
+    """json-module shim so Socket.IO packets are encoded with orjson"""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs) -> str:
+        # Socket.IO concatenates packets as text, so hand back str; stdlib kwargs are ignored
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
 
 # Initialize SocketIO with CORS support
 socketio = SocketIO(
     app,
-    cors_allowed_origins=os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(','),
-    async_mode='threading',
-    logger=True,
-    engineio_logger=True
+    cors_allowed_origins=list(CFG.cors_origins),
+    async_mode='eventlet',
+    logger=False,
+    engineio_logger=False,
+    json=OrjsonSocketCodec
 )
 
-# Rate limiting
-limiter = Limiter(
-    get_remote_address,
-    app=app,
-    default_limits=["200 per day", "50 per hour"],
-    storage_uri=os.getenv('REDIS_URL', 'redis://localhost:6379')
-)
+# Global token bucket: bursts of up to 50 requests, refilled at 200 per day
+RATE_LIMIT_CAPACITY = 50
+RATE_LIMIT_REFILL_PER_SEC = 200 / 86400
 
 # JWT Manager
 jwt = JWTManager(app)
 
 # Redis connection
 redis_client = redis.Redis.from_url(
-    os.getenv('REDIS_URL', 'redis://localhost:6379'),
-    decode_responses=True
+    CFG.redis_url,
+    decode_responses=False  # orjson consumes raw bytes directly
 )
 
+# YYYY-MM-DD shape pre-filter; is_iso_date confirms the day exists in that month
+DATE_RE = re.compile(r'\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])')
+
+def is_iso_date(value: str) -> bool:
+    """True for a real calendar date in YYYY-MM-DD form (rejects e.g. 2023-02-30)"""
+    if not DATE_RE.fullmatch(value):
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+# Mock API payloads, built once at import and shared read-only across requests
+MOCK_NEO_FEED = {
+    "element_count": 12,
+    "status": "success",
+    "data_source": "mock_api",
+    "near_earth_objects": {
+        "2023-12-15": [
+            {
+                "id": "1234567",
+                "name": "(2023 XY)",
+                "estimated_diameter": {
+                    "meters": {"estimated_diameter_min": 50, "estimated_diameter_max": 120}
+                },
+                "is_potentially_hazardous_asteroid": True,
+                "close_approach_data": [
+                    {
+                        "close_approach_date": "2023-12-15",
+                        "relative_velocity": {"kilometers_per_second": "17.5"},
+                        "miss_distance": {"kilometers": "4500000"}
+                    }
+                ]
+            }
+        ]
+    }
+}
+
+NEO_FEED_FALLBACK = {
+    "element_count": 0,
+    "status": "fallback",
+    "message": "Using cached fallback data due to API unavailability",
+    "near_earth_objects": {}
+}
+
+MOCK_ASTEROID_TEMPLATE = {
+    "estimated_diameter": {
+        "meters": {"estimated_diameter_min": 30, "estimated_diameter_max": 80}
+    },
+    "is_potentially_hazardous_asteroid": False,
+    "orbital_data": {
+        "orbit_class": {"orbit_class_type": "Apollo"}
+    },
+    "close_approach_data": [
+        {
+            "close_approach_date": "2023-12-20",
+            "relative_velocity": {"kilometers_per_second": "12.3"},
+            "miss_distance": {"kilometers": "7800000"}
+        }
+    ]
+}
+
+MOCK_EARTHQUAKES = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {
+                "mag": 6.2,
+                "place": "150km SSE of Homer, Alaska",
+                "time": 1702600000000,
+                "tsunami": 0
+            },
+            "geometry": {
+                "type": "Point",
+                "coordinates": [-150.123, 58.456]
+            }
+        }
+    ]
+}
+
+# Invariant payloads pre-serialized so cache misses skip JSON encoding entirely
+MOCK_NEO_FEED_BYTES = orjson.dumps(MOCK_NEO_FEED)
+MOCK_EARTHQUAKES_BYTES = orjson.dumps(MOCK_EARTHQUAKES)
+
+# Impact simulation constants
+SPHERE_VOLUME_COEFF = (4 / 3) * math.pi
+KMS_SQUARED_TO_MS_SQUARED = 1e6  # (km/s)^2 -> (m/s)^2
+JOULES_PER_MEGATON_TNT = 4.184e15
+
+# Most recent successful NEO feed, served when the upstream fetch fails
+NEO_FEED_LAST_GOOD_KEY = "neo:feed:last_good"
+
+# Atomic GET-or-lock: returns the cached value, nil if the caller won the fill lock, or WAIT
+CACHE_GET_OR_LOCK = redis_client.register_script("""
+local v = redis.call('GET', KEYS[1])
+if v then return v end
+if not redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[1]) then return 'WAIT' end
+return nil
+""")
+CACHE_FILL_LOCK_TTL = 5  # seconds
+CACHE_FILL_WAIT = 0.005  # seconds between retries while another worker fills
+CACHE_FILL_RETRIES = 20
+
+# Sliding-window log: trims expired hits, admits if under limit, returns remaining quota (-1 = denied)
+SLIDING_WINDOW = redis_client.register_script("""
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then return -1 end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(window))
+return limit - count - 1
+""")
+
+# Token bucket stored as a hash {tokens, ts}; refill is computed lazily on access
+TOKEN_BUCKET = redis_client.register_script("""
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+return allowed
+""")
+
 # Initialize real-time data streamer
 data_streamer = RealTimeDataStreamer(socketio)
 setup_websocket_handlers(socketio, data_streamer)
 
 # Mock user database (replace with real database in production)
-users = {
-    "admin": {
-        "password": generate_password_hash(os.getenv('ADMIN_PASSWORD', 'admin123')),
-        "role": "admin"
-    },
-    "user": {
-        "password": generate_password_hash(os.getenv('USER_PASSWORD', 'user123')),
-        "role": "user"
-    }
+
+# bcrypt only reads the first 72 bytes of a password; longer ones are rejected, not truncated
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# bcrypt hashes of the built-in accounts' default passwords (admin123, user123),
+# precomputed so seeding does no hashing at import
+DEFAULT_PASSWORD_HASHES = {
+    'ADMIN': b'$2b$12$Qp0Th/OpVBfIbI0d3MYCY.0oDI.gZIIW505cDfoLxdi3XBanzGoha',
+    'USER': b'$2b$12$GLS9tUyfs.97RTnlayR7q.FfudD8CpmoSAhy2s.1jfkKkoii2n2aK'
 }
 
+def _seed_password_hash(prefix: str) -> bytes:
+    """Password hash for a built-in account: a pre-baked bcrypt hash from env if present,
+    else the env password hashed, else the precomputed default"""
+    hashed = os.getenv(f'{prefix}_PASSWORD_HASH')
+    if hashed:
+        return hashed.encode()
+    password = os.getenv(f'{prefix}_PASSWORD')
+    if password:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
+    return DEFAULT_PASSWORD_HASHES[prefix]
+
+# Parallel username-keyed stores; writes happen under _users_lock
+_PWHASH: Dict[str, bytes] = {}
+_ROLES: Dict[str, str] = {}
+_EMAILS: Dict[str, str] = {}
+_users_lock = threading.Lock()
+
+def _seed_users():
+    """Populate the user store with the built-in accounts"""
+    seeded = (('admin', 'ADMIN', 'admin'), ('user', 'USER', 'user'))
+    for username, prefix, role in seeded:
+        pw_hash = _seed_password_hash(prefix)
+        with _users_lock:
+            _PWHASH.setdefault(username, pw_hash)
+            _ROLES.setdefault(username, role)
+
+# Seed once at startup; only a plain *_PASSWORD from the environment costs a bcrypt hash here
+_seed_users()
+
 # Utility functions
+def to_json_bytes(data: Any) -> bytes:
+    """Serialize data with orjson, passing pre-serialized bytes through untouched"""
+    return data if isinstance(data, bytes) else orjson.dumps(data)
+
 def cache_response(key: str, data: Any, ttl: int = 300):
-    """Cache API response"""
+    """Cache API response and release its fill lock"""
     try:
-        redis_client.setex(key, ttl, json.dumps(data))
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, to_json_bytes(data))
+            pipe.delete(f"lock:{key}")
+            pipe.execute()
     except Exception as e:
         logger.error(f"Cache error: {e}")
 
@@ -94,285 +297,386 @@ def get_cached_response(key: str) -> Optional[Any]:
     """Get cached API response"""
     try:
         cached = redis_client.get(key)
-        return json.loads(cached) if cached else None
+        return orjson.loads(cached) if cached else None
     except Exception as e:
         logger.error(f"Cache retrieval error: {e}")
         return None
 
+def cache_responses(entries: List[Tuple[str, Any, int]]):
+    """Cache several API responses and release their fill locks in a single pipelined round-trip"""
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            for key, data, ttl in entries:
+                pipe.setex(key, ttl, to_json_bytes(data))
+                pipe.delete(f"lock:{key}")
+            pipe.execute()
+    except Exception as e:
+        logger.error(f"Cache error: {e}")
+
+def get_or_lock_cached_response(key: str) -> Optional[Any]:
+    """Get a cached response; on a miss, claim the fill lock so only one worker recomputes.
+
+    Returns None when the caller should compute the value and cache it.
+    """
+    try:
+        for _ in range(CACHE_FILL_RETRIES):
+            cached = CACHE_GET_OR_LOCK(keys=[key, f"lock:{key}"], args=[CACHE_FILL_LOCK_TTL])
+            if cached != b'WAIT':
+                return orjson.loads(cached) if cached else None
+            time.sleep(CACHE_FILL_WAIT)
+    except Exception as e:
+        logger.error(f"Cache retrieval error: {e}")
+    return None
+
+def release_fill_lock(key: str):
+    """Drop a fill lock taken by get_or_lock_cached_response without caching a value"""
+    try:
+        redis_client.delete(f"lock:{key}")
+    except Exception as e:
+        logger.error(f"Cache error: {e}")
+
+_ts_cache = (0, '')
+
+def now_iso() -> str:
+    """UTC ISO-8601 timestamp at second granularity, formatted at most once per second"""
+    global _ts_cache
+    t = int(time.time())
+    cached = _ts_cache
+    if cached[0] == t:
+        return cached[1]
+    stamp = datetime.fromtimestamp(t, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    _ts_cache = (t, stamp)
+    return stamp
+
+def make_json_response(data: Any, status: int = 200):
+    """Build a JSON response serialized with orjson (bytes are sent as-is)"""
+    return app.response_class(to_json_bytes(data), status=status, mimetype='application/json')
+
+def take_token(key: str, capacity: int, rate: float, cost: int = 1) -> bool:
+    """Consume tokens from a Redis token bucket; fails open if Redis is unavailable"""
+    try:
+        return bool(TOKEN_BUCKET(keys=[key], args=[capacity, rate, time.time(), cost]))
+    except Exception as e:
+        logger.error(f"Rate limit error: {e}")
+        return True
+
+@app.before_request
+def enforce_default_rate_limit():
+    """Apply the global token-bucket limit per client address.
+
+    Routes carrying their own sliding_window limit are exempt, so each request
+    is charged against exactly one limiter.
+    """
+    view = app.view_functions.get(request.endpoint)
+    if getattr(view, 'sliding_window_limited', False):
+        return None
+    if not take_token(f"rl:default:{request.remote_addr or '127.0.0.1'}",
+                      RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL_PER_SEC):
+        return make_json_response({"error": "Rate limit exceeded"}, 429)
+
+def _compile_validator(schema: Dict[str, type]):
+    """Generate a straight-line validator for a schema, returning an error message or None"""
+    namespace = {}
+    lines = ["def _validate(d):"]
+    for i, (field, field_type) in enumerate(schema.items()):
+        namespace[f"_t{i}"] = field_type
+        lines.append(f"    if {field!r} not in d: return {f'Missing required field: {field}'!r}")
+        lines.append(f"    if type(d[{field!r}]) is not _t{i}: return {f'Field {field} must be {field_type.__name__}'!r}")
+    lines.append("    return None")
+    exec("\n".join(lines), namespace)
+    return namespace["_validate"]
+
+# Verified tokens: raw Authorization header -> (exp timestamp, identity)
+_jwt_cache: Dict[str, Tuple[float, Any]] = {}
+JWT_CACHE_MAX_ENTRIES = 4096
+
+def cached_jwt_required(f):
+    """jwt_required() that verifies each distinct token once and caches its identity until expiry"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        entry = _jwt_cache.get(auth_header)
+        if entry is not None and entry[0] > time.time():
+            g.jwt_identity = entry[1]
+            return f(*args, **kwargs)
+        
+        verify_jwt_in_request()
+        g.jwt_identity = get_jwt_identity()
+        if len(_jwt_cache) >= JWT_CACHE_MAX_ENTRIES:
+            _jwt_cache.pop(next(iter(_jwt_cache)), None)
+        _jwt_cache[auth_header] = (get_jwt()['exp'], g.jwt_identity)
+        return f(*args, **kwargs)
+    return decorated_function
+
+def sliding_window(limit: int, window: int):
+    """Per-route sliding-window rate limit evaluated in a single Redis script call"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = f"rl:{request.endpoint}:{request.remote_addr or '127.0.0.1'}"
+            now = time.time()
+            try:
+                remaining = SLIDING_WINDOW(keys=[key], args=[now, window, limit, f"{now}:{os.urandom(4).hex()}"])
+            except Exception as e:
+                logger.error(f"Rate limit error: {e}")
+                return f(*args, **kwargs)
+            
+            if remaining < 0:
+                response = make_json_response({"error": "Rate limit exceeded"}, 429)
+                response.headers['X-RateLimit-Remaining'] = '0'
+                return response
+            
+            response = make_response(f(*args, **kwargs))
+            response.headers['X-RateLimit-Remaining'] = str(remaining)
+            return response
+        # Copied onto outer decorators by functools.wraps; read by enforce_default_rate_limit
+        decorated_function.sliding_window_limited = True
+        return decorated_function
+    return decorator
+
 def validate_json(schema: Dict) -> bool:
-    """Validate JSON against schema"""
+    """Validate JSON against schema; the parsed body is stored on g.json_body"""
+    validator = _compile_validator(schema)
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             if not request.is_json:
-                return jsonify({"error": "Request must be JSON"}), 400
+                return make_json_response({"error": "Request must be JSON"}, 400)
+            
+            try:
+                data = orjson.loads(request.get_data())
+            except orjson.JSONDecodeError:
+                return make_json_response({"error": "Malformed JSON body"}, 400)
+            if type(data) is not dict:
+                return make_json_response({"error": "Request body must be a JSON object"}, 400)
             
-            data = request.get_json()
-            for field, field_type in schema.items():
-                if field not in data:
-                    return jsonify({"error": f"Missing required field: {field}"}), 400
-                if not isinstance(data[field], field_type):
-                    return jsonify({"error": f"Field {field} must be {field_type.__name__}"}), 400
+            error = validator(data)
+            if error is not None:
+                return make_json_response({"error": error}, 400)
             
+            g.json_body = data
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+# Request schemas (decoded and type-checked in one pass by msgspec)
+class ImpactRequest(msgspec.Struct):
+    diameter: float
+    density: float
+    velocity: float
+    angle: float
+    latitude: float
+    longitude: float
+
 # Authentication routes
 @app.route('/api/auth/login', methods=['POST'])
 @validate_json({"username": str, "password": str})
 def login():
     """User login endpoint"""
-    data = request.get_json()
+    data = g.json_body
     username = data['username']
-    password = data['password']
+    password = data['password'].encode()
+    if len(password) > BCRYPT_MAX_PASSWORD_BYTES:
+        return make_json_response({"error": f"Password must be at most {BCRYPT_MAX_PASSWORD_BYTES} bytes"}, 400)
     
-    user = users.get(username)
-    if user and check_password_hash(user['password'], password):
+    pw_hash = _PWHASH.get(username)
+    if pw_hash and bcrypt.checkpw(password, pw_hash):
+        role = _ROLES[username]
         access_token = create_access_token(identity={
             'username': username,
-            'role': user['role']
+            'role': role
         })
-        return jsonify({
+        return make_json_response({
             'access_token': access_token,
             'username': username,
-            'role': user['role']
-        }), 200
+            'role': role
+        }, 200)
     
-    return jsonify({"error": "Invalid credentials"}), 401
+    return make_json_response({"error": "Invalid credentials"}, 401)
 
 @app.route('/api/auth/register', methods=['POST'])
 @validate_json({"username": str, "password": str, "email": str})
 def register():
     """User registration endpoint"""
-    data = request.get_json()
+    data = g.json_body
     username = data['username']
+    password = data['password'].encode()
+    if len(password) > BCRYPT_MAX_PASSWORD_BYTES:
+        return make_json_response({"error": f"Password must be at most {BCRYPT_MAX_PASSWORD_BYTES} bytes"}, 400)
     
-    if username in users:
-        return jsonify({"error": "Username already exists"}), 409
+    if username in _PWHASH:
+        return make_json_response({"error": "Username already exists"}, 409)
     
-    users[username] = {
-        "password": generate_password_hash(data['password']),
-        "email": data['email'],
-        "role": "user"
-    }
+    pw_hash = bcrypt.hashpw(password, bcrypt.gensalt())
+    with _users_lock:
+        if username in _PWHASH:
+            return make_json_response({"error": "Username already exists"}, 409)
+        _PWHASH[username] = pw_hash
+        _ROLES[username] = "user"
+        _EMAILS[username] = data['email']
     
-    return jsonify({"message": "User created successfully"}), 201
+    return make_json_response({"message": "User created successfully"}, 201)
 
 # NASA NEO API routes
 @app.route('/api/neo/feed', methods=['GET'])
-@jwt_required()
-@limiter.limit("10 per minute")
-async def neo_feed():
+@cached_jwt_required
+@sliding_window(limit=10, window=60)
+def neo_feed():
     """Get NEO feed with caching"""
-    cache_key = f"neo:feed:{request.args.get('start_date')}:{request.args.get('end_date')}"
+    # Validate date parameters before touching the cache so rejected requests never take the fill lock
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    if start_date and end_date:
+        if not (is_iso_date(start_date) and is_iso_date(end_date)):
+            return make_json_response({
+                "error": "Invalid date format. Use YYYY-MM-DD",
+                "status": "error"
+            }, 400)
+    
+    cache_key = f"neo:feed:{start_date}:{end_date}"
     
     # Check cache first
-    cached = get_cached_response(cache_key)
+    cached = get_or_lock_cached_response(cache_key)
     if cached:
-        return jsonify(cached)
+        return make_json_response(cached)
     
     try:
         # This would integrate with the actual NASA API
         # For now, return mock data with improved error handling
+        mock_data = MOCK_NEO_FEED_BYTES
         
-        # Validate date parameters
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        if start_date and end_date:
-            try:
-                from datetime import datetime
-                datetime.strptime(start_date, '%Y-%m-%d')
-                datetime.strptime(end_date, '%Y-%m-%d')
-            except ValueError:
-                return jsonify({
-                    "error": "Invalid date format. Use YYYY-MM-DD",
-                    "status": "error"
-                }), 400
-        
-        mock_data = {
-            "element_count": 12,
-            "status": "success",
-            "data_source": "mock_api",
-            "near_earth_objects": {
-                "2023-12-15": [
-                    {
-                        "id": "1234567",
-                        "name": "(2023 XY)",
-                        "estimated_diameter": {
-                            "meters": {"estimated_diameter_min": 50, "estimated_diameter_max": 120}
-                        },
-                        "is_potentially_hazardous_asteroid": True,
-                        "close_approach_data": [
-                            {
-                                "close_approach_date": "2023-12-15",
-                                "relative_velocity": {"kilometers_per_second": "17.5"},
-                                "miss_distance": {"kilometers": "4500000"}
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
-        
-        # Cache the response
-        cache_response(cache_key, mock_data, ttl=300)
+        # Cache the response and refresh the last-known-good fallback together
+        cache_responses([
+            (cache_key, mock_data, 300),
+            (NEO_FEED_LAST_GOOD_KEY, mock_data, 86400)
+        ])
         
-        return jsonify(mock_data)
+        return make_json_response(mock_data)
     
     except ValueError as ve:
+        release_fill_lock(cache_key)
         logger.error(f"NEO feed validation error: {ve}")
-        return jsonify({
+        return make_json_response({
             "error": "Invalid request parameters",
             "details": str(ve),
             "status": "error"
-        }), 400
+        }, 400)
     except Exception as e:
+        release_fill_lock(cache_key)
         logger.error(f"NEO feed error: {e}")
         
-        # Return fallback data instead of just error
-        fallback_data = {
-            "element_count": 0,
-            "status": "fallback",
-            "message": "Using cached fallback data due to API unavailability",
-            "near_earth_objects": {}
-        }
+        last_good = get_cached_response(NEO_FEED_LAST_GOOD_KEY)
+        if last_good:
+            return make_json_response({**last_good, "status": "fallback"}, 200)
         
-        return jsonify(fallback_data), 200
+        # Return fallback data instead of just error
+        return make_json_response(NEO_FEED_FALLBACK, 200)
 
 @app.route('/api/neo/<asteroid_id>', methods=['GET'])
-@jwt_required()
-@limiter.limit("20 per minute")
-async def neo_lookup(asteroid_id: str):
+@cached_jwt_required
+@sliding_window(limit=20, window=60)
+def neo_lookup(asteroid_id: str):
     """Get specific asteroid data"""
     cache_key = f"neo:lookup:{asteroid_id}"
     
-    cached = get_cached_response(cache_key)
+    cached = get_or_lock_cached_response(cache_key)
     if cached:
-        return jsonify(cached)
+        return make_json_response(cached)
     
     try:
         # Mock asteroid data
         mock_asteroid = {
             "id": asteroid_id,
             "name": f"Asteroid {asteroid_id}",
-            "estimated_diameter": {
-                "meters": {"estimated_diameter_min": 30, "estimated_diameter_max": 80}
-            },
-            "is_potentially_hazardous_asteroid": False,
-            "orbital_data": {
-                "orbit_class": {"orbit_class_type": "Apollo"}
-            },
-            "close_approach_data": [
-                {
-                    "close_approach_date": "2023-12-20",
-                    "relative_velocity": {"kilometers_per_second": "12.3"},
-                    "miss_distance": {"kilometers": "7800000"}
-                }
-            ]
+            **MOCK_ASTEROID_TEMPLATE
         }
         
         cache_response(cache_key, mock_asteroid, ttl=3600)
         
-        return jsonify(mock_asteroid)
+        return make_json_response(mock_asteroid)
     
     except Exception as e:
+        release_fill_lock(cache_key)
         logger.error(f"Asteroid lookup error: {e}")
-        return jsonify({"error": "Failed to fetch asteroid data"}), 500
+        return make_json_response({"error": "Failed to fetch asteroid data"}, 500)
 
 # USGS Earthquake API routes
 @app.route('/api/earthquakes', methods=['GET'])
-@jwt_required()
-@limiter.limit("15 per minute")
-async def earthquakes():
+@cached_jwt_required
+@sliding_window(limit=15, window=60)
+def earthquakes():
     """Get earthquake data"""
     cache_key = f"earthquakes:{request.args.get('starttime')}:{request.args.get('endtime')}"
     
-    cached = get_cached_response(cache_key)
+    cached = get_or_lock_cached_response(cache_key)
     if cached:
-        return jsonify(cached)
+        return make_json_response(cached)
     
     try:
         # Mock earthquake data
-        mock_earthquakes = {
-            "type": "FeatureCollection",
-            "features": [
-                {
-                    "type": "Feature",
-                    "properties": {
-                        "mag": 6.2,
-                        "place": "150km SSE of Homer, Alaska",
-                        "time": 1702600000000,
-                        "tsunami": 0
-                    },
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [-150.123, 58.456]
-                    }
-                }
-            ]
-        }
+        mock_earthquakes = MOCK_EARTHQUAKES_BYTES
         
         cache_response(cache_key, mock_earthquakes, ttl=600)
         
-        return jsonify(mock_earthquakes)
+        return make_json_response(mock_earthquakes)
     
     except Exception as e:
+        release_fill_lock(cache_key)
         logger.error(f"Earthquake data error: {e}")
-        return jsonify({"error": "Failed to fetch earthquake data"}), 500
+        return make_json_response({"error": "Failed to fetch earthquake data"}, 500)
 
 # Impact simulation routes
 @app.route('/api/impact/simulate', methods=['POST'])
-@jwt_required()
-@validate_json({
-    "diameter": float,
-    "density": float,
-    "velocity": float,
-    "angle": float,
-    "latitude": float,
-    "longitude": float
-})
-async def simulate_impact():
+@cached_jwt_required
+def simulate_impact():
     """Simulate meteor impact"""
-    data = request.get_json()
+    if not request.is_json:
+        return make_json_response({"error": "Request must be JSON"}, 400)
+    try:
+        params = msgspec.json.decode(request.get_data(), type=ImpactRequest)
+    except msgspec.DecodeError as e:
+        return make_json_response({"error": str(e)}, 400)
     
     try:
         # Calculate impact energy (kinetic energy)
-        volume = (4/3) * 3.14159 * (data['diameter']/2)**3
-        mass = data['density'] * volume  # kg
-        energy_joules = 0.5 * mass * (data['velocity'] * 1000)**2  # Convert km/s to m/s
-        energy_megatons = energy_joules / (4.184 * 10**15)  # Convert to megatons of TNT
+        radius = params.diameter * 0.5
+        volume = SPHERE_VOLUME_COEFF * radius * radius * radius
+        mass = params.density * volume  # kg
+        velocity = params.velocity
+        energy_joules = 0.5 * mass * velocity * velocity * KMS_SQUARED_TO_MS_SQUARED
+        energy_megatons = energy_joules / JOULES_PER_MEGATON_TNT
         
         # Simple crater diameter estimation
-        crater_diameter = 0.1 * energy_megatons**(1/3)  # km
+        crater_diameter = 0.1 * math.cbrt(energy_megatons)  # km
         
         result = {
             "impact_energy_joules": energy_joules,
             "impact_energy_megatons": energy_megatons,
             "estimated_crater_diameter_km": crater_diameter,
             "mass_kg": mass,
-            "simulation_timestamp": datetime.now().isoformat(),
-            "input_parameters": data
+            "simulation_timestamp": now_iso(),
+            "input_parameters": msgspec.structs.asdict(params)
         }
         
-        return jsonify(result)
+        return make_json_response(result)
     
     except Exception as e:
         logger.error(f"Impact simulation error: {e}")
-        return jsonify({"error": "Impact simulation failed"}), 500
+        return make_json_response({"error": "Impact simulation failed"}, 500)
 
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
-async def health_check():
+def health_check():
     """Health check endpoint"""
     try:
         # Check Redis connection
         redis_client.ping()
         
-        return jsonify({
+        return make_json_response({
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "services": {
                 "redis": "connected",
                 "api": "operational"
@@ -380,33 +684,30 @@ async def health_check():
         })
     
     except Exception as e:
-        return jsonify({
+        return make_json_response({
             "status": "degraded",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "error": str(e)
-        }), 503
+        }, 503)
 
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({"error": "Endpoint not found"}), 404
+    return make_json_response({"error": "Endpoint not found"}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
     logger.error(f"Internal server error: {error}")
-    return jsonify({"error": "Internal server error"}), 500
+    return make_json_response({"error": "Internal server error"}, 500)
 
 @app.errorhandler(429)
 def rate_limit_exceeded(error):
-    return jsonify({"error": "Rate limit exceeded"}), 429
+    return make_json_response({"error": "Rate limit exceeded"}, 429)
 
 if __name__ == "__main__":
     # Start real-time data streaming
     data_streamer.start_streaming()
     
     # Run the Flask-SocketIO application
-    port = int(os.getenv('PORT', 5000))
-    debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
-    
-    logger.info(f"Starting NASA Meteor Mastery server on port {port}")
-    socketio.run(app, host='0.0.0.0', port=port, debug=debug, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    logger.info(f"Starting NASA Meteor Mastery server on port {CFG.port}")
+    socketio.run(app, host='0.0.0.0', port=CFG.port, debug=CFG.debug, allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Ahead-of-time build of the meteorological simulation kernels
+Compiles the Numba kernels into the meteo_kernels extension module so fresh
+workers can skip JIT compilation. Run from the backend directory:
+
+    python build_kernels.py
+"""
+
+import os
+from numba.pycc import CC
+
+from meteorological_simulation_service import _baseline_weather_kernel, _detect_events_kernel
+
+cc = CC('meteo_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Weather columns are float32 field views of a WEATHER_DTYPE record array (any layout)
+cc.export(
+    'baseline_weather',
+    'void(f8, f8, f8[:, :], f8[:, :], f8[:, :], '
+    'f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], i2[:])'
+)(_baseline_weather_kernel.py_func)
+
+cc.export(
+    'detect_events',
+    'void(f4[:], f4[:], f4[:], f4[:], f8, f8, f8, f8, f8, f8, f8, f8, i1[:])'
+)(_detect_events_kernel.py_func)
+
+if __name__ == '__main__':
+    cc.compile()
@@ -0,0 +1,17 @@
+"""
+Date helpers shared by the NASA data services
+"""
+import time
+
+_today_cache = (0, '')
+
+def today_iso() -> str:
+    """Today's local date as YYYY-MM-DD, formatted at most once per second"""
+    global _today_cache
+    t = int(time.time())
+    cached = _today_cache
+    if cached[0] == t:
+        return cached[1]
+    today = time.strftime('%Y-%m-%d', time.localtime(t))
+    _today_cache = (t, today)
+    return today
@@ -3,22 +3,170 @@ Earth Observation Service
 Real-time Earth satellite imagery and environmental data from NASA Earth satellites
 """
 import asyncio
+import collections
+import contextlib
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+import weakref
+from dataclasses import asdict, dataclass
+import aiofiles
 import aiohttp
-import requests
-import json
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
-import base64
-from io import BytesIO
-import xml.etree.ElementTree as ET
+import orjson
+import pybase64
+
+from date_utils import today_iso
 
 logger = logging.getLogger(__name__)
 
+# SIMD-accelerated (AVX2/NEON) base64 encoder for image payloads
+_b64encode = pybase64.b64encode
+
+# PCG64 generator for synthetic indicator values
+_rng = np.random.default_rng()
+
+# stdlib generator for one-off scalar draws, where NumPy's per-call overhead dominates
+_pyrand = random.Random()
+
+# Failures expected from upstream fetches; anything else is a bug and propagates
+_FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError, KeyError)
+
+# Read size for streamed image downloads; a multiple of 3 keeps base64 chunks aligned
+_STREAM_CHUNK_SIZE = 3 * 65536
+
+# Raw image bytes live here; the in-memory cache only keeps file references
+IMAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'eo_cache')
+
+# Static product lookup tables, shared by every call
+_GOES_DESCRIPTIONS = {
+    'ABI-L2-MCMIPC': 'Multi-band Cloud and Moisture Imagery - CONUS',
+    'ABI-L2-MCMIPF': 'Multi-band Cloud and Moisture Imagery - Full Disk',
+    'ABI-L2-MCMIPM': 'Multi-band Cloud and Moisture Imagery - Mesoscale',
+    'ABI-L2-CMIPC': 'Cloud and Moisture Imagery - CONUS',
+    'GLM-L2-LCFA': 'Geostationary Lightning Mapper - Lightning Detection'
+}
+
+# Keyed by instrument prefix (the part of the product name before the first '-')
+_GOES_RESOLUTIONS = {
+    'ABI': '0.5-2 km',
+    'GLM': '8 km'
+}
+
+_GOES_MCMIP_BANDS = [
+    {'band': 1, 'wavelength': '0.47 μm', 'name': 'Blue'},
+    {'band': 2, 'wavelength': '0.64 μm', 'name': 'Red'},
+    {'band': 3, 'wavelength': '0.86 μm', 'name': 'Veggie'},
+    {'band': 7, 'wavelength': '3.9 μm', 'name': 'Shortwave IR'},
+    {'band': 14, 'wavelength': '11.2 μm', 'name': 'Longwave IR'}
+]
+
+_MODIS_DESCRIPTIONS = {
+    'MOD09GA': 'Surface Reflectance Daily L2G Global 1km and 500m',
+    'MOD11A1': 'Land Surface Temperature and Emissivity Daily L3 Global 1km',
+    'MOD13Q1': 'Vegetation Indices 16-Day L3 Global 250m',
+    'MOD14A1': 'Thermal Anomalies/Fire Daily L3 Global 1km',
+    'MOD15A2H': 'Leaf Area Index/FPAR 8-Day L4 Global 500m'
+}
+
+_MODIS_RESOLUTIONS = {
+    'MOD09GA': '500m/1km',
+    'MOD11A1': '1km',
+    'MOD13Q1': '250m',
+    'MOD14A1': '1km',
+    'MOD15A2H': '500m'
+}
+
+_MODIS_LAYERS = {
+    'MOD09GA': [
+        {'name': 'sur_refl_b01', 'description': 'Surface Reflectance Band 1', 'units': 'reflectance', 'range': [0, 1], 'color_scale': 'viridis'},
+        {'name': 'sur_refl_b02', 'description': 'Surface Reflectance Band 2', 'units': 'reflectance', 'range': [0, 1], 'color_scale': 'viridis'}
+    ],
+    'MOD11A1': [
+        {'name': 'LST_Day_1km', 'description': 'Daytime Land Surface Temperature', 'units': 'Kelvin', 'range': [200, 350], 'color_scale': 'plasma'},
+        {'name': 'LST_Night_1km', 'description': 'Nighttime Land Surface Temperature', 'units': 'Kelvin', 'range': [200, 350], 'color_scale': 'plasma'}
+    ]
+}
+
+_LANDSAT_BANDS = {
+    'B1': {'name': 'Coastal Aerosol', 'wavelength': '0.43-0.45 μm'},
+    'B2': {'name': 'Blue', 'wavelength': '0.45-0.51 μm'},
+    'B3': {'name': 'Green', 'wavelength': '0.53-0.59 μm'},
+    'B4': {'name': 'Red', 'wavelength': '0.64-0.67 μm'},
+    'B5': {'name': 'Near Infrared', 'wavelength': '0.85-0.88 μm'},
+    'B6': {'name': 'SWIR 1', 'wavelength': '1.57-1.65 μm'},
+    'B7': {'name': 'SWIR 2', 'wavelength': '2.11-2.29 μm'},
+    'B8': {'name': 'Panchromatic', 'wavelength': '0.50-0.68 μm'},
+    'B9': {'name': 'Cirrus', 'wavelength': '1.36-1.38 μm'}
+}
+
+def _cached_image_paths(data: Dict[str, Any]) -> List[str]:
+    """Image files referenced by a cache entry (single-image results or an 'images' list)"""
+    if '_image_path' in data:
+        return [data['_image_path']]
+    return [entry['_image_path'] for entry in data.get('images', ()) if '_image_path' in entry]
+
+def _remove_image_files(paths: List[str]) -> None:
+    """Delete image files that no cache entry references any more"""
+    for path in paths:
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+def _read_image_files(paths: List[str]) -> List[bytes]:
+    """Read cached image files back to back; runs as a single executor job per cache hit"""
+    raws = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            raws.append(f.read())
+    return raws
+
+# Record layouts for GOES images and Landsat scenes. Results carry them as plain dicts
+# (dataclasses.asdict), which also gives each record its own copy of the shared band tables
+@dataclass(slots=True)
+class GOESImageEntry:
+    """Single GOES image record within a weather imagery result"""
+    timestamp: str
+    image_type: str
+    bands: List[Dict]
+    coverage_area: str
+    image_url: str
+    thumbnail_url: str
+    metadata: Dict[str, str]
+
+@dataclass(slots=True)
+class LandsatScene:
+    """Single Landsat scene within a path/row imagery result"""
+    scene_id: str
+    acquisition_date: str
+    cloud_cover: float
+    sun_elevation: float
+    sun_azimuth: float
+    bands: Dict[str, Dict[str, str]]
+    download_urls: Dict[str, str]
+
 class EarthObservationService:
     """Comprehensive Earth observation and satellite imagery service"""
     
+    # Response cache shared by all instances (LRU order: oldest first); guarded for
+    # access from the streaming threads, each of which runs its own event loop
+    # Keys are tuples of the request parameters
+    _shared_cache: "collections.OrderedDict[Tuple, Dict[str, Any]]" = collections.OrderedDict()
+    _cache_lock = threading.Lock()
+    cache_max_entries = 256
+    # Files are content-addressed and can back several entries; delete one only when its count hits zero
+    _image_refs: "collections.Counter[str]" = collections.Counter()
+    
+    # Pooled HTTP sessions shared by all instances so TLS connections are reused; one per
+    # event loop, since a session is bound to the loop it was created on
+    _loop_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+        weakref.WeakKeyDictionary()
+    
     def __init__(self, nasa_api_key: str = None):
         self.nasa_api_key = nasa_api_key or "DEMO_KEY"
         self.base_urls = {
@@ -33,27 +181,53 @@ class EarthObservationService:
             'worldview': 'https://worldview.earthdata.nasa.gov/api/v1'
         }
         self.session = None
-        self.cache = {}
+        self.cache = EarthObservationService._shared_cache
         self.cache_duration = 1800  # 30 minutes for imagery
+        self.download_semaphore = asyncio.Semaphore(5)  # Concurrent image downloads
         
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self.session = self._get_shared_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit; the pooled session stays open for reuse"""
+        self.session = None
+    
+    @classmethod
+    def _get_shared_session(cls) -> aiohttp.ClientSession:
+        """Return the keep-alive session for the running event loop, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        session = cls._loop_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300,
+                                             keepalive_timeout=60)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                json_serialize=lambda obj: orjson.dumps(obj).decode()
+            )
+            cls._loop_sessions[loop] = session
+        return session
+    
+    @classmethod
+    async def close_shared_session(cls) -> None:
+        """Close the running loop's pooled session (call before that loop shuts down)"""
+        session = cls._loop_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
     
     async def get_earth_imagery(self, lat: float, lon: float, date: str = None, 
                                dim: float = 0.15, cloud_score: bool = False) -> Dict[str, Any]:
         """Get Landsat 8 Earth imagery for specific coordinates"""
+        cache_key = ('earth_imagery', lat, lon, date, dim)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            try:
+                return (await self._with_image_data([cached]))[0]
+            except FileNotFoundError:
+                self._drop_cached(cache_key)
+        
         try:
-            cache_key = f"earth_imagery_{lat}_{lon}_{date}_{dim}"
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]
-            
             params = {
                 'lat': lat,
                 'lon': lon,
@@ -69,43 +243,49 @@ class EarthObservationService:
             url = self.base_urls['earth_imagery']
             
             if self.session:
-                async with self.session.get(url, params=params, timeout=60) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        
-                        # Get metadata
-                        metadata = await self._get_earth_imagery_metadata(lat, lon, date)
-                        
-                        result = {
-                            'timestamp': datetime.now(timezone.utc).isoformat(),
-                            'coordinates': {'lat': lat, 'lon': lon},
-                            'date': date or datetime.now().strftime('%Y-%m-%d'),
-                            'dimension': dim,
-                            'image_data': base64.b64encode(image_data).decode('utf-8'),
-                            'image_format': 'png',
-                            'metadata': metadata,
-                            'source': 'Landsat 8'
-                        }
-                        
-                        self._cache_data(cache_key, result)
-                        return result
+                # Metadata comes from a separate endpoint; fetch it while the image downloads
+                metadata_task = asyncio.create_task(self._get_earth_imagery_metadata(lat, lon, date))
+                try:
+                    async with self.session.get(url, params=params, timeout=60) as response:
+                        if response.status == 200:
+                            image_data, image_path = await self._stream_image(response)
+                            metadata = await metadata_task
+                            
+                            result = {
+                                'timestamp': datetime.now(timezone.utc).isoformat(),
+                                'coordinates': {'lat': lat, 'lon': lon},
+                                'date': date or today_iso(),
+                                'dimension': dim,
+                                'image_data': image_data,
+                                'image_format': 'png',
+                                'metadata': metadata,
+                                'source': 'Landsat 8'
+                            }
+                            
+                            self._cache_data(cache_key, self._image_cache_entry(result, image_path))
+                            return result
+                finally:
+                    metadata_task.cancel()
             
             return {}
-            
-        except Exception as e:
+        except _FETCH_ERRORS as e:
             logger.error(f"Error getting Earth imagery: {e}")
             return {}
     
     async def get_epic_images(self, date: str = None, enhanced: bool = False) -> Dict[str, Any]:
         """Get EPIC (Earth Polychromatic Imaging Camera) images"""
+        cache_key = ('epic_images', date, enhanced)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            try:
+                return {**cached, 'images': await self._with_image_data(cached['images'])}
+            except FileNotFoundError:
+                self._drop_cached(cache_key)
+        
         try:
-            cache_key = f"epic_images_{date}_{enhanced}"
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]
-            
             # Use today's date if not specified
             if not date:
-                date = datetime.now().strftime('%Y-%m-%d')
+                date = today_iso()
             
             # Get available images for the date
             api_type = 'enhanced' if enhanced else 'natural'
@@ -113,6 +293,7 @@ class EarthObservationService:
             
             params = {'api_key': self.nasa_api_key}
             
+            fetched = []
             epic_data = {
                 'timestamp': datetime.now(timezone.utc).isoformat(),
                 'date': date,
@@ -125,38 +306,15 @@ class EarthObservationService:
             if self.session:
                 async with self.session.get(url, params=params, timeout=30) as response:
                     if response.status == 200:
-                        images_info = await response.json()
+                        images_info = orjson.loads(await response.read())
                         
-                        for img_info in images_info[:5]:  # Limit to 5 most recent
-                            image_name = img_info.get('image', '')
-                            
-                            # Get the actual image
-                            img_date = img_info.get('date', '').split(' ')[0].replace('-', '/')
-                            image_url = f"https://api.nasa.gov/EPIC/archive/{api_type}/{img_date}/png/{image_name}.png"
-                            
-                            try:
-                                async with self.session.get(image_url, params=params, timeout=60) as img_response:
-                                    if img_response.status == 200:
-                                        image_data = await img_response.read()
-                                        
-                                        image_entry = {
-                                            'image_name': image_name,
-                                            'date': img_info.get('date', ''),
-                                            'caption': img_info.get('caption', ''),
-                                            'centroid_coordinates': img_info.get('centroid_coordinates', {}),
-                                            'dscovr_j2000_position': img_info.get('dscovr_j2000_position', {}),
-                                            'lunar_j2000_position': img_info.get('lunar_j2000_position', {}),
-                                            'sun_j2000_position': img_info.get('sun_j2000_position', {}),
-                                            'attitude_quaternions': img_info.get('attitude_quaternions', {}),
-                                            'image_data': base64.b64encode(image_data).decode('utf-8'),
-                                            'image_url': image_url
-                                        }
-                                        
-                                        epic_data['images'].append(image_entry)
-                                        
-                            except Exception as e:
-                                logger.warning(f"Error downloading EPIC image {image_name}: {e}")
-                                continue
+                        # Limit to 5 most recent, downloaded concurrently
+                        results = await asyncio.gather(
+                            *(self._fetch_epic_image(img_info, api_type, params) for img_info in images_info[:5]),
+                            return_exceptions=True
+                        )
+                        fetched = [r for r in results if isinstance(r, tuple)]
+                        epic_data['images'] = [entry for entry, _ in fetched]
                         
                         # Extract position data from first image
                         if epic_data['images']:
@@ -164,249 +322,274 @@ class EarthObservationService:
                             epic_data['earth_position'] = first_img.get('centroid_coordinates', {})
                             epic_data['sun_position'] = first_img.get('sun_j2000_position', {})
             
-            self._cache_data(cache_key, epic_data)
+            self._cache_data(cache_key, {
+                **epic_data,
+                'images': [self._image_cache_entry(entry, path) for entry, path in fetched]
+            })
             return epic_data
-            
-        except Exception as e:
+        except _FETCH_ERRORS as e:
             logger.error(f"Error getting EPIC images: {e}")
             return {}
     
+    async def _fetch_epic_image(self, img_info: Dict[str, Any], api_type: str,
+                                params: Dict[str, str]) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Download a single EPIC image; returns its entry and on-disk cache path"""
+        image_name = img_info.get('image', '')
+        
+        # Get the actual image
+        img_date = img_info.get('date', '').split(' ')[0].replace('-', '/')
+        image_url = f"https://api.nasa.gov/EPIC/archive/{api_type}/{img_date}/png/{image_name}.png"
+        
+        try:
+            async with self.download_semaphore:
+                async with self.session.get(image_url, params=params, timeout=60) as img_response:
+                    if img_response.status != 200:
+                        return None
+                    image_data, image_path = await self._stream_image(img_response)
+        except _FETCH_ERRORS as e:
+            logger.warning(f"Error downloading EPIC image {image_name}: {e}")
+            return None
+        
+        return {
+            'image_name': image_name,
+            'date': img_info.get('date', ''),
+            'caption': img_info.get('caption', ''),
+            'centroid_coordinates': img_info.get('centroid_coordinates', {}),
+            'dscovr_j2000_position': img_info.get('dscovr_j2000_position', {}),
+            'lunar_j2000_position': img_info.get('lunar_j2000_position', {}),
+            'sun_j2000_position': img_info.get('sun_j2000_position', {}),
+            'attitude_quaternions': img_info.get('attitude_quaternions', {}),
+            'image_data': image_data,
+            'image_url': image_url
+        }, image_path
+    
     async def get_goes_weather_imagery(self, product: str = 'ABI-L2-MCMIPC', 
                                      region: str = 'CONUS') -> Dict[str, Any]:
         """Get GOES-16/17 weather satellite imagery"""
-        try:
-            cache_key = f"goes_imagery_{product}_{region}"
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]
-            
-            goes_data = {
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'satellite': 'GOES-16',
-                'product': product,
-                'region': region,
-                'images': [],
-                'metadata': {
-                    'description': self._get_goes_product_description(product),
-                    'resolution': self._get_goes_resolution(product),
-                    'update_frequency': '15 minutes'
-                }
+        cache_key = ('goes_imagery', product, region)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        current_time = datetime.now(timezone.utc)
+        goes_data = {
+            'timestamp': current_time.isoformat(),
+            'satellite': 'GOES-16',
+            'product': product,
+            'region': region,
+            'images': [],
+            'metadata': {
+                'description': self._get_goes_product_description(product),
+                'resolution': self._get_goes_resolution(product),
+                'update_frequency': '15 minutes'
             }
-            
-            # Simulate GOES imagery data (in real implementation, would fetch from NOAA)
-            # This would involve complex NOAA API integration
-            current_time = datetime.now(timezone.utc)
-            
-            for i in range(3):  # Get last 3 images
-                image_time = current_time - timedelta(minutes=15*i)
-                
-                image_entry = {
-                    'timestamp': image_time.isoformat(),
-                    'image_type': 'composite',
-                    'bands': self._get_goes_bands(product),
-                    'coverage_area': region,
-                    'image_url': f"https://cdn.star.nesdis.noaa.gov/GOES16/ABI/{region}/{product}/latest.jpg",
-                    'thumbnail_url': f"https://cdn.star.nesdis.noaa.gov/GOES16/ABI/{region}/{product}/thumbnail.jpg",
-                    'metadata': {
-                        'scan_mode': 'Mode 6',
-                        'scene_id': f"OR_{product}-M6_{region}_G16",
-                        'processing_level': 'L2'
-                    }
-                }
-                
-                goes_data['images'].append(image_entry)
-            
-            self._cache_data(cache_key, goes_data)
-            return goes_data
-            
-        except Exception as e:
-            logger.error(f"Error getting GOES imagery: {e}")
-            return {}
+        }
+        
+        # Simulate GOES imagery data (in real implementation, would fetch from NOAA)
+        # This would involve complex NOAA API integration
+        bands = self._get_goes_bands(product)
+        image_url = f"https://cdn.star.nesdis.noaa.gov/GOES16/ABI/{region}/{product}/latest.jpg"
+        thumbnail_url = f"https://cdn.star.nesdis.noaa.gov/GOES16/ABI/{region}/{product}/thumbnail.jpg"
+        image_metadata = {
+            'scan_mode': 'Mode 6',
+            'scene_id': f"OR_{product}-M6_{region}_G16",
+            'processing_level': 'L2'
+        }
+        
+        goes_data['images'] = [
+            asdict(GOESImageEntry(
+                timestamp=(current_time - timedelta(minutes=15 * i)).isoformat(),
+                image_type='composite',
+                bands=bands,
+                coverage_area=region,
+                image_url=image_url,
+                thumbnail_url=thumbnail_url,
+                metadata=image_metadata
+            ))
+            for i in range(3)  # Get last 3 images
+        ]
+        
+        self._cache_data(cache_key, goes_data)
+        return goes_data
     
     async def get_modis_data(self, product: str = 'MOD09GA', 
                            coordinates: Tuple[float, float] = None) -> Dict[str, Any]:
         """Get MODIS (Terra/Aqua) satellite data"""
-        try:
-            cache_key = f"modis_data_{product}_{coordinates}"
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]
-            
-            modis_data = {
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'product': product,
-                'satellite': 'Terra/Aqua',
-                'coordinates': coordinates,
-                'data_layers': [],
-                'metadata': {
-                    'description': self._get_modis_product_description(product),
-                    'resolution': self._get_modis_resolution(product),
-                    'temporal_coverage': 'Daily'
-                }
+        cache_key = ('modis_data', product, tuple(coordinates) if coordinates else None)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        modis_data = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'product': product,
+            'satellite': 'Terra/Aqua',
+            'coordinates': coordinates,
+            'data_layers': [],
+            'metadata': {
+                'description': self._get_modis_product_description(product),
+                'resolution': self._get_modis_resolution(product),
+                'temporal_coverage': 'Daily'
+            }
+        }
+        
+        # Get available data layers for the product
+        layers = self._get_modis_layers(product)
+        last_update = modis_data['timestamp']
+        
+        for layer in layers:
+            layer_data = {
+                'layer_name': layer['name'],
+                'description': layer['description'],
+                'units': layer['units'],
+                'data_range': layer['range'],
+                'color_scale': layer['color_scale'],
+                'last_update': last_update,
+                'data_url': f"https://modis.gsfc.nasa.gov/data/{product}/{layer['name']}/latest.hdf"
             }
             
-            # Get available data layers for the product
-            layers = self._get_modis_layers(product)
-            
-            for layer in layers:
-                layer_data = {
-                    'layer_name': layer['name'],
-                    'description': layer['description'],
-                    'units': layer['units'],
-                    'data_range': layer['range'],
-                    'color_scale': layer['color_scale'],
-                    'last_update': datetime.now(timezone.utc).isoformat(),
-                    'data_url': f"https://modis.gsfc.nasa.gov/data/{product}/{layer['name']}/latest.hdf"
-                }
-                
-                modis_data['data_layers'].append(layer_data)
-            
-            self._cache_data(cache_key, modis_data)
-            return modis_data
-            
-        except Exception as e:
-            logger.error(f"Error getting MODIS data: {e}")
-            return {}
+            modis_data['data_layers'].append(layer_data)
+        
+        self._cache_data(cache_key, modis_data)
+        return modis_data
     
     async def get_landsat_imagery(self, path: int, row: int, date: str = None) -> Dict[str, Any]:
         """Get Landsat 8/9 imagery for specific path/row"""
-        try:
-            cache_key = f"landsat_imagery_{path}_{row}_{date}"
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]
-            
-            landsat_data = {
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'satellite': 'Landsat 8/9',
-                'path': path,
-                'row': row,
-                'date': date or datetime.now().strftime('%Y-%m-%d'),
-                'scenes': [],
-                'metadata': {
-                    'resolution': '30m (multispectral), 15m (panchromatic)',
-                    'swath_width': '185 km',
-                    'revisit_time': '16 days'
-                }
+        cache_key = ('landsat_imagery', path, row, date)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        now = datetime.now(timezone.utc)
+        date_str = date or today_iso()
+        scene_id = f"LC08_{path:03d}{row:03d}_{date_str.replace('-', '')}_01_T1"
+        scene_base_url = (
+            "https://landsat-look.usgs.gov/data/collection02/level-1/standard/oli_tirs/"
+            f"{date_str[:4]}/{path:03d}/{row:03d}/{scene_id}"
+        )
+        
+        landsat_data = {
+            'timestamp': now.isoformat(),
+            'satellite': 'Landsat 8/9',
+            'path': path,
+            'row': row,
+            'date': date_str,
+            'scenes': [],
+            'metadata': {
+                'resolution': '30m (multispectral), 15m (panchromatic)',
+                'swath_width': '185 km',
+                'revisit_time': '16 days'
             }
-            
-            # Simulate Landsat scene data
-            scene_data = {
-                'scene_id': f"LC08_{path:03d}{row:03d}_{date or datetime.now().strftime('%Y%m%d')}_01_T1",
-                'acquisition_date': date or datetime.now().strftime('%Y-%m-%d'),
-                'cloud_cover': np.random.uniform(0, 30),  # Random cloud cover
-                'sun_elevation': np.random.uniform(30, 70),
-                'sun_azimuth': np.random.uniform(120, 180),
-                'bands': {
-                    'B1': {'name': 'Coastal Aerosol', 'wavelength': '0.43-0.45 μm'},
-                    'B2': {'name': 'Blue', 'wavelength': '0.45-0.51 μm'},
-                    'B3': {'name': 'Green', 'wavelength': '0.53-0.59 μm'},
-                    'B4': {'name': 'Red', 'wavelength': '0.64-0.67 μm'},
-                    'B5': {'name': 'Near Infrared', 'wavelength': '0.85-0.88 μm'},
-                    'B6': {'name': 'SWIR 1', 'wavelength': '1.57-1.65 μm'},
-                    'B7': {'name': 'SWIR 2', 'wavelength': '2.11-2.29 μm'},
-                    'B8': {'name': 'Panchromatic', 'wavelength': '0.50-0.68 μm'},
-                    'B9': {'name': 'Cirrus', 'wavelength': '1.36-1.38 μm'}
-                },
-                'download_urls': {
-                    'thumbnail': f"https://landsat-look.usgs.gov/data/collection02/level-1/standard/oli_tirs/{date or '2024'}/{path:03d}/{row:03d}/LC08_{path:03d}{row:03d}_{date or datetime.now().strftime('%Y%m%d')}_01_T1_thumb_large.jpg",
-                    'full_scene': f"https://landsat-look.usgs.gov/data/collection02/level-1/standard/oli_tirs/{date or '2024'}/{path:03d}/{row:03d}/LC08_{path:03d}{row:03d}_{date or datetime.now().strftime('%Y%m%d')}_01_T1.tar.gz"
-                }
+        }
+        
+        # Simulate Landsat scene data
+        scene_data = LandsatScene(
+            scene_id=scene_id,
+            acquisition_date=date_str,
+            cloud_cover=_pyrand.uniform(0, 30),  # Random cloud cover
+            sun_elevation=_pyrand.uniform(30, 70),
+            sun_azimuth=_pyrand.uniform(120, 180),
+            bands=_LANDSAT_BANDS,
+            download_urls={
+                'thumbnail': f"{scene_base_url}_thumb_large.jpg",
+                'full_scene': f"{scene_base_url}.tar.gz"
             }
-            
-            landsat_data['scenes'].append(scene_data)
-            
-            self._cache_data(cache_key, landsat_data)
-            return landsat_data
-            
-        except Exception as e:
-            logger.error(f"Error getting Landsat imagery: {e}")
-            return {}
+        )
+        
+        landsat_data['scenes'].append(asdict(scene_data))
+        
+        self._cache_data(cache_key, landsat_data)
+        return landsat_data
     
     async def get_environmental_indicators(self, region: str = 'global') -> Dict[str, Any]:
         """Get environmental indicators from satellite data"""
-        try:
-            cache_key = f"environmental_indicators_{region}"
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]
-            
-            indicators = {
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'region': region,
-                'indicators': {
-                    'vegetation_health': await self._get_vegetation_health(region),
-                    'air_quality': await self._get_air_quality(region),
-                    'sea_surface_temperature': await self._get_sst(region),
-                    'snow_cover': await self._get_snow_cover(region),
-                    'fire_activity': await self._get_fire_activity(region),
-                    'drought_conditions': await self._get_drought_conditions(region),
-                    'urban_heat_islands': await self._get_urban_heat(region)
-                },
-                'trends': {
-                    'temperature_anomaly': np.random.uniform(-2, 2),
-                    'precipitation_anomaly': np.random.uniform(-50, 50),
-                    'vegetation_trend': np.random.choice(['improving', 'stable', 'declining'])
-                }
+        cache_key = ('environmental_indicators', region)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        indicators = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'region': region,
+            'indicators': {
+                'vegetation_health': await self._get_vegetation_health(region),
+                'air_quality': await self._get_air_quality(region),
+                'sea_surface_temperature': await self._get_sst(region),
+                'snow_cover': await self._get_snow_cover(region),
+                'fire_activity': await self._get_fire_activity(region),
+                'drought_conditions': await self._get_drought_conditions(region),
+                'urban_heat_islands': await self._get_urban_heat(region)
+            },
+            'trends': {
+                'temperature_anomaly': _pyrand.uniform(-2, 2),
+                'precipitation_anomaly': _pyrand.uniform(-50, 50),
+                'vegetation_trend': _pyrand.choice(['improving', 'stable', 'declining'])
             }
-            
-            self._cache_data(cache_key, indicators)
-            return indicators
-            
-        except Exception as e:
-            logger.error(f"Error getting environmental indicators: {e}")
-            return {}
+        }
+        
+        self._cache_data(cache_key, indicators)
+        return indicators
     
     async def get_real_time_events(self) -> Dict[str, Any]:
         """Get real-time environmental events from satellite monitoring"""
-        try:
-            cache_key = "real_time_events"
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]
-            
-            events = {
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'active_events': [],
-                'recent_events': [],
-                'monitoring_systems': [
-                    'MODIS Fire Detection',
-                    'VIIRS Active Fire',
-                    'GOES Lightning Mapper',
-                    'Sentinel-1 Flood Monitoring',
-                    'Landsat Change Detection'
-                ]
-            }
-            
-            # Simulate active events
-            event_types = [
-                {'type': 'wildfire', 'severity': 'high', 'location': 'California, USA'},
-                {'type': 'volcanic_eruption', 'severity': 'moderate', 'location': 'Kamchatka, Russia'},
-                {'type': 'flooding', 'severity': 'moderate', 'location': 'Bangladesh'},
-                {'type': 'dust_storm', 'severity': 'low', 'location': 'Sahara Desert'},
-                {'type': 'oil_spill', 'severity': 'high', 'location': 'Gulf of Mexico'}
+        cache_key = ('real_time_events',)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        now_utc = datetime.now(timezone.utc)
+        events = {
+            'timestamp': now_utc.isoformat(),
+            'active_events': [],
+            'recent_events': [],
+            'monitoring_systems': [
+                'MODIS Fire Detection',
+                'VIIRS Active Fire',
+                'GOES Lightning Mapper',
+                'Sentinel-1 Flood Monitoring',
+                'Landsat Change Detection'
             ]
+        }
+        
+        # Simulate active events
+        event_types = [
+            {'type': 'wildfire', 'severity': 'high', 'location': 'California, USA'},
+            {'type': 'volcanic_eruption', 'severity': 'moderate', 'location': 'Kamchatka, Russia'},
+            {'type': 'flooding', 'severity': 'moderate', 'location': 'Bangladesh'},
+            {'type': 'dust_storm', 'severity': 'low', 'location': 'Sahara Desert'},
+            {'type': 'oil_spill', 'severity': 'high', 'location': 'Gulf of Mexico'}
+        ]
+        
+        event_date = today_iso().replace('-', '')
+        active = event_types[:3]  # Show 3 active events
+        
+        # Draw every per-event random field in one batched call per kind
+        hours_ago = _rng.integers(1, 24, size=len(active)).tolist()
+        sources = _rng.choice(['MODIS', 'VIIRS', 'Sentinel-2', 'Landsat-8'], size=len(active)).tolist()
+        draws = _rng.uniform([0.7, -60, -180, 10], [0.95, 60, 180, 1000], size=(len(active), 4)).tolist()
+        
+        for i, event_type in enumerate(active):
+            confidence, lat, lon, area = draws[i]
+            event = {
+                'event_id': f"EVT_{event_date}_{i:03d}",
+                'type': event_type['type'],
+                'severity': event_type['severity'],
+                'location': event_type['location'],
+                'detected_time': (now_utc - timedelta(hours=hours_ago[i])).isoformat(),
+                'confidence': confidence,
+                'satellite_source': sources[i],
+                'coordinates': {
+                    'lat': lat,
+                    'lon': lon
+                },
+                'affected_area_km2': area,
+                'status': 'active'
+            }
             
-            for i, event_type in enumerate(event_types[:3]):  # Show 3 active events
-                event = {
-                    'event_id': f"EVT_{datetime.now().strftime('%Y%m%d')}_{i:03d}",
-                    'type': event_type['type'],
-                    'severity': event_type['severity'],
-                    'location': event_type['location'],
-                    'detected_time': (datetime.now(timezone.utc) - timedelta(hours=np.random.randint(1, 24))).isoformat(),
-                    'confidence': np.random.uniform(0.7, 0.95),
-                    'satellite_source': np.random.choice(['MODIS', 'VIIRS', 'Sentinel-2', 'Landsat-8']),
-                    'coordinates': {
-                        'lat': np.random.uniform(-60, 60),
-                        'lon': np.random.uniform(-180, 180)
-                    },
-                    'affected_area_km2': np.random.uniform(10, 1000),
-                    'status': 'active'
-                }
-                
-                events['active_events'].append(event)
-            
-            self._cache_data(cache_key, events)
-            return events
-            
-        except Exception as e:
-            logger.error(f"Error getting real-time events: {e}")
-            return {}
+            events['active_events'].append(event)
+        
+        self._cache_data(cache_key, events)
+        return events
     
     async def _get_earth_imagery_metadata(self, lat: float, lon: float, date: str) -> Dict[str, Any]:
         """Get metadata for Earth imagery"""
@@ -424,158 +607,212 @@ class EarthObservationService:
             if self.session:
                 async with self.session.get(url, params=params, timeout=30) as response:
                     if response.status == 200:
-                        return await response.json()
+                        return orjson.loads(await response.read())
             
             return {}
             
-        except Exception as e:
+        except _FETCH_ERRORS as e:
             logger.error(f"Error getting Earth imagery metadata: {e}")
             return {}
     
     def _get_goes_product_description(self, product: str) -> str:
         """Get description for GOES product"""
-        descriptions = {
-            'ABI-L2-MCMIPC': 'Multi-band Cloud and Moisture Imagery - CONUS',
-            'ABI-L2-MCMIPF': 'Multi-band Cloud and Moisture Imagery - Full Disk',
-            'ABI-L2-MCMIPM': 'Multi-band Cloud and Moisture Imagery - Mesoscale',
-            'ABI-L2-CMIPC': 'Cloud and Moisture Imagery - CONUS',
-            'GLM-L2-LCFA': 'Geostationary Lightning Mapper - Lightning Detection'
-        }
-        return descriptions.get(product, 'GOES Weather Product')
+        return _GOES_DESCRIPTIONS.get(product, 'GOES Weather Product')
     
     def _get_goes_resolution(self, product: str) -> str:
         """Get resolution for GOES product"""
-        if 'ABI' in product:
-            return '0.5-2 km'
-        elif 'GLM' in product:
-            return '8 km'
-        return '1 km'
+        return _GOES_RESOLUTIONS.get(product.split('-', 1)[0], '1 km')
     
     def _get_goes_bands(self, product: str) -> List[Dict]:
         """Get spectral bands for GOES product"""
         if 'MCMIP' in product:
-            return [
-                {'band': 1, 'wavelength': '0.47 μm', 'name': 'Blue'},
-                {'band': 2, 'wavelength': '0.64 μm', 'name': 'Red'},
-                {'band': 3, 'wavelength': '0.86 μm', 'name': 'Veggie'},
-                {'band': 7, 'wavelength': '3.9 μm', 'name': 'Shortwave IR'},
-                {'band': 14, 'wavelength': '11.2 μm', 'name': 'Longwave IR'}
-            ]
+            return _GOES_MCMIP_BANDS
         return []
     
     def _get_modis_product_description(self, product: str) -> str:
         """Get description for MODIS product"""
-        descriptions = {
-            'MOD09GA': 'Surface Reflectance Daily L2G Global 1km and 500m',
-            'MOD11A1': 'Land Surface Temperature and Emissivity Daily L3 Global 1km',
-            'MOD13Q1': 'Vegetation Indices 16-Day L3 Global 250m',
-            'MOD14A1': 'Thermal Anomalies/Fire Daily L3 Global 1km',
-            'MOD15A2H': 'Leaf Area Index/FPAR 8-Day L4 Global 500m'
-        }
-        return descriptions.get(product, 'MODIS Earth Observation Product')
+        return _MODIS_DESCRIPTIONS.get(product, 'MODIS Earth Observation Product')
     
     def _get_modis_resolution(self, product: str) -> str:
         """Get resolution for MODIS product"""
-        resolutions = {
-            'MOD09GA': '500m/1km',
-            'MOD11A1': '1km',
-            'MOD13Q1': '250m',
-            'MOD14A1': '1km',
-            'MOD15A2H': '500m'
-        }
-        return resolutions.get(product, '1km')
+        return _MODIS_RESOLUTIONS.get(product, '1km')
     
     def _get_modis_layers(self, product: str) -> List[Dict]:
         """Get data layers for MODIS product"""
-        layers = {
-            'MOD09GA': [
-                {'name': 'sur_refl_b01', 'description': 'Surface Reflectance Band 1', 'units': 'reflectance', 'range': [0, 1], 'color_scale': 'viridis'},
-                {'name': 'sur_refl_b02', 'description': 'Surface Reflectance Band 2', 'units': 'reflectance', 'range': [0, 1], 'color_scale': 'viridis'}
-            ],
-            'MOD11A1': [
-                {'name': 'LST_Day_1km', 'description': 'Daytime Land Surface Temperature', 'units': 'Kelvin', 'range': [200, 350], 'color_scale': 'plasma'},
-                {'name': 'LST_Night_1km', 'description': 'Nighttime Land Surface Temperature', 'units': 'Kelvin', 'range': [200, 350], 'color_scale': 'plasma'}
-            ]
-        }
-        return layers.get(product, [])
+        return _MODIS_LAYERS.get(product, [])
     
     async def _get_vegetation_health(self, region: str) -> Dict[str, Any]:
         """Get vegetation health indicators"""
+        ndvi, evi, drought, heat, disease = _rng.uniform(
+            [0.3, 0.2, 0, 0, 0], [0.8, 0.6, 1, 1, 1]).tolist()
         return {
-            'ndvi_average': np.random.uniform(0.3, 0.8),
-            'evi_average': np.random.uniform(0.2, 0.6),
-            'health_status': np.random.choice(['excellent', 'good', 'fair', 'poor']),
+            'ndvi_average': ndvi,
+            'evi_average': evi,
+            'health_status': _rng.choice(['excellent', 'good', 'fair', 'poor']),
             'stress_indicators': {
-                'drought_stress': np.random.uniform(0, 1),
-                'heat_stress': np.random.uniform(0, 1),
-                'disease_pressure': np.random.uniform(0, 1)
+                'drought_stress': drought,
+                'heat_stress': heat,
+                'disease_pressure': disease
             }
         }
     
     async def _get_air_quality(self, region: str) -> Dict[str, Any]:
         """Get air quality indicators"""
+        pm25, no2, aod = _rng.uniform([5, 10, 0.1], [50, 80, 0.8]).tolist()
         return {
-            'aqi_average': np.random.randint(20, 150),
-            'pm25_concentration': np.random.uniform(5, 50),
-            'no2_concentration': np.random.uniform(10, 80),
-            'aerosol_optical_depth': np.random.uniform(0.1, 0.8),
-            'quality_status': np.random.choice(['good', 'moderate', 'unhealthy', 'hazardous'])
+            'aqi_average': int(_rng.integers(20, 150)),
+            'pm25_concentration': pm25,
+            'no2_concentration': no2,
+            'aerosol_optical_depth': aod,
+            'quality_status': _rng.choice(['good', 'moderate', 'unhealthy', 'hazardous'])
         }
     
     async def _get_sst(self, region: str) -> Dict[str, Any]:
         """Get sea surface temperature data"""
+        temperature, anomaly, el_nino = _rng.uniform([15, -3, -2], [30, 3, 2]).tolist()
         return {
-            'average_temperature': np.random.uniform(15, 30),
-            'temperature_anomaly': np.random.uniform(-3, 3),
-            'trend': np.random.choice(['warming', 'cooling', 'stable']),
-            'el_nino_index': np.random.uniform(-2, 2)
+            'average_temperature': temperature,
+            'temperature_anomaly': anomaly,
+            'trend': _rng.choice(['warming', 'cooling', 'stable']),
+            'el_nino_index': el_nino
         }
     
     async def _get_snow_cover(self, region: str) -> Dict[str, Any]:
         """Get snow cover data"""
+        coverage, depth, anomaly, melt = _rng.uniform([0, 0, -50, 0], [80, 200, 50, 10]).tolist()
         return {
-            'coverage_percentage': np.random.uniform(0, 80),
-            'snow_depth_average': np.random.uniform(0, 200),
-            'seasonal_anomaly': np.random.uniform(-50, 50),
-            'melt_rate': np.random.uniform(0, 10)
+            'coverage_percentage': coverage,
+            'snow_depth_average': depth,
+            'seasonal_anomaly': anomaly,
+            'melt_rate': melt
         }
     
     async def _get_fire_activity(self, region: str) -> Dict[str, Any]:
         """Get fire activity data"""
+        burned, smoke = _rng.uniform([0, 0], [10000, 100]).tolist()
         return {
-            'active_fires': np.random.randint(0, 500),
-            'burned_area_km2': np.random.uniform(0, 10000),
-            'fire_risk_level': np.random.choice(['low', 'moderate', 'high', 'extreme']),
-            'smoke_coverage': np.random.uniform(0, 100)
+            'active_fires': int(_rng.integers(0, 500)),
+            'burned_area_km2': burned,
+            'fire_risk_level': _rng.choice(['low', 'moderate', 'high', 'extreme']),
+            'smoke_coverage': smoke
         }
     
     async def _get_drought_conditions(self, region: str) -> Dict[str, Any]:
         """Get drought condition data"""
+        soil_moisture, deficit, stress = _rng.uniform([5, 0, 0], [95, 200, 1]).tolist()
         return {
-            'drought_severity': np.random.choice(['none', 'mild', 'moderate', 'severe', 'extreme']),
-            'soil_moisture_percentile': np.random.uniform(5, 95),
-            'precipitation_deficit': np.random.uniform(0, 200),
-            'vegetation_stress': np.random.uniform(0, 1)
+            'drought_severity': _rng.choice(['none', 'mild', 'moderate', 'severe', 'extreme']),
+            'soil_moisture_percentile': soil_moisture,
+            'precipitation_deficit': deficit,
+            'vegetation_stress': stress
         }
     
     async def _get_urban_heat(self, region: str) -> Dict[str, Any]:
         """Get urban heat island data"""
+        intensity, urban, rural, cooling = _rng.uniform([0, 25, 20, 2], [8, 45, 35, 8]).tolist()
         return {
-            'heat_island_intensity': np.random.uniform(0, 8),
-            'surface_temperature_urban': np.random.uniform(25, 45),
-            'surface_temperature_rural': np.random.uniform(20, 35),
-            'cooling_effect_vegetation': np.random.uniform(2, 8)
+            'heat_island_intensity': intensity,
+            'surface_temperature_urban': urban,
+            'surface_temperature_rural': rural,
+            'cooling_effect_vegetation': cooling
         }
     
-    def _is_cached(self, key: str) -> bool:
-        """Check if data is cached and still valid"""
-        if key not in self.cache:
-            return False
+    async def _stream_image(self, response: aiohttp.ClientResponse) -> Tuple[str, str]:
+        """Stream an image body to the on-disk cache while base64-encoding it incrementally.
+
+        Returns the base64 payload and the content-addressed cache path. Chunks are
+        encoded on 3-byte boundaries so the pieces concatenate to the same output as
+        encoding the whole body at once, without ever holding the full raw image.
+        """
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        tmp_path = os.path.join(IMAGE_CACHE_DIR, f"{os.urandom(8).hex()}.tmp")
+        digest = hashlib.sha1()
+        encoded = []
+        carry = b''
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+                    digest.update(chunk)
+                    await f.write(chunk)
+                    data = carry + chunk if carry else chunk
+                    cut = len(data) - len(data) % 3
+                    encoded.append(_b64encode(memoryview(data)[:cut]))
+                    carry = data[cut:]
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        encoded.append(_b64encode(carry))
+        
+        path = os.path.join(IMAGE_CACHE_DIR, f"{digest.hexdigest()}.png")
+        os.replace(tmp_path, path)
+        return b''.join(encoded).decode('ascii'), path
+    
+    @staticmethod
+    def _image_cache_entry(entry: Dict[str, Any], image_path: str) -> Dict[str, Any]:
+        """Cacheable copy of a result entry that references its image file instead of embedding it"""
+        cached = {k: v for k, v in entry.items() if k != 'image_data'}
+        cached['_image_path'] = image_path
+        return cached
+    
+    async def _with_image_data(self, cached_entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rebuild result entries from the cache, base64-encoding their image files on demand"""
+        loop = asyncio.get_running_loop()
+        raws = await loop.run_in_executor(
+            None, _read_image_files, [cached['_image_path'] for cached in cached_entries])
         
-        cache_time = self.cache[key].get('_cache_time', 0)
-        return (datetime.now().timestamp() - cache_time) < self.cache_duration
+        entries = []
+        for cached, raw in zip(cached_entries, raws):
+            entry = {k: v for k, v in cached.items() if k != '_image_path'}
+            entry['image_data'] = _b64encode(raw).decode('ascii')
+            entries.append(entry)
+        return entries
+    
+    def _get_cached(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Return cached data if present and still valid, refreshing its LRU position"""
+        with self._cache_lock:
+            data = self.cache.get(key)
+            if data is None:
+                return None
+            
+            if (time.monotonic() - data.get('_cache_time', 0.0)) >= self.cache_duration:
+                del self.cache[key]
+                orphaned = self._release_images(data)
+            else:
+                self.cache.move_to_end(key)
+                return data
+        _remove_image_files(orphaned)
+        return None
+    
+    def _drop_cached(self, key: Tuple) -> None:
+        """Remove a cache entry if present, deleting image files only it referenced"""
+        with self._cache_lock:
+            data = self.cache.pop(key, None)
+            orphaned = self._release_images(data) if data is not None else []
+        _remove_image_files(orphaned)
+    
+    def _cache_data(self, key: Tuple, data: Dict) -> None:
+        """Cache data with timestamp, evicting least recently used entries beyond capacity"""
+        data['_cache_time'] = time.monotonic()
+        orphaned = []
+        with self._cache_lock:
+            self._image_refs.update(_cached_image_paths(data))
+            previous = self.cache.get(key)
+            if previous is not None:
+                orphaned += self._release_images(previous)
+            self.cache[key] = data
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_max_entries:
+                _, evicted = self.cache.popitem(last=False)
+                orphaned += self._release_images(evicted)
+        _remove_image_files(orphaned)
     
-    def _cache_data(self, key: str, data: Dict) -> None:
-        """Cache data with timestamp"""
-        data['_cache_time'] = datetime.now().timestamp()
-        self.cache[key] = data
\ No newline at end of file
+    def _release_images(self, data: Dict[str, Any]) -> List[str]:
+        """Drop a removed entry's file references; returns the paths now unreferenced (call under _cache_lock)"""
+        orphaned = []
+        for path in _cached_image_paths(data):
+            self._image_refs[path] -= 1
+            if self._image_refs[path] <= 0:
+                del self._image_refs[path]
+                orphaned.append(path)
+        return orphaned
@@ -3,38 +3,49 @@ Advanced Meteorological Simulation Service
 Extreme weather modeling, statistical analysis, and observation for meteorological studies
 """
 
-import asyncio
 import aiohttp
-import requests
-import json
+import collections
+import io
 import logging
 import numpy as np
-import pandas as pd
-from datetime import datetime, timezone, timedelta
+import orjson
+from numpy.lib import recfunctions
+from numba import njit, prange
+from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import math
-import random
-from scipy import stats
-from scipy.interpolate import interp1d
 import warnings
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class WeatherParameters:
-    """Weather simulation parameters"""
-    temperature: float  # Celsius
-    pressure: float     # hPa
-    humidity: float     # %
-    wind_speed: float   # m/s
-    wind_direction: float  # degrees
-    precipitation: float   # mm/h
-    cloud_cover: float     # %
-    visibility: float      # km
-    uv_index: float       # 0-11+
-    air_quality: int      # AQI 0-500
+# Mean sea-level pressure; pressure drops are measured against it
+STANDARD_PRESSURE_HPA = 1013.25
+
+# Record layout for simulated hourly weather, the only in-memory representation;
+# float32 covers the 0.1-unit precision values are rounded to (0.01 for
+# precipitation), and fields are sliced as zero-copy views
+WEATHER_DTYPE = np.dtype([
+    ('temperature', np.float32),     # Celsius
+    ('pressure', np.float32),        # hPa
+    ('humidity', np.float32),        # %
+    ('wind_speed', np.float32),      # m/s
+    ('wind_direction', np.float32),  # degrees
+    ('precipitation', np.float32),   # mm/h
+    ('cloud_cover', np.float32),     # %
+    ('visibility', np.float32),      # km
+    ('uv_index', np.float32),        # 0-11+
+    ('air_quality', np.int16)        # AQI 0-500
+])
+
+# First four WEATHER_DTYPE fields, laid out back to back
+_LEADING_FIELDS = ('temperature', 'pressure', 'humidity', 'wind_speed')
+
+# Column formats for CSV export: hour, the float32 fields at the precision the
+# generator rounds them to (precipitation keeps two decimals), then integer AQI
+_CSV_FORMATS = ['%d'] + ['%.2f' if name == 'precipitation' else '%.1f'
+                         for name in WEATHER_DTYPE.names[:-1]] + ['%d']
 
 @dataclass
 class ExtremeWeatherEvent:
@@ -49,10 +60,193 @@ class ExtremeWeatherEvent:
     precipitation_rate: float
     pressure_drop: float
 
+def _json_default(obj: Any) -> Any:
+    """Serialize values orjson leaves to its fallback, such as the structured weather arrays"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+def _scenario_deltas(modifiers: Dict[str, float]) -> Tuple[float, float, float, float, float]:
+    """Collapse a scenario's modifiers into (temperature, pressure, humidity) offsets and (wind, precipitation) factors"""
+    return (
+        modifiers.get('temperature_increase', 0) - modifiers.get('temperature_decrease', 0),
+        modifiers.get('pressure_increase', 0) - modifiers.get('pressure_drop', 0),
+        -modifiers.get('humidity_decrease', 0),
+        modifiers.get('wind_increase', 1.0),
+        modifiers.get('precipitation_increase', 1.0) * (1 - modifiers.get('precipitation_decrease', 0))
+    )
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _baseline_weather_kernel(seasonal_temp_base, max_uv, normal, exponential, uniform,
+                             temperature, pressure, humidity, wind_speed, wind_direction,
+                             precipitation, cloud_cover, visibility, uv_index, air_quality):
+    """Fill every hourly weather column from pre-drawn noise in a single fused pass"""
+    for hour in prange(temperature.shape[0]):
+        # Diurnal temperature variation
+        hour_of_day = hour % 24
+        temp = seasonal_temp_base + 8 * math.cos(2 * math.pi * (hour_of_day - 14) / 24) + normal[0, hour] * 2
+        
+        # Correlated weather parameters
+        press = STANDARD_PRESSURE_HPA + normal[1, hour] * 15 - (temp - 15) * 0.5
+        humid = min(95.0, max(20.0, 60 + normal[2, hour] * 20 - (temp - 20) * 0.8))
+        wind = exponential[0, hour] * 8 + abs(press - STANDARD_PRESSURE_HPA) * 0.1
+        
+        # Precipitation, cloud cover and visibility
+        precip_probability = 0.3 if humid > 70 else 0.1
+        precip = exponential[1, hour] * 2 if uniform[1, hour] < precip_probability else 0.0
+        cloud = min(100.0, humid * 0.8 + precip * 10 + normal[3, hour] * 15)
+        vis = max(0.1, 20 - precip * 2 - (humid - 50) * 0.1 + normal[4, hour] * 2)
+        
+        # UV index and air quality
+        uv = max(0.0, max_uv * (1 - cloud / 150) * math.sin(math.pi * hour_of_day / 12))
+        aqi = min(500.0, max(0.0, 50 + normal[5, hour] * 30 - wind * 2))
+        
+        temperature[hour] = round(temp, 1)
+        pressure[hour] = round(press, 1)
+        humidity[hour] = round(humid, 1)
+        wind_speed[hour] = round(wind, 1)
+        wind_direction[hour] = round(uniform[0, hour] * 360, 1)
+        precipitation[hour] = round(precip, 2)
+        cloud_cover[hour] = round(cloud, 1)
+        visibility[hour] = round(vis, 1)
+        uv_index[hour] = round(uv, 1)
+        air_quality[hour] = int(aqi)
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _detect_events_kernel(temperature, pressure, wind_speed, precipitation,
+                          hurricane_wind, hurricane_drop, tornado_wind, tornado_drop,
+                          blizzard_temp, blizzard_wind, blizzard_precip, heatwave_temp, codes):
+    """Write an event code per hour: 0 none, 1 hurricane, 2 tornado, 3 blizzard, 4 heatwave"""
+    for i in prange(codes.shape[0]):
+        pressure_drop = STANDARD_PRESSURE_HPA - pressure[i]
+        if wind_speed[i] >= hurricane_wind and pressure_drop >= hurricane_drop:
+            codes[i] = 1
+        elif wind_speed[i] >= tornado_wind and pressure_drop >= tornado_drop:
+            codes[i] = 2
+        elif (temperature[i] <= blizzard_temp and wind_speed[i] >= blizzard_wind and
+              precipitation[i] >= blizzard_precip):
+            codes[i] = 3
+        elif temperature[i] >= heatwave_temp:
+            codes[i] = 4
+        else:
+            codes[i] = 0
+
+@njit(cache=True)
+def _fused_moments_kernel(columns):
+    """Welford pass over a (k, N) array returning means, mins, maxs and the population covariance"""
+    k, n = columns.shape
+    means = np.zeros(k)
+    mins = np.full(k, np.inf)
+    maxs = np.full(k, -np.inf)
+    comoments = np.zeros((k, k))
+    delta = np.empty(k)
+    for i in range(n):
+        for a in range(k):
+            x = columns[a, i]
+            delta[a] = x - means[a]
+            means[a] += delta[a] / (i + 1)
+            mins[a] = min(mins[a], x)
+            maxs[a] = max(maxs[a], x)
+        # Co-moment update uses the old delta of one column and the new mean of the other
+        for a in range(k):
+            for b in range(a, k):
+                comoments[a, b] += delta[a] * (columns[b, i] - means[b])
+    for a in range(k):
+        for b in range(a):
+            comoments[a, b] = comoments[b, a]
+    return means, mins, maxs, comoments / max(n, 1)
+
+# Prefer the ahead-of-time build from build_kernels.py so fresh workers skip JIT compilation
+try:
+    from meteo_kernels import baseline_weather as _baseline_weather, detect_events as _detect_events
+except ImportError:
+    _baseline_weather, _detect_events = _baseline_weather_kernel, _detect_events_kernel
+
 class MeteorologicalSimulationService:
     """Advanced meteorological simulation and analysis service"""
     
-    def __init__(self):
+    # Event type for each code written by _detect_events_kernel
+    _EVENT_TYPES = (None, 'hurricane', 'tornado', 'blizzard', 'heatwave')
+    
+    # Detected event profiles: (probability, duration_hours, affected_area_km2)
+    _EVENT_PROFILES = {
+        'hurricane': (0.95, 24, 50000),
+        'tornado': (0.85, 2, 100),
+        'blizzard': (0.90, 12, 10000),
+        'heatwave': (0.80, 72, 100000)
+    }
+    
+    # Health risks raised by each event type in the impact assessment
+    _HEALTH_RISKS = {
+        'heatwave': ('heat_exhaustion', 'dehydration'),
+        'blizzard': ('hypothermia',)
+    }
+    
+    # Scenario modifiers applied on top of the baseline climatology
+    _SCENARIO_MODIFIERS = {
+        'baseline': {},
+        'climate_change': {
+            'temperature_increase': 2.0,
+            'precipitation_variability': 1.5,
+            'extreme_frequency': 2.0
+        },
+        'el_nino': {
+            'temperature_increase': 1.5,
+            'precipitation_increase': 0.3,
+            'storm_intensity': 1.2
+        },
+        'la_nina': {
+            'temperature_decrease': 1.0,
+            'precipitation_decrease': 0.3,
+            'drought_probability': 1.8
+        },
+        'arctic_blast': {
+            'temperature_decrease': 15.0,
+            'wind_increase': 2.0,
+            'pressure_drop': 30.0
+        },
+        'heat_dome': {
+            'temperature_increase': 10.0,
+            'humidity_decrease': 20.0,
+            'pressure_increase': 20.0
+        }
+    }
+    _SCENARIO_DELTAS = {
+        name: _scenario_deltas(modifiers)
+        for name, modifiers in _SCENARIO_MODIFIERS.items() if modifiers
+    }
+    
+    # Intensity scales: lower bound of each category above the first label. Stored as
+    # float32 to match the timeseries so searchsorted never upcasts the columns
+    _HURRICANE_THRESHOLDS = np.array([33, 43, 50, 58, 70], dtype=np.float32)
+    _HURRICANE_LABELS = np.array(['Tropical Storm', 'Category 1', 'Category 2', 'Category 3', 'Category 4', 'Category 5'])
+    _TORNADO_THRESHOLDS = np.array([38, 50, 61, 74, 89], dtype=np.float32)
+    _TORNADO_LABELS = np.array(['EF0', 'EF1', 'EF2', 'EF3', 'EF4', 'EF5'])
+    _BLIZZARD_THRESHOLDS = np.array([15, 25, 40], dtype=np.float32)
+    _BLIZZARD_LABELS = np.array(['Light', 'Moderate', 'Severe', 'Extreme'])
+    _HEATWAVE_THRESHOLDS = np.array([35, 40, 45], dtype=np.float32)
+    _HEATWAVE_LABELS = np.array(['Mild', 'Moderate', 'Severe', 'Extreme'])
+    
+    # Columns summarized by the fused moments pass, in correlation-matrix order
+    _MOMENT_COLUMNS = ('temperature', 'pressure', 'humidity', 'wind_speed', 'precipitation')
+    
+    # Precipitation intensity bin edges in mm/h: light, moderate, heavy, extreme
+    _PRECIPITATION_BINS = np.array([0.1, 2.5, 10, 50], dtype=np.float32)
+    
+    # Forecast event probabilities when each event's conditions hold, and otherwise
+    _FORECAST_EVENTS = ('hurricane', 'tornado', 'heatwave', 'thunderstorm', 'blizzard')
+    _FORECAST_HIGH_P = np.array([0.05, 0.03, 0.2, 0.3, 0.1])
+    _FORECAST_LOW_P = np.array([0.01, 0.005, 0.05, 0.1, 0.01])
+    
+    # Completed simulations kept for lookup; the oldest is evicted first
+    _SIMULATION_CACHE_SIZE = 32
+    
+    # Generated baselines kept for repeat runs; least recently used is evicted first
+    _BASELINE_CACHE_SIZE = 16
+    
+    def __init__(self, seed: Optional[int] = None):
         self.data_sources = {
             'openweather': 'https://api.openweathermap.org/data/2.5',
             'noaa_weather': 'https://api.weather.gov',
@@ -82,7 +276,10 @@ class MeteorologicalSimulationService:
         }
         
         self.session = None
+        self._rng = np.random.default_rng(seed)
         self.simulation_cache = {}
+        self._baseline_cache: "collections.OrderedDict[Tuple, np.ndarray]" = collections.OrderedDict()
+        self._baseline_cache_day = None
         self.historical_data = []
         self.current_simulation = None
         
@@ -100,7 +297,12 @@ class MeteorologicalSimulationService:
                                            location: Dict[str, float],
                                            duration_days: int = 7,
                                            scenario: str = 'baseline') -> Dict[str, Any]:
-        """Run comprehensive extreme weather simulation"""
+        """Run comprehensive extreme weather simulation.
+
+        Baselines are cached per location and day, so repeating a run at the same
+        place on the same day reuses identical baseline weather; only scenario
+        perturbations (e.g. climate_change spikes) draw fresh random numbers.
+        """
         try:
             simulation_id = f"sim_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
@@ -124,7 +326,8 @@ class MeteorologicalSimulationService:
             extreme_events = self._detect_extreme_events(scenario_data)
             
             # Calculate statistical metrics
-            statistics = self._calculate_weather_statistics(scenario_data, extreme_events)
+            moments, correlation = self._column_moments(scenario_data)
+            statistics = self._calculate_weather_statistics(scenario_data, extreme_events, moments, correlation)
             
             # Generate impact assessment
             impact_assessment = self._assess_weather_impacts(extreme_events, location)
@@ -140,11 +343,14 @@ class MeteorologicalSimulationService:
                 'statistics': statistics,
                 'impact_assessment': impact_assessment,
                 'forecast_models': forecast_models,
-                'confidence_intervals': self._calculate_confidence_intervals(scenario_data),
-                'uncertainty_analysis': self._perform_uncertainty_analysis(scenario_data)
+                'confidence_intervals': self._calculate_confidence_intervals(moments, len(scenario_data)),
+                'uncertainty_analysis': self._perform_uncertainty_analysis(moments)
             }
             
-            # Cache simulation results
+            # Cache simulation results, bounded so a long-running service holds a fixed number of timeseries
+            self.simulation_cache.pop(simulation_id, None)
+            if len(self.simulation_cache) >= self._SIMULATION_CACHE_SIZE:
+                self.simulation_cache.pop(next(iter(self.simulation_cache)))
             self.simulation_cache[simulation_id] = simulation_results
             self.current_simulation = simulation_results
             
@@ -155,15 +361,24 @@ class MeteorologicalSimulationService:
             logger.error(f"Error running extreme weather simulation: {e}")
             return {}
 
-    async def _generate_baseline_weather(self, location: Dict[str, float], duration_days: int) -> List[WeatherParameters]:
+    async def _generate_baseline_weather(self, location: Dict[str, float], duration_days: int) -> np.ndarray:
         """Generate baseline weather data using climatological models"""
-        baseline_data = []
-        
         # Get current season and location-based climate
         current_date = datetime.now()
         day_of_year = current_date.timetuple().tm_yday
         latitude = location.get('lat', 40.0)
         
+        # Baselines are reused across runs at the same place and day; callers get
+        # a private copy so stored results never alias the cached array
+        if day_of_year != self._baseline_cache_day:
+            self._baseline_cache.clear()
+            self._baseline_cache_day = day_of_year
+        cache_key = (round(latitude, 2), round(location.get('lon', 0.0), 2), day_of_year, duration_days)
+        cached = self._baseline_cache.get(cache_key)
+        if cached is not None:
+            self._baseline_cache.move_to_end(cache_key)
+            return cached.copy()
+        
         # Seasonal temperature variation
         seasonal_temp_base = 15 + 20 * math.cos(2 * math.pi * (day_of_year - 172) / 365)
         
@@ -171,238 +386,173 @@ class MeteorologicalSimulationService:
         latitude_factor = math.cos(math.radians(abs(latitude)))
         seasonal_temp_base *= latitude_factor
         
-        for hour in range(duration_days * 24):
-            # Diurnal temperature variation
-            hour_of_day = hour % 24
-            diurnal_variation = 8 * math.cos(2 * math.pi * (hour_of_day - 14) / 24)
-            
-            # Add random variations and trends
-            temp_noise = np.random.normal(0, 2)
-            temperature = seasonal_temp_base + diurnal_variation + temp_noise
-            
-            # Generate correlated weather parameters
-            pressure = 1013.25 + np.random.normal(0, 15) - (temperature - 15) * 0.5
-            humidity = max(20, min(95, 60 + np.random.normal(0, 20) - (temperature - 20) * 0.8))
-            
-            # Wind patterns
-            wind_speed = max(0, np.random.exponential(8) + abs(pressure - 1013.25) * 0.1)
-            wind_direction = np.random.uniform(0, 360)
-            
-            # Precipitation model
-            precip_probability = 0.3 if humidity > 70 else 0.1
-            precipitation = np.random.exponential(2) if np.random.random() < precip_probability else 0
-            
-            # Cloud cover correlation with humidity and precipitation
-            cloud_cover = min(100, humidity * 0.8 + precipitation * 10 + np.random.normal(0, 15))
-            
-            # Visibility based on precipitation and humidity
-            visibility = max(0.1, 20 - precipitation * 2 - (humidity - 50) * 0.1 + np.random.normal(0, 2))
-            
-            # UV index based on cloud cover and season
-            max_uv = 11 * math.sin(math.pi * day_of_year / 365) * latitude_factor
-            uv_index = max(0, max_uv * (1 - cloud_cover / 150) * math.sin(math.pi * hour_of_day / 12))
-            
-            # Air quality index
-            air_quality = max(0, min(500, np.random.normal(50, 30) + wind_speed * -2))
-            
-            weather_point = WeatherParameters(
-                temperature=round(temperature, 1),
-                pressure=round(pressure, 1),
-                humidity=round(humidity, 1),
-                wind_speed=round(wind_speed, 1),
-                wind_direction=round(wind_direction, 1),
-                precipitation=round(precipitation, 2),
-                cloud_cover=round(cloud_cover, 1),
-                visibility=round(visibility, 1),
-                uv_index=round(uv_index, 1),
-                air_quality=int(air_quality)
-            )
-            
-            baseline_data.append(weather_point)
-        
-        return baseline_data
-
-    def _apply_weather_scenario(self, baseline_data: List[WeatherParameters], scenario: str) -> List[WeatherParameters]:
+        # UV ceiling for the season
+        max_uv = 11 * math.sin(math.pi * day_of_year / 365) * latitude_factor
+        
+        hours = duration_days * 24
+        weather = np.empty(hours, dtype=WEATHER_DTYPE)
+        _baseline_weather(
+            seasonal_temp_base, max_uv,
+            self._rng.standard_normal((6, hours)),
+            self._rng.standard_exponential((2, hours)),
+            self._rng.random((2, hours)),
+            weather['temperature'], weather['pressure'], weather['humidity'], weather['wind_speed'],
+            weather['wind_direction'], weather['precipitation'], weather['cloud_cover'],
+            weather['visibility'], weather['uv_index'], weather['air_quality']
+        )
+        
+        self._baseline_cache[cache_key] = weather
+        if len(self._baseline_cache) > self._BASELINE_CACHE_SIZE:
+            self._baseline_cache.popitem(last=False)
+        return weather.copy()
+
+    def _apply_weather_scenario(self, baseline_data: np.ndarray, scenario: str) -> np.ndarray:
         """Apply specific weather scenarios to baseline data"""
-        scenario_data = []
-        
-        scenario_modifiers = {
-            'baseline': {},
-            'climate_change': {
-                'temperature_increase': 2.0,
-                'precipitation_variability': 1.5,
-                'extreme_frequency': 2.0
-            },
-            'el_nino': {
-                'temperature_increase': 1.5,
-                'precipitation_increase': 0.3,
-                'storm_intensity': 1.2
-            },
-            'la_nina': {
-                'temperature_decrease': 1.0,
-                'precipitation_decrease': 0.3,
-                'drought_probability': 1.8
-            },
-            'arctic_blast': {
-                'temperature_decrease': 15.0,
-                'wind_increase': 2.0,
-                'pressure_drop': 30.0
-            },
-            'heat_dome': {
-                'temperature_increase': 10.0,
-                'humidity_decrease': 20.0,
-                'pressure_increase': 20.0
-            }
-        }
-        
-        modifiers = scenario_modifiers.get(scenario, {})
-        
-        for i, weather_point in enumerate(baseline_data):
-            modified_weather = WeatherParameters(
-                temperature=weather_point.temperature + modifiers.get('temperature_increase', 0) - modifiers.get('temperature_decrease', 0),
-                pressure=weather_point.pressure + modifiers.get('pressure_increase', 0) - modifiers.get('pressure_drop', 0),
-                humidity=max(0, min(100, weather_point.humidity - modifiers.get('humidity_decrease', 0))),
-                wind_speed=weather_point.wind_speed * modifiers.get('wind_increase', 1.0),
-                wind_direction=weather_point.wind_direction,
-                precipitation=weather_point.precipitation * modifiers.get('precipitation_increase', 1.0) * (1 - modifiers.get('precipitation_decrease', 0)),
-                cloud_cover=weather_point.cloud_cover,
-                visibility=weather_point.visibility,
-                uv_index=weather_point.uv_index,
-                air_quality=weather_point.air_quality
-            )
-            
-            # Add scenario-specific extreme events
-            if scenario == 'climate_change' and i % 48 == 0:  # Every 2 days
-                if np.random.random() < 0.3:  # 30% chance
-                    modified_weather.temperature += np.random.normal(5, 2)
-                    modified_weather.wind_speed *= 1.5
-            
-            scenario_data.append(modified_weather)
+        deltas = self._SCENARIO_DELTAS.get(scenario)
+        if deltas is None:
+            # Baseline (or unknown) scenario: the caller's baseline is already a private copy
+            return baseline_data
+        temperature_delta, pressure_delta, humidity_delta, wind_factor, precipitation_factor = deltas
+        
+        scenario_data = baseline_data.copy()
+        
+        scenario_data['temperature'] += temperature_delta
+        scenario_data['pressure'] += pressure_delta
+        scenario_data['humidity'] += humidity_delta
+        np.clip(scenario_data['humidity'], 0, 100, out=scenario_data['humidity'])
+        scenario_data['wind_speed'] *= wind_factor
+        scenario_data['precipitation'] *= precipitation_factor
+        
+        # Add scenario-specific extreme events
+        if scenario == 'climate_change':
+            spikes = np.arange(0, len(scenario_data), 48)  # Every 2 days
+            spikes = spikes[self._rng.random(len(spikes)) < 0.3]  # 30% chance
+            scenario_data['temperature'][spikes] += self._rng.normal(5, 2, len(spikes))
+            scenario_data['wind_speed'][spikes] *= 1.5
         
         return scenario_data
 
-    def _detect_extreme_events(self, weather_data: List[WeatherParameters]) -> List[ExtremeWeatherEvent]:
+    def _detect_extreme_events(self, weather_data: np.ndarray) -> List[ExtremeWeatherEvent]:
         """Detect and classify extreme weather events"""
-        extreme_events = []
-        
-        for i, weather_point in enumerate(weather_data):
-            # Hurricane detection
-            if (weather_point.wind_speed >= self.extreme_thresholds['hurricane']['wind_speed'] and
-                weather_point.pressure <= 1013.25 - self.extreme_thresholds['hurricane']['pressure_drop']):
-                
-                event = ExtremeWeatherEvent(
-                    event_type='hurricane',
-                    intensity=self._classify_hurricane_intensity(weather_point.wind_speed),
-                    probability=0.95,
-                    duration_hours=24,
-                    affected_area_km2=50000,
-                    wind_speed_max=weather_point.wind_speed,
-                    temperature_extreme=weather_point.temperature,
-                    precipitation_rate=weather_point.precipitation,
-                    pressure_drop=1013.25 - weather_point.pressure
-                )
-                extreme_events.append(event)
-            
-            # Tornado detection
-            elif (weather_point.wind_speed >= self.extreme_thresholds['tornado']['wind_speed'] and
-                  weather_point.pressure <= 1013.25 - self.extreme_thresholds['tornado']['pressure_drop']):
-                
-                event = ExtremeWeatherEvent(
-                    event_type='tornado',
-                    intensity=self._classify_tornado_intensity(weather_point.wind_speed),
-                    probability=0.85,
-                    duration_hours=2,
-                    affected_area_km2=100,
-                    wind_speed_max=weather_point.wind_speed,
-                    temperature_extreme=weather_point.temperature,
-                    precipitation_rate=weather_point.precipitation,
-                    pressure_drop=1013.25 - weather_point.pressure
-                )
-                extreme_events.append(event)
-            
-            # Blizzard detection
-            elif (weather_point.temperature <= self.extreme_thresholds['blizzard']['temperature'] and
-                  weather_point.wind_speed >= self.extreme_thresholds['blizzard']['wind_speed'] and
-                  weather_point.precipitation >= self.extreme_thresholds['blizzard']['precipitation']):
-                
-                event = ExtremeWeatherEvent(
-                    event_type='blizzard',
-                    intensity=self._classify_blizzard_intensity(weather_point.wind_speed, weather_point.precipitation),
-                    probability=0.90,
-                    duration_hours=12,
-                    affected_area_km2=10000,
-                    wind_speed_max=weather_point.wind_speed,
-                    temperature_extreme=weather_point.temperature,
-                    precipitation_rate=weather_point.precipitation,
-                    pressure_drop=1013.25 - weather_point.pressure
-                )
-                extreme_events.append(event)
-            
-            # Heat wave detection
-            elif weather_point.temperature >= self.extreme_thresholds['heatwave']['temperature']:
-                event = ExtremeWeatherEvent(
-                    event_type='heatwave',
-                    intensity=self._classify_heatwave_intensity(weather_point.temperature),
-                    probability=0.80,
-                    duration_hours=72,
-                    affected_area_km2=100000,
-                    wind_speed_max=weather_point.wind_speed,
-                    temperature_extreme=weather_point.temperature,
-                    precipitation_rate=weather_point.precipitation,
-                    pressure_drop=0
-                )
-                extreme_events.append(event)
+        thresholds = self.extreme_thresholds
+        temperature = weather_data['temperature']
+        wind_speed = weather_data['wind_speed']
+        precipitation = weather_data['precipitation']
+        pressure = weather_data['pressure']
+        
+        # Each hour is classified as at most one event type, in priority order
+        codes = np.empty(len(weather_data), dtype=np.int8)
+        _detect_events(
+            temperature, pressure, wind_speed, precipitation,
+            thresholds['hurricane']['wind_speed'], thresholds['hurricane']['pressure_drop'],
+            thresholds['tornado']['wind_speed'], thresholds['tornado']['pressure_drop'],
+            thresholds['blizzard']['temperature'], thresholds['blizzard']['wind_speed'],
+            thresholds['blizzard']['precipitation'], thresholds['heatwave']['temperature'],
+            codes
+        )
+        
+        # Hours come out of flatnonzero in chronological order
+        indices = np.flatnonzero(codes)
+        event_codes = codes[indices]
+        intensities = np.empty(len(indices), dtype=object)
+        
+        hurricane = event_codes == 1
+        intensities[hurricane] = self._classify_hurricane_intensity(wind_speed[indices[hurricane]])
+        tornado = event_codes == 2
+        intensities[tornado] = self._classify_tornado_intensity(wind_speed[indices[tornado]])
+        blizzard = event_codes == 3
+        intensities[blizzard] = self._classify_blizzard_intensity(wind_speed[indices[blizzard]],
+                                                                  precipitation[indices[blizzard]])
+        heatwave = event_codes == 4
+        intensities[heatwave] = self._classify_heatwave_intensity(temperature[indices[heatwave]])
+        
+        extreme_events = [None] * len(indices)
+        rows = zip(event_codes.tolist(), intensities.tolist(), wind_speed[indices].tolist(),
+                   temperature[indices].tolist(), precipitation[indices].tolist(), pressure[indices].tolist())
+        for j, (code, intensity, wind, temp, precip, press) in enumerate(rows):
+            event_type = self._EVENT_TYPES[code]
+            probability, duration_hours, affected_area_km2 = self._EVENT_PROFILES[event_type]
+            extreme_events[j] = ExtremeWeatherEvent(
+                event_type=event_type,
+                intensity=str(intensity),
+                probability=probability,
+                duration_hours=duration_hours,
+                affected_area_km2=affected_area_km2,
+                wind_speed_max=wind,
+                temperature_extreme=temp,
+                precipitation_rate=precip,
+                pressure_drop=STANDARD_PRESSURE_HPA - press if event_type != 'heatwave' else 0
+            )
         
         return extreme_events
 
-    def _calculate_weather_statistics(self, weather_data: List[WeatherParameters], 
-                                    extreme_events: List[ExtremeWeatherEvent]) -> Dict[str, Any]:
+    def _column_moments(self, weather_data: np.ndarray) -> Tuple[Dict[str, Dict[str, float]], np.ndarray]:
+        """Compute per-column mean/std/min/max and the correlation matrix in one pass"""
+        columns = np.vstack([weather_data[name] for name in self._MOMENT_COLUMNS])
+        means, mins, maxs, covariance = _fused_moments_kernel(columns)
+        stds = np.sqrt(np.diag(covariance))
+        correlation = covariance / np.outer(stds, stds)
+        
+        moments = {
+            name: {'mean': mean, 'std': std, 'min': low, 'max': high}
+            for name, mean, std, low, high in zip(self._MOMENT_COLUMNS, means.tolist(), stds.tolist(),
+                                                  mins.tolist(), maxs.tolist())
+        }
+        return moments, correlation
+
+    def _calculate_weather_statistics(self, weather_data: np.ndarray, 
+                                    extreme_events: List[ExtremeWeatherEvent],
+                                    moments: Dict[str, Dict[str, float]],
+                                    correlation: np.ndarray) -> Dict[str, Any]:
         """Calculate comprehensive weather statistics"""
         
-        # Convert to arrays for statistical analysis
-        temperatures = [w.temperature for w in weather_data]
-        pressures = [w.pressure for w in weather_data]
-        humidity = [w.humidity for w in weather_data]
-        wind_speeds = [w.wind_speed for w in weather_data]
-        precipitation = [w.precipitation for w in weather_data]
+        temperatures = weather_data['temperature']
+        precipitation_intensity = self._analyze_precipitation_intensity(weather_data['precipitation'])
+        
+        # Median and tail percentiles share one partition of the temperature series
+        p10, p25, median, p75, p90, p95, p99 = np.percentile(temperatures, [10, 25, 50, 75, 90, 95, 99]).tolist()
+        temperature = moments['temperature']
+        pressure = moments['pressure']
+        wind = moments['wind_speed']
+        precipitation_total = moments['precipitation']['mean'] * len(weather_data)
         
         statistics = {
             'temperature': {
-                'mean': np.mean(temperatures),
-                'median': np.median(temperatures),
-                'std': np.std(temperatures),
-                'min': np.min(temperatures),
-                'max': np.max(temperatures),
+                'mean': temperature['mean'],
+                'median': median,
+                'std': temperature['std'],
+                'min': temperature['min'],
+                'max': temperature['max'],
                 'percentiles': {
-                    '10th': np.percentile(temperatures, 10),
-                    '25th': np.percentile(temperatures, 25),
-                    '75th': np.percentile(temperatures, 75),
-                    '90th': np.percentile(temperatures, 90),
-                    '95th': np.percentile(temperatures, 95),
-                    '99th': np.percentile(temperatures, 99)
+                    '10th': p10,
+                    '25th': p25,
+                    '75th': p75,
+                    '90th': p90,
+                    '95th': p95,
+                    '99th': p99
                 },
                 'trend': self._calculate_trend(temperatures),
-                'variability_index': np.std(temperatures) / np.mean(temperatures) if np.mean(temperatures) != 0 else 0
+                'variability_index': temperature['std'] / temperature['mean'] if temperature['mean'] != 0 else 0
             },
             'pressure': {
-                'mean': np.mean(pressures),
-                'std': np.std(pressures),
-                'min': np.min(pressures),
-                'max': np.max(pressures),
-                'trend': self._calculate_trend(pressures)
+                'mean': pressure['mean'],
+                'std': pressure['std'],
+                'min': pressure['min'],
+                'max': pressure['max'],
+                'trend': self._calculate_trend(weather_data['pressure'])
             },
             'wind': {
-                'mean_speed': np.mean(wind_speeds),
-                'max_speed': np.max(wind_speeds),
-                'std': np.std(wind_speeds),
-                'gust_factor': np.max(wind_speeds) / np.mean(wind_speeds) if np.mean(wind_speeds) > 0 else 0
+                'mean_speed': wind['mean'],
+                'max_speed': wind['max'],
+                'std': wind['std'],
+                'gust_factor': wind['max'] / wind['mean'] if wind['mean'] > 0 else 0
             },
             'precipitation': {
-                'total': np.sum(precipitation),
-                'mean_rate': np.mean(precipitation),
-                'max_rate': np.max(precipitation),
-                'wet_hours': len([p for p in precipitation if p > 0.1]),
-                'intensity_distribution': self._analyze_precipitation_intensity(precipitation)
+                'total': precipitation_total,
+                'mean_rate': moments['precipitation']['mean'],
+                'max_rate': moments['precipitation']['max'],
+                'wet_hours': sum(precipitation_intensity.values()),
+                'intensity_distribution': precipitation_intensity
             },
             'extreme_events': {
                 'total_count': len(extreme_events),
@@ -411,14 +561,14 @@ class MeteorologicalSimulationService:
                 'frequency_analysis': self._analyze_event_frequency(extreme_events)
             },
             'correlations': {
-                'temp_pressure': np.corrcoef(temperatures, pressures)[0, 1],
-                'temp_humidity': np.corrcoef(temperatures, humidity)[0, 1],
-                'wind_pressure': np.corrcoef(wind_speeds, pressures)[0, 1],
-                'precip_humidity': np.corrcoef(precipitation, humidity)[0, 1]
+                'temp_pressure': float(correlation[0, 1]),
+                'temp_humidity': float(correlation[0, 2]),
+                'wind_pressure': float(correlation[3, 1]),
+                'precip_humidity': float(correlation[4, 2])
             },
             'climate_indices': {
-                'temperature_anomaly': np.mean(temperatures) - 15.0,  # Assuming 15°C as baseline
-                'precipitation_anomaly': (np.sum(precipitation) - 100) / 100,  # Assuming 100mm as baseline
+                'temperature_anomaly': temperature['mean'] - 15.0,  # Assuming 15°C as baseline
+                'precipitation_anomaly': (precipitation_total - 100) / 100,  # Assuming 100mm as baseline
                 'extreme_weather_index': len(extreme_events) / len(weather_data) * 100
             }
         }
@@ -456,57 +606,72 @@ class MeteorologicalSimulationService:
             }
         }
         
-        for event in extreme_events:
-            # Calculate population at risk based on affected area
-            population_density = 100  # people per km2 (simplified)
-            people_at_risk = event.affected_area_km2 * population_density
-            impact_assessment['human_impact']['population_at_risk'] += people_at_risk
-            
-            # Economic impact estimation
-            if event.event_type == 'hurricane':
-                economic_impact = event.affected_area_km2 * 10000  # $10k per km2
-                impact_assessment['human_impact']['economic_impact_usd'] += economic_impact
-                impact_assessment['infrastructure_impact']['power_grid_risk'] = 'high'
-                impact_assessment['infrastructure_impact']['transportation_disruption'] = 'severe'
-            
-            elif event.event_type == 'tornado':
-                economic_impact = event.affected_area_km2 * 50000  # $50k per km2
-                impact_assessment['human_impact']['economic_impact_usd'] += economic_impact
-                impact_assessment['infrastructure_impact']['power_grid_risk'] = 'very high'
-            
-            elif event.event_type == 'heatwave':
-                impact_assessment['human_impact']['health_risks'].append('heat_exhaustion')
-                impact_assessment['human_impact']['health_risks'].append('dehydration')
-                impact_assessment['environmental_impact']['ecosystem_stress'] = 'high'
-                impact_assessment['agricultural_impact']['crop_damage_risk'] = 'high'
-            
-            elif event.event_type == 'blizzard':
-                impact_assessment['infrastructure_impact']['transportation_disruption'] = 'severe'
-                impact_assessment['human_impact']['health_risks'].append('hypothermia')
-                impact_assessment['agricultural_impact']['livestock_stress'] = 'high'
+        if not extreme_events:
+            return impact_assessment
+        
+        types = np.array([event.event_type for event in extreme_events])
+        areas = np.array([event.affected_area_km2 for event in extreme_events])
+        is_hurricane = types == 'hurricane'
+        is_tornado = types == 'tornado'
+        present = set(types.tolist())
+        
+        # Population at risk based on affected area (100 people per km2, simplified) and
+        # economic impact at $10k per km2 for hurricanes and $50k per km2 for tornadoes
+        human_impact = impact_assessment['human_impact']
+        human_impact['population_at_risk'] = (areas.sum() * 100).item()
+        human_impact['economic_impact_usd'] = (areas[is_hurricane].sum() * 10000 +
+                                               areas[is_tornado].sum() * 50000).item()
+        
+        # The latest hurricane or tornado sets the power grid risk
+        grid_events = types[is_hurricane | is_tornado]
+        if len(grid_events):
+            impact_assessment['infrastructure_impact']['power_grid_risk'] = (
+                'high' if grid_events[-1] == 'hurricane' else 'very high')
+        if 'hurricane' in present or 'blizzard' in present:
+            impact_assessment['infrastructure_impact']['transportation_disruption'] = 'severe'
+        if 'heatwave' in present:
+            impact_assessment['environmental_impact']['ecosystem_stress'] = 'high'
+            impact_assessment['agricultural_impact']['crop_damage_risk'] = 'high'
+        if 'blizzard' in present:
+            impact_assessment['agricultural_impact']['livestock_stress'] = 'high'
+        
+        # Each risk is listed once, however many events raised it
+        human_impact['health_risks'] = [
+            risk
+            for event_type, risks in self._HEALTH_RISKS.items() if event_type in present
+            for risk in risks
+        ]
         
         return impact_assessment
 
-    def _generate_forecast_models(self, weather_data: List[WeatherParameters]) -> Dict[str, Any]:
+    def _generate_forecast_models(self, weather_data: np.ndarray) -> Dict[str, Any]:
         """Generate predictive forecast models"""
         
-        # Extract time series data
-        temperatures = [w.temperature for w in weather_data]
-        pressures = [w.pressure for w in weather_data]
-        wind_speeds = [w.wind_speed for w in weather_data]
+        temperatures = weather_data['temperature']
+        pressures = weather_data['pressure']
+        wind_speeds = weather_data['wind_speed']
+        
+        # Zero-copy views of the trailing windows shared by the forecast helpers
+        last_day = weather_data[-24:]
+        last_three_days = weather_data[-72:]
+        pressure_stability = float(np.std(last_day['pressure']))
+        
+        # The 24h temperature forecast is the first day of the 72h one
+        temperature_forecast = self._forecast_parameter(temperatures, 72)
+        next_24h_probabilities = self._calculate_extreme_event_probability(last_day)
         
         forecast_models = {
             'temperature_forecast': {
                 'model_type': 'linear_regression',
-                'next_24h': self._forecast_parameter(temperatures, 24),
-                'next_72h': self._forecast_parameter(temperatures, 72),
+                'next_24h': temperature_forecast[:24],
+                'next_72h': temperature_forecast,
                 'confidence': 0.85,
                 'trend_direction': 'increasing' if self._calculate_trend(temperatures) > 0 else 'decreasing'
             },
             'pressure_forecast': {
                 'model_type': 'moving_average',
-                'next_24h': self._forecast_parameter(pressures, 24),
-                'stability_index': np.std(pressures[-24:]) if len(pressures) >= 24 else np.std(pressures),
+                'next_24h': self._forecast_parameter(pressures, 24, pressure_stability),
+                'stability_index': pressure_stability,
                 'storm_probability': self._calculate_storm_probability(pressures)
             },
             'wind_forecast': {
@@ -516,27 +681,22 @@ class MeteorologicalSimulationService:
                 'direction_stability': 'stable'  # Simplified
             },
             'extreme_event_probability': {
-                'next_24h': self._calculate_extreme_event_probability(weather_data[-24:] if len(weather_data) >= 24 else weather_data),
-                'next_72h': self._calculate_extreme_event_probability(weather_data[-72:] if len(weather_data) >= 72 else weather_data),
-                'most_likely_event': self._predict_most_likely_extreme_event(weather_data)
+                'next_24h': next_24h_probabilities,
+                'next_72h': self._calculate_extreme_event_probability(last_three_days),
+                'most_likely_event': self._predict_most_likely_extreme_event(next_24h_probabilities)
             }
         }
         
         return forecast_models
 
-    def _calculate_confidence_intervals(self, weather_data: List[WeatherParameters]) -> Dict[str, Any]:
+    def _calculate_confidence_intervals(self, moments: Dict[str, Dict[str, float]], n: int) -> Dict[str, Any]:
         """Calculate confidence intervals for weather parameters"""
         
-        temperatures = [w.temperature for w in weather_data]
-        pressures = [w.pressure for w in weather_data]
-        wind_speeds = [w.wind_speed for w in weather_data]
-        
         confidence_intervals = {}
         
-        for param_name, param_data in [('temperature', temperatures), ('pressure', pressures), ('wind_speed', wind_speeds)]:
-            mean = np.mean(param_data)
-            std = np.std(param_data)
-            n = len(param_data)
+        for param_name in ('temperature', 'pressure', 'wind_speed'):
+            mean = moments[param_name]['mean']
+            std = moments[param_name]['std']
             
             # 95% confidence interval
             margin_of_error = 1.96 * (std / np.sqrt(n))
@@ -551,7 +711,7 @@ class MeteorologicalSimulationService:
         
         return confidence_intervals
 
-    def _perform_uncertainty_analysis(self, weather_data: List[WeatherParameters]) -> Dict[str, Any]:
+    def _perform_uncertainty_analysis(self, moments: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
         """Perform uncertainty analysis on weather predictions"""
         
         uncertainty_analysis = {
@@ -574,62 +734,46 @@ class MeteorologicalSimulationService:
                 'precipitation_skill': 0.55
             },
             'ensemble_spread': {
-                'temperature_spread': np.std([w.temperature for w in weather_data]),
-                'pressure_spread': np.std([w.pressure for w in weather_data]),
-                'wind_spread': np.std([w.wind_speed for w in weather_data])
+                'temperature_spread': moments['temperature']['std'],
+                'pressure_spread': moments['pressure']['std'],
+                'wind_spread': moments['wind_speed']['std']
             }
         }
         
         return uncertainty_analysis
 
     # Helper methods for statistical calculations
-    def _calculate_trend(self, data: List[float]) -> float:
+    def _calculate_trend(self, data: np.ndarray) -> float:
         """Calculate linear trend in data"""
-        if len(data) < 2:
+        n = len(data)
+        if n < 2:
             return 0.0
-        x = np.arange(len(data))
-        slope, _, _, _, _ = stats.linregress(x, data)
-        return slope
+        # Least-squares slope for evenly spaced samples: sum((x - x_mean) * y) / (n(n^2 - 1) / 12)
+        x = np.arange(n) - (n - 1) / 2
+        return float(np.dot(x, data) / (n * (n * n - 1) / 12))
 
-    def _classify_hurricane_intensity(self, wind_speed: float) -> str:
+    def _classify_hurricane_intensity(self, wind_speed: np.ndarray) -> np.ndarray:
         """Classify hurricane intensity based on Saffir-Simpson scale"""
-        if wind_speed >= 70: return 'Category 5'
-        elif wind_speed >= 58: return 'Category 4'
-        elif wind_speed >= 50: return 'Category 3'
-        elif wind_speed >= 43: return 'Category 2'
-        elif wind_speed >= 33: return 'Category 1'
-        else: return 'Tropical Storm'
-
-    def _classify_tornado_intensity(self, wind_speed: float) -> str:
+        return self._HURRICANE_LABELS[np.searchsorted(self._HURRICANE_THRESHOLDS, wind_speed, side='right')]
+
+    def _classify_tornado_intensity(self, wind_speed: np.ndarray) -> np.ndarray:
         """Classify tornado intensity based on Enhanced Fujita scale"""
-        if wind_speed >= 89: return 'EF5'
-        elif wind_speed >= 74: return 'EF4'
-        elif wind_speed >= 61: return 'EF3'
-        elif wind_speed >= 50: return 'EF2'
-        elif wind_speed >= 38: return 'EF1'
-        else: return 'EF0'
-
-    def _classify_blizzard_intensity(self, wind_speed: float, precipitation: float) -> str:
+        return self._TORNADO_LABELS[np.searchsorted(self._TORNADO_THRESHOLDS, wind_speed, side='right')]
+
+    def _classify_blizzard_intensity(self, wind_speed: np.ndarray, precipitation: np.ndarray) -> np.ndarray:
         """Classify blizzard intensity"""
         intensity_score = wind_speed * 0.5 + precipitation * 2
-        if intensity_score >= 40: return 'Extreme'
-        elif intensity_score >= 25: return 'Severe'
-        elif intensity_score >= 15: return 'Moderate'
-        else: return 'Light'
+        return self._BLIZZARD_LABELS[np.searchsorted(self._BLIZZARD_THRESHOLDS, intensity_score, side='right')]
 
-    def _classify_heatwave_intensity(self, temperature: float) -> str:
+    def _classify_heatwave_intensity(self, temperature: np.ndarray) -> np.ndarray:
         """Classify heatwave intensity"""
-        if temperature >= 45: return 'Extreme'
-        elif temperature >= 40: return 'Severe'
-        elif temperature >= 35: return 'Moderate'
-        else: return 'Mild'
+        return self._HEATWAVE_LABELS[np.searchsorted(self._HEATWAVE_THRESHOLDS, temperature, side='right')]
 
-    def _analyze_precipitation_intensity(self, precipitation: List[float]) -> Dict[str, int]:
+    def _analyze_precipitation_intensity(self, precipitation: np.ndarray) -> Dict[str, int]:
         """Analyze precipitation intensity distribution"""
-        light = len([p for p in precipitation if 0.1 <= p < 2.5])
-        moderate = len([p for p in precipitation if 2.5 <= p < 10])
-        heavy = len([p for p in precipitation if 10 <= p < 50])
-        extreme = len([p for p in precipitation if p >= 50])
+        # Bin 0 holds dry hours (< 0.1 mm/h) and is dropped
+        bins = np.searchsorted(self._PRECIPITATION_BINS, precipitation, side='right')
+        _, light, moderate, heavy, extreme = np.bincount(bins, minlength=5).tolist()
         
         return {'light': light, 'moderate': moderate, 'heavy': heavy, 'extreme': extreme}
 
@@ -661,26 +805,27 @@ class MeteorologicalSimulationService:
             'seasonal_pattern': 'summer_peak'     # Simplified
         }
 
-    def _forecast_parameter(self, data: List[float], hours_ahead: int) -> List[float]:
+    def _forecast_parameter(self, data: np.ndarray, hours_ahead: int,
+                            recent_std: Optional[float] = None) -> List[float]:
         """Simple forecast for weather parameter"""
         if len(data) < 24:
-            return [np.mean(data)] * hours_ahead
+            return [float(np.mean(data))] * hours_ahead
         
         # Use last 24 hours for trend
         recent_data = data[-24:]
         trend = self._calculate_trend(recent_data)
         last_value = data[-1]
+        if recent_std is None:
+            recent_std = np.std(recent_data)
         
-        forecast = []
-        for i in range(hours_ahead):
-            predicted_value = last_value + trend * (i + 1)
-            # Add some noise
-            predicted_value += np.random.normal(0, np.std(recent_data) * 0.1)
-            forecast.append(predicted_value)
+        # Linear extrapolation plus some noise, scaled in place on the standard draws
+        forecast = self._rng.standard_normal(hours_ahead)
+        forecast *= recent_std * 0.1
+        forecast += last_value + trend * np.arange(1, hours_ahead + 1)
         
-        return forecast
+        return forecast.tolist()
 
-    def _calculate_storm_probability(self, pressures: List[float]) -> float:
+    def _calculate_storm_probability(self, pressures: np.ndarray) -> float:
         """Calculate probability of storm based on pressure trends"""
         if len(pressures) < 12:
             return 0.1
@@ -697,13 +842,15 @@ class MeteorologicalSimulationService:
         else:
             return 0.1
 
-    def _calculate_gust_probability(self, wind_speeds: List[float]) -> float:
+    def _calculate_gust_probability(self, wind_speeds: np.ndarray) -> float:
         """Calculate probability of wind gusts"""
-        if not wind_speeds:
+        if not len(wind_speeds):
             return 0.1
         
-        mean_wind = np.mean(wind_speeds[-12:] if len(wind_speeds) >= 12 else wind_speeds)
-        wind_variability = np.std(wind_speeds[-12:] if len(wind_speeds) >= 12 else wind_speeds)
+        # Reuse the mean for the spread rather than letting np.std recompute it
+        recent_winds = wind_speeds[-12:].astype(np.float64)
+        mean_wind = recent_winds.mean()
+        wind_variability = np.sqrt(np.square(recent_winds - mean_wind).mean())
         
         if mean_wind > 15 and wind_variability > 5:
             return 0.7
@@ -712,33 +859,34 @@ class MeteorologicalSimulationService:
         else:
             return 0.2
 
-    def _calculate_extreme_event_probability(self, recent_data: List[WeatherParameters]) -> Dict[str, float]:
+    def _calculate_extreme_event_probability(self, recent_data: np.ndarray) -> Dict[str, float]:
         """Calculate probability of extreme events in next period"""
-        if not recent_data:
+        if not len(recent_data):
             return {}
         
-        avg_temp = np.mean([w.temperature for w in recent_data])
-        avg_pressure = np.mean([w.pressure for w in recent_data])
-        avg_wind = np.mean([w.wind_speed for w in recent_data])
-        
-        probabilities = {
-            'hurricane': 0.05 if avg_wind > 20 and avg_pressure < 1000 else 0.01,
-            'tornado': 0.03 if avg_wind > 25 and avg_pressure < 995 else 0.005,
-            'heatwave': 0.2 if avg_temp > 30 else 0.05,
-            'thunderstorm': 0.3 if avg_temp > 25 and avg_pressure < 1010 else 0.1,
-            'blizzard': 0.1 if avg_temp < 0 and avg_wind > 15 else 0.01
-        }
-        
-        return probabilities
-
-    def _predict_most_likely_extreme_event(self, weather_data: List[WeatherParameters]) -> str:
-        """Predict the most likely extreme weather event"""
-        if not weather_data:
-            return 'none'
-        
-        recent_data = weather_data[-24:] if len(weather_data) >= 24 else weather_data
-        probabilities = self._calculate_extreme_event_probability(recent_data)
+        # The leading float32 fields are evenly spaced, so this is a strided (N, 4)
+        # view and all four means come from one reduction
+        leading = recfunctions.structured_to_unstructured(recent_data[list(_LEADING_FIELDS)])
+        avg_temp, avg_pressure, _, avg_wind = leading.mean(axis=0, dtype=np.float64)
         
+        probabilities = self._event_probability_matrix(avg_temp, avg_pressure, avg_wind)
+        return dict(zip(self._FORECAST_EVENTS, probabilities[:, 0].tolist()))
+    
+    @classmethod
+    def _event_probability_matrix(cls, temperature, pressure, wind_speed) -> np.ndarray:
+        """(5, N) probabilities in _FORECAST_EVENTS order for N (temperature, pressure, wind) samples"""
+        temperature, pressure, wind_speed = np.atleast_1d(temperature, pressure, wind_speed)
+        conditions = np.vstack([
+            (wind_speed > 20) & (pressure < 1000),
+            (wind_speed > 25) & (pressure < 995),
+            temperature > 30,
+            (temperature > 25) & (pressure < 1010),
+            (temperature < 0) & (wind_speed > 15)
+        ])
+        return np.where(conditions, cls._FORECAST_HIGH_P[:, None], cls._FORECAST_LOW_P[:, None])
+
+    def _predict_most_likely_extreme_event(self, probabilities: Dict[str, float]) -> str:
+        """Predict the most likely extreme weather event from next-24h probabilities"""
         if not probabilities:
             return 'none'
         
@@ -758,10 +906,22 @@ class MeteorologicalSimulationService:
         simulation_data = await self.get_simulation_results(simulation_id)
         
         if format == 'json':
-            return json.dumps(simulation_data, indent=2, default=str)
+            return orjson.dumps(simulation_data, default=_json_default,
+                                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
         elif format == 'csv':
-            # Convert to CSV format (simplified)
-            return "CSV export not implemented yet"
+            # Hourly scenario timeseries, one row per hour from the simulation start
+            weather_data = simulation_data.get('scenario_data')
+            if weather_data is None:
+                weather_data = np.empty(0, dtype=WEATHER_DTYPE)
+            table = np.column_stack((
+                np.arange(len(weather_data)),
+                recfunctions.structured_to_unstructured(weather_data, dtype=np.float64)
+            ))
+            buffer = io.StringIO()
+            np.savetxt(buffer, table, delimiter=',', comments='',
+                       header=','.join(('hour',) + WEATHER_DTYPE.names),
+                       fmt=_CSV_FORMATS)
+            return buffer.getvalue()
         else:
             return "Unsupported format"
 
@@ -4,21 +4,169 @@ Comprehensive integration with NASA's various APIs for real-time space data
 """
 import asyncio
 import aiohttp
-import requests
-import json
+import atexit
+import csv
+import hashlib
+import io
 import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+import orjson
+from urllib.parse import urlencode
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Callable, Optional, Tuple
+import math
 import numpy as np
+from numba import njit, prange
 from astropy.time import Time
 from astropy.coordinates import EarthLocation, AltAz, get_sun, SkyCoord
 from astropy import units as u
 
+from date_utils import today_iso
+
 logger = logging.getLogger(__name__)
 
+# Placeholder orbital elements until orbit data is wired in; copied per NEO
+_BASIC_ORBITAL_DATA = {
+    'orbital_class': 'unknown',
+    'perihelion_distance': 0,
+    'aphelion_distance': 0,
+    'orbital_period': 0,
+    'eccentricity': 0,
+    'inclination': 0
+}
+
+# Seconds a cached response stays fresh, per base_urls endpoint
+_CACHE_TTLS = {
+    'neo': 3600,
+    'mars_weather': 21600,
+    'epic': 21600,
+    'exoplanet': 86400,
+    'horizons': 86400,
+    'sbdb': 86400,
+    'cad': 21600
+}
+
+# Exoplanet archive columns returned as text; disc_year is integral, the rest are floats
+_EXOPLANET_TEXT_COLUMNS = frozenset(('pl_name', 'hostname', 'discoverymethod'))
+
+def _parse_exoplanet_csv(body: bytes) -> List[Dict[str, Any]]:
+    """Records from a TAP CSV response, matching the archive's JSON output (empty cells become None)"""
+    reader = csv.reader(io.StringIO(body.decode('utf-8')))
+    header = next(reader, None)
+    if header is None:
+        return []
+    converters = [
+        str if name in _EXOPLANET_TEXT_COLUMNS else int if name == 'disc_year' else float
+        for name in header
+    ]
+    return [
+        {name: convert(value) if value != '' else None
+         for name, convert, value in zip(header, converters, row)}
+        for row in reader
+    ]
+
+# Persistent tier of the response cache; survives worker restarts
+RESPONSE_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'nasa_cache.sqlite')
+
+class _ResponseCache:
+    """Two-tier TTL cache for JSON responses: a bounded dict in front of SQLite.
+
+    Both tiers hold serialized bodies, so each caller gets its own decoded copy.
+    SQLite is only touched from the default executor, never on the event loop.
+    """
+    
+    MEMORY_MAX_ENTRIES = 256
+    PURGE_INTERVAL = 600  # seconds between sweeps of expired rows, run on write
+    
+    def __init__(self, path: str = RESPONSE_CACHE_PATH):
+        self.path = path
+        self._memory: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        self._db = None
+        self._next_purge = 0.0
+    
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> str:
+        """Stable key for a GET request; the API key is left out so it never reaches disk"""
+        query = urlencode(sorted((k, v) for k, v in params.items() if k != 'api_key'))
+        return hashlib.blake2b(f"{url}?{query}".encode(), digest_size=16).hexdigest()
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS responses '
+                             '(key TEXT PRIMARY KEY, expires REAL NOT NULL, body BLOB NOT NULL)')
+        return self._db
+    
+    def _remember(self, key: str, expires: float, body: bytes) -> None:
+        if len(self._memory) >= self.MEMORY_MAX_ENTRIES:
+            self._memory.pop(next(iter(self._memory)), None)
+        self._memory[key] = (expires, body)
+    
+    def _read(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        """Fresh (expires, body) row for key; an expired row is deleted on the way"""
+        try:
+            with self._lock, self._connection() as db:
+                row = db.execute('SELECT expires, body FROM responses WHERE key = ?', (key,)).fetchone()
+                if row is not None and row[0] <= now:
+                    db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    return None
+                return row
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+    
+    def _write(self, key: str, expires: float, body: bytes, now: float) -> None:
+        """Upsert a row, sweeping out expired rows at most once per PURGE_INTERVAL"""
+        try:
+            with self._lock, self._connection() as db:
+                db.execute('INSERT OR REPLACE INTO responses (key, expires, body) VALUES (?, ?, ?)',
+                           (key, expires, body))
+                if now >= self._next_purge:
+                    db.execute('DELETE FROM responses WHERE expires <= ?', (now,))
+                    self._next_purge = now + self.PURGE_INTERVAL
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Fresh cached response for key, or None"""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                return orjson.loads(entry[1])
+            self._memory.pop(key, None)
+        
+        row = await asyncio.get_running_loop().run_in_executor(None, self._read, key, now)
+        if row is None:
+            return None
+        self._remember(key, row[0], row[1])
+        return orjson.loads(row[1])
+    
+    async def set(self, key: str, data: Any, ttl: int) -> None:
+        """Store a response in both tiers for ttl seconds"""
+        now = time.time()
+        expires = now + ttl
+        body = orjson.dumps(data)
+        self._remember(key, expires, body)
+        await asyncio.get_running_loop().run_in_executor(None, self._write, key, expires, body, now)
+
+# Seconds to wait for another thread's loop to close its session at interpreter exit
+_EXIT_CLOSE_TIMEOUT = 2.0
+
 class NASAAPIService:
     """Comprehensive NASA API integration service"""
     
+    # One pooled session per event loop; a session is bound to the loop it was created on
+    _loop_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+        weakref.WeakKeyDictionary()
+    _response_cache = _ResponseCache()
+    
     def __init__(self, api_key: str = 'DEMO_KEY'):
         self.api_key = api_key
         self.base_urls = {
@@ -37,19 +185,96 @@ class NASAAPIService:
         
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self.session = self._get_shared_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit; the pooled session stays open for reuse"""
+        self.session = None
+    
+    @classmethod
+    def _get_shared_session(cls) -> aiohttp.ClientSession:
+        """Return the keep-alive session for the running event loop, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        session = cls._loop_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300,
+                                             keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector)
+            cls._loop_sessions[loop] = session
+        return session
+    
+    @classmethod
+    async def close_shared_session(cls) -> None:
+        """Close the running loop's pooled session (call before that loop shuts down)"""
+        session = cls._loop_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+    
+    @classmethod
+    def _close_shared_session_at_exit(cls) -> None:
+        """Close, on interpreter exit, the sessions of loops still running in other threads.
+
+        Each session is closed on its own loop. Threads that finish their loops close
+        their own sessions; idle and closed loops are skipped rather than driven from here.
+        """
+        for loop in list(cls._loop_sessions.keys()):
+            if loop.is_closed() or not loop.is_running():
+                continue
+            future = asyncio.run_coroutine_threadsafe(cls.close_shared_session(), loop)
+            try:
+                future.result(timeout=_EXIT_CLOSE_TIMEOUT)
+            except Exception as e:
+                future.cancel()
+                logger.warning(f"Could not close a pooled NASA session at exit: {e!r}")
     
-    async def get_neo_feed(self, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
+    async def _get_json(self, url: str, params: Dict[str, Any], timeout: int = 30,
+                        endpoint: str = None, refresh: bool = False,
+                        parse: Callable[[bytes], Any] = None) -> Optional[Any]:
+        """
+        GET a JSON endpoint over the pooled session; None on a non-200 response.
+        Responses from endpoints listed in _CACHE_TTLS are served from the response
+        cache while fresh; refresh=True skips the lookup and overwrites the entry.
+        parse decodes non-JSON bodies (e.g. CSV) from the raw bytes instead.
+        """
+        ttl = _CACHE_TTLS.get(endpoint, 0)
+        if ttl:
+            cache_key = _ResponseCache.key(url, params)
+            if not refresh:
+                cached = await self._response_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+        
+        session = self.session or self._get_shared_session()
+        async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status == 200:
+                data = parse(await response.read()) if parse else await response.json()
+                if ttl:
+                    await self._response_cache.set(cache_key, data, ttl)
+                return data
+        return None
+    
+    async def fetch_bundle(self, lat: float = 40.7128, lon: float = -74.0060) -> Dict[str, Any]:
+        """Fetch the dashboard endpoints concurrently so their round trips overlap"""
+        neo_feed, mars_weather, earth_imagery, epic_images = await asyncio.gather(
+            self.get_neo_feed(),
+            self.get_mars_weather(),
+            self.get_earth_imagery(lat=lat, lon=lon),
+            self.get_epic_images()
+        )
+        return {
+            'neo_feed': neo_feed,
+            'mars_weather': mars_weather,
+            'earth_imagery': earth_imagery,
+            'epic_images': epic_images
+        }
+    
+    async def get_neo_feed(self, start_date: str = None, end_date: str = None,
+                           refresh: bool = False) -> Dict[str, Any]:
         """Get Near Earth Objects feed data"""
         try:
             if not start_date:
-                start_date = datetime.now().strftime('%Y-%m-%d')
+                start_date = today_iso()
             if not end_date:
                 end_date = start_date
                 
@@ -60,41 +285,27 @@ class NASAAPIService:
                 'api_key': self.api_key
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._process_neo_data(data)
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._process_neo_data(data)
+            data = await self._get_json(url, params, endpoint='neo', refresh=refresh)
+            if data is not None:
+                return self._process_neo_data(data)
                     
         except Exception as e:
             logger.error(f"Error fetching NEO feed: {e}")
             return {}
     
-    async def get_neo_lookup(self, asteroid_id: str) -> Dict[str, Any]:
+    async def get_neo_lookup(self, asteroid_id: str, refresh: bool = False) -> Dict[str, Any]:
         """Get detailed information about a specific asteroid"""
         try:
             url = f"{self.base_urls['neo']}/neo/{asteroid_id}"
             params = {'api_key': self.api_key}
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, endpoint='neo', refresh=refresh)
                     
         except Exception as e:
             logger.error(f"Error fetching NEO lookup for {asteroid_id}: {e}")
             return {}
     
-    async def get_neo_browse(self, page: int = 0, size: int = 20) -> Dict[str, Any]:
+    async def get_neo_browse(self, page: int = 0, size: int = 20, refresh: bool = False) -> Dict[str, Any]:
         """Browse the overall asteroid dataset"""
         try:
             url = f"{self.base_urls['neo']}/neo/browse"
@@ -104,20 +315,14 @@ class NASAAPIService:
                 'api_key': self.api_key
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, endpoint='neo', refresh=refresh)
                     
         except Exception as e:
             logger.error(f"Error browsing NEO data: {e}")
             return {}
     
-    async def get_jpl_horizons_data(self, target_body: str, observer: str = '500@399') -> Dict[str, Any]:
+    async def get_jpl_horizons_data(self, target_body: str, observer: str = '500@399',
+                                    refresh: bool = False) -> Dict[str, Any]:
         """Get JPL Horizons ephemeris data"""
         try:
             url = self.base_urls['horizons']
@@ -139,20 +344,13 @@ class NASAAPIService:
                 'QUANTITIES': '1,9,20,23,24'  # RA/DEC, range, visual magnitude, etc.
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=60)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, timeout=60, endpoint='horizons', refresh=refresh)
                     
         except Exception as e:
             logger.error(f"Error fetching JPL Horizons data for {target_body}: {e}")
             return {}
     
-    async def get_small_body_database(self, designation: str) -> Dict[str, Any]:
+    async def get_small_body_database(self, designation: str, refresh: bool = False) -> Dict[str, Any]:
         """Get small body database information"""
         try:
             url = self.base_urls['sbdb']
@@ -161,25 +359,18 @@ class NASAAPIService:
                 'full-prec': 'true'
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, endpoint='sbdb', refresh=refresh)
                     
         except Exception as e:
             logger.error(f"Error fetching SBDB data for {designation}: {e}")
             return {}
     
     async def get_close_approach_data(self, date_min: str = None, date_max: str = None, 
-                                    dist_max: str = '0.2') -> Dict[str, Any]:
+                                    dist_max: str = '0.2', refresh: bool = False) -> Dict[str, Any]:
         """Get close approach data for asteroids and comets"""
         try:
             if not date_min:
-                date_min = datetime.now().strftime('%Y-%m-%d')
+                date_min = today_iso()
             if not date_max:
                 date_max = (datetime.now() + timedelta(days=60)).strftime('%Y-%m-%d')
                 
@@ -191,20 +382,13 @@ class NASAAPIService:
                 'sort': 'date'
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, endpoint='cad', refresh=refresh)
                     
         except Exception as e:
             logger.error(f"Error fetching close approach data: {e}")
             return {}
     
-    async def get_mars_weather(self) -> Dict[str, Any]:
+    async def get_mars_weather(self, refresh: bool = False) -> Dict[str, Any]:
         """Get Mars weather data from InSight lander"""
         try:
             url = self.base_urls['mars_weather']
@@ -214,14 +398,7 @@ class NASAAPIService:
                 'ver': '1.0'
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, endpoint='mars_weather', refresh=refresh)
                     
         except Exception as e:
             logger.error(f"Error fetching Mars weather data: {e}")
@@ -232,7 +409,7 @@ class NASAAPIService:
         """Get Earth imagery from Landsat"""
         try:
             if not date:
-                date = datetime.now().strftime('%Y-%m-%d')
+                date = today_iso()
                 
             url = self.base_urls['earth_imagery']
             params = {
@@ -243,14 +420,10 @@ class NASAAPIService:
                 'api_key': self.api_key
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return {'image_url': str(response.url), 'status': 'success'}
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return {'image_url': response.url, 'status': 'success'}
+            session = self.session or self._get_shared_session()
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status == 200:
+                    return {'image_url': str(response.url), 'status': 'success'}
                     
         except Exception as e:
             logger.error(f"Error fetching Earth imagery: {e}")
@@ -260,19 +433,12 @@ class NASAAPIService:
         """Get EPIC (Earth Polychromatic Imaging Camera) images"""
         try:
             if not date:
-                date = datetime.now().strftime('%Y-%m-%d')
+                date = today_iso()
                 
             url = f"{self.base_urls['epic']}/date/{date}"
             params = {'api_key': self.api_key}
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, endpoint='epic')
                     
         except Exception as e:
             logger.error(f"Error fetching EPIC images: {e}")
@@ -292,19 +458,13 @@ class NASAAPIService:
             ORDER BY disc_year DESC
             """
             
+            # CSV is several times smaller than the archive's JSON for the same rows
             params = {
                 'query': query,
-                'format': 'json'
+                'format': 'csv'
             }
             
-            if self.session:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-            else:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    return response.json()
+            return await self._get_json(url, params, endpoint='exoplanet', parse=_parse_exoplanet_csv)
                     
         except Exception as e:
             logger.error(f"Error fetching exoplanet data: {e}")
@@ -325,8 +485,10 @@ class NASAAPIService:
                 }
             }
             
-            for date_key, objects in raw_data.get('near_earth_objects', {}).items():
-                for obj in objects:
+            objects = processed_data['objects']
+            approaches = []
+            for date_key, day_objects in raw_data.get('near_earth_objects', {}).items():
+                for obj in day_objects:
                     # Extract basic information
                     neo_obj = {
                         'id': obj['id'],
@@ -345,44 +507,61 @@ class NASAAPIService:
                         'average_km': (diameter['estimated_diameter_min'] + diameter['estimated_diameter_max']) / 2
                     }
                     
-                    # Close approach data
+                    # Close approach data is filled in after its numeric strings are parsed in bulk
                     if obj['close_approach_data']:
-                        approach = obj['close_approach_data'][0]
-                        neo_obj['close_approach'] = {
-                            'date': approach['close_approach_date'],
-                            'date_full': approach['close_approach_date_full'],
-                            'epoch': approach['epoch_date_close_approach'],
-                            'relative_velocity_kmh': float(approach['relative_velocity']['kilometers_per_hour']),
-                            'relative_velocity_kms': float(approach['relative_velocity']['kilometers_per_second']),
-                            'miss_distance_km': float(approach['miss_distance']['kilometers']),
-                            'miss_distance_au': float(approach['miss_distance']['astronomical']),
-                            'miss_distance_lunar': float(approach['miss_distance']['lunar']),
-                            'orbiting_body': approach['orbiting_body']
-                        }
-                        
-                        # Calculate additional parameters
-                        neo_obj['risk_assessment'] = self._assess_impact_risk(neo_obj)
-                        neo_obj['orbital_characteristics'] = self._calculate_orbital_characteristics(neo_obj)
-                    
-                    processed_data['objects'].append(neo_obj)
+                        approaches.append((neo_obj, obj['close_approach_data'][0]))
                     
-                    # Update statistics
-                    stats = processed_data['statistics']
-                    if neo_obj['potentially_hazardous']:
-                        stats['potentially_hazardous_count'] += 1
-                    
-                    max_diameter = neo_obj['diameter']['max_km']
-                    if max_diameter > stats['largest_diameter']:
-                        stats['largest_diameter'] = max_diameter
+                    objects.append(neo_obj)
+            
+            stats = processed_data['statistics']
+            if approaches:
+                # One C-level string-to-float conversion for every approach field
+                numbers = np.array([
+                    (approach['relative_velocity']['kilometers_per_hour'],
+                     approach['relative_velocity']['kilometers_per_second'],
+                     approach['miss_distance']['kilometers'],
+                     approach['miss_distance']['astronomical'],
+                     approach['miss_distance']['lunar'])
+                    for _, approach in approaches
+                ], dtype=np.float64)
+                
+                # Impact energy and crater size for every approaching object in one pass
+                avg_diameters = np.fromiter((neo_obj['diameter']['average_km'] for neo_obj, _ in approaches),
+                                            dtype=np.float64, count=len(approaches))
+                energies, craters = SpaceCalculations.calculate_impact_projection_batch(avg_diameters, numbers[:, 1])
+                tiers = _impact_risk_tiers(avg_diameters, numbers[:, 4], numbers[:, 1])
+                
+                for (neo_obj, approach), (velocity_kmh, velocity_kms, miss_km, miss_au, miss_lunar), energy, crater, neo_tiers in zip(
+                        approaches, numbers.tolist(), energies.tolist(), craters.tolist(), tiers.T.tolist()):
+                    neo_obj['close_approach'] = {
+                        'date': approach['close_approach_date'],
+                        'date_full': approach['close_approach_date_full'],
+                        'epoch': approach['epoch_date_close_approach'],
+                        'relative_velocity_kmh': velocity_kmh,
+                        'relative_velocity_kms': velocity_kms,
+                        'miss_distance_km': miss_km,
+                        'miss_distance_au': miss_au,
+                        'miss_distance_lunar': miss_lunar,
+                        'orbiting_body': approach['orbiting_body']
+                    }
                     
-                    if 'close_approach' in neo_obj:
-                        miss_distance = neo_obj['close_approach']['miss_distance_km']
-                        if miss_distance < stats['closest_approach']:
-                            stats['closest_approach'] = miss_distance
-                        
-                        velocity = neo_obj['close_approach']['relative_velocity_kmh']
-                        if velocity > stats['fastest_velocity']:
-                            stats['fastest_velocity'] = velocity
+                    # Calculate additional parameters
+                    neo_obj['risk_assessment'] = self._assess_impact_risk(*neo_tiers)
+                    if neo_obj['risk_assessment']:
+                        neo_obj['risk_assessment']['impact_energy_joules'] = energy
+                        neo_obj['risk_assessment']['crater_diameter_km'] = crater
+                    neo_obj['orbital_characteristics'] = self._calculate_orbital_characteristics(neo_obj)
+                
+                stats['closest_approach'] = float(numbers[:, 2].min())
+                stats['fastest_velocity'] = float(numbers[:, 0].max())
+            
+            # Feed-wide statistics as array reductions
+            if objects:
+                count = len(objects)
+                hazardous = np.fromiter((o['potentially_hazardous'] for o in objects), dtype=bool, count=count)
+                diameters = np.fromiter((o['diameter']['max_km'] for o in objects), dtype=np.float64, count=count)
+                stats['potentially_hazardous_count'] = int(hazardous.sum())
+                stats['largest_diameter'] = float(diameters.max())
             
             return processed_data
             
@@ -390,90 +569,66 @@ class NASAAPIService:
             logger.error(f"Error processing NEO data: {e}")
             return {}
     
-    def _assess_impact_risk(self, neo_obj: Dict) -> Dict[str, Any]:
-        """Assess impact risk for a NEO"""
+    def _assess_impact_risk(self, size_tier: int, proximity_tier: int, velocity_tier: int) -> Dict[str, Any]:
+        """Assess impact risk for a NEO from its tiers (see _impact_risk_tiers)"""
         try:
-            risk_factors = {
-                'size_risk': 'low',
-                'proximity_risk': 'low',
-                'velocity_risk': 'low',
-                'overall_risk': 'low',
+            # Overall risk from the summed 1-4 scores of each tier: 6-7 medium, 8-9 high, 10+ extreme
+            total_score = _RISK_SCORES[size_tier] + _RISK_SCORES[proximity_tier] + _RISK_SCORES[velocity_tier]
+            overall_tier = min(3, max(0, (total_score - 4) // 2))
+            
+            return {
+                'size_risk': _RISK_LABELS[size_tier],
+                'proximity_risk': _RISK_LABELS[proximity_tier],
+                'velocity_risk': _RISK_LABELS[velocity_tier],
+                'overall_risk': _RISK_LABELS[overall_tier],
                 'impact_probability': 0.0,
-                'potential_damage': 'minimal'
+                'potential_damage': _DAMAGE_LABELS[overall_tier]
             }
             
-            # Size risk assessment
-            avg_diameter = neo_obj['diameter']['average_km']
-            if avg_diameter > 1.0:
-                risk_factors['size_risk'] = 'extreme'
-            elif avg_diameter > 0.5:
-                risk_factors['size_risk'] = 'high'
-            elif avg_diameter > 0.1:
-                risk_factors['size_risk'] = 'medium'
-            
-            # Proximity risk assessment
-            if 'close_approach' in neo_obj:
-                miss_distance_lunar = neo_obj['close_approach']['miss_distance_lunar']
-                if miss_distance_lunar < 1:
-                    risk_factors['proximity_risk'] = 'extreme'
-                elif miss_distance_lunar < 5:
-                    risk_factors['proximity_risk'] = 'high'
-                elif miss_distance_lunar < 20:
-                    risk_factors['proximity_risk'] = 'medium'
-                
-                # Velocity risk assessment
-                velocity_kms = neo_obj['close_approach']['relative_velocity_kms']
-                if velocity_kms > 30:
-                    risk_factors['velocity_risk'] = 'high'
-                elif velocity_kms > 20:
-                    risk_factors['velocity_risk'] = 'medium'
-            
-            # Overall risk calculation
-            risk_scores = {
-                'low': 1, 'medium': 2, 'high': 3, 'extreme': 4
-            }
-            
-            total_score = (
-                risk_scores[risk_factors['size_risk']] +
-                risk_scores[risk_factors['proximity_risk']] +
-                risk_scores[risk_factors['velocity_risk']]
-            )
-            
-            if total_score >= 10:
-                risk_factors['overall_risk'] = 'extreme'
-                risk_factors['potential_damage'] = 'global catastrophe'
-            elif total_score >= 8:
-                risk_factors['overall_risk'] = 'high'
-                risk_factors['potential_damage'] = 'regional destruction'
-            elif total_score >= 6:
-                risk_factors['overall_risk'] = 'medium'
-                risk_factors['potential_damage'] = 'local damage'
-            
-            return risk_factors
-            
         except Exception as e:
             logger.error(f"Error assessing impact risk: {e}")
             return {}
     
     def _calculate_orbital_characteristics(self, neo_obj: Dict) -> Dict[str, Any]:
         """Calculate orbital characteristics"""
-        try:
-            orbital_data = {
-                'orbital_class': 'unknown',
-                'perihelion_distance': 0,
-                'aphelion_distance': 0,
-                'orbital_period': 0,
-                'eccentricity': 0,
-                'inclination': 0
-            }
-            
-            # This would require additional orbital element data
-            # For now, return basic structure
-            return orbital_data
-            
-        except Exception as e:
-            logger.error(f"Error calculating orbital characteristics: {e}")
-            return {}
+        # This would require additional orbital element data
+        # For now, return basic structure
+        return dict(_BASIC_ORBITAL_DATA)
+
+atexit.register(NASAAPIService._close_shared_session_at_exit)
+
+# Lower tier boundaries; searchsorted against these yields the tier index directly
+_SIZE_THRESHOLDS_KM = np.array([0.1, 0.5, 1.0])
+_PROXIMITY_THRESHOLDS_LUNAR = np.array([1.0, 5.0, 20.0])
+_VELOCITY_THRESHOLDS_KMS = np.array([20.0, 30.0])
+
+# Tier labels and 1-4 scores indexed by the integer tiers from _impact_risk_tiers
+_RISK_LABELS = ('low', 'medium', 'high', 'extreme')
+_RISK_SCORES = (1, 2, 3, 4)
+_DAMAGE_LABELS = ('minimal', 'local damage', 'regional destruction', 'global catastrophe')
+
+def _impact_risk_tiers(avg_diameter: np.ndarray, miss_distance_lunar: np.ndarray,
+                       velocity_kms: np.ndarray) -> np.ndarray:
+    """(3, N) size, proximity and velocity risk tiers (0 = low .. 3 = extreme) for arrays of NEOs"""
+    return np.stack([
+        # Strictly above a boundary to move up a tier
+        np.searchsorted(_SIZE_THRESHOLDS_KM, avg_diameter, side='left'),
+        # Strictly below a boundary to move up a tier; closer is riskier
+        3 - np.searchsorted(_PROXIMITY_THRESHOLDS_LUNAR, miss_distance_lunar, side='right'),
+        # Tops out at high
+        np.searchsorted(_VELOCITY_THRESHOLDS_KMS, velocity_kms, side='left')
+    ])
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _impact_projection_kernel(diameter_km, velocity_kms, density, energy_out, crater_out):
+    """Fill impact energy (J) and crater diameter (km) per NEO in one pass"""
+    for i in prange(diameter_km.size):
+        radius_m = diameter_km[i] * 500.0
+        mass_kg = (4.0 / 3.0) * math.pi * radius_m * radius_m * radius_m * density * 1000.0
+        velocity_ms = velocity_kms[i] * 1000.0
+        energy = 0.5 * mass_kg * velocity_ms * velocity_ms
+        energy_out[i] = energy
+        crater_out[i] = 1.8 * math.sqrt(math.sqrt(energy / 1e12))
 
 # Utility functions for space calculations
 class SpaceCalculations:
@@ -515,6 +670,46 @@ class SpaceCalculations:
             logger.error(f"Error calculating crater diameter: {e}")
             return 0
     
+    @staticmethod
+    def calculate_impact_energy_batch(diameter_km: np.ndarray, velocity_kms: np.ndarray,
+                                      density: float = 2.6) -> np.ndarray:
+        """Impact energy in joules for arrays of diameters and velocities"""
+        try:
+            radius_m = np.asarray(diameter_km, dtype=np.float64) * 500.0
+            velocity_ms = np.asarray(velocity_kms, dtype=np.float64) * 1000.0
+            mass_kg = (4.0 / 3.0) * np.pi * radius_m ** 3 * (density * 1000.0)
+            return 0.5 * mass_kg * velocity_ms ** 2
+            
+        except Exception as e:
+            logger.error(f"Error calculating impact energies: {e}")
+            return np.zeros(np.shape(diameter_km))
+    
+    @staticmethod
+    def calculate_crater_diameter_batch(energy_joules: np.ndarray) -> np.ndarray:
+        """Estimated crater diameters in km for an array of impact energies"""
+        try:
+            return 1.8 * np.sqrt(np.sqrt(np.asarray(energy_joules, dtype=np.float64) / 1e12))
+            
+        except Exception as e:
+            logger.error(f"Error calculating crater diameters: {e}")
+            return np.zeros(np.shape(energy_joules))
+    
+    @staticmethod
+    def calculate_impact_projection_batch(diameter_km: np.ndarray, velocity_kms: np.ndarray,
+                                          density: float = 2.6) -> Tuple[np.ndarray, np.ndarray]:
+        """Impact energies (J) and crater diameters (km) for arrays of NEOs, computed together"""
+        diameter_km = np.ascontiguousarray(diameter_km, dtype=np.float64)
+        velocity_kms = np.ascontiguousarray(velocity_kms, dtype=np.float64)
+        energies = np.empty_like(diameter_km)
+        craters = np.empty_like(diameter_km)
+        try:
+            _impact_projection_kernel(diameter_km, velocity_kms, float(density), energies, craters)
+            return energies, craters
+            
+        except Exception as e:
+            logger.error(f"Error calculating impact projections: {e}")
+            return np.zeros_like(diameter_km), np.zeros_like(diameter_km)
+    
     @staticmethod
     def calculate_orbital_velocity(semi_major_axis_au: float) -> float:
         """Calculate orbital velocity in km/s"""
@@ -4,13 +4,22 @@ Enhanced NASA NEO API Integration with Async/Await, Caching, and Environment Var
 import os
 import asyncio
 import aiohttp
-import redis
-import json
+from redis.asyncio import ConnectionPool, Redis
+import hashlib
+import orjson
+import struct
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import math
+import random
+import time
+import weakref
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
 from functools import wraps
 import backoff
+import msgspec
+import zstandard
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -20,97 +29,458 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_msgpack_encode = msgspec.msgpack.Encoder().encode
+_msgpack_decode = msgspec.msgpack.Decoder().decode
+_zstd_compress = zstandard.ZstdCompressor(level=3).compress
+_zstd_decompress = zstandard.ZstdDecompressor().decompress
+
+# Response cache keys carry the entry layout version; bump it whenever the layout
+# changes so old entries are simply never read again instead of being decoded
+CACHE_KEY_PREFIX = 'nasa:neo:v3:'
+
+# Cache entries hold the fetch time followed by the API's own JSON bytes,
+# zstd-compressed, so nothing is re-serialized on write
+_FETCH_SECONDS = struct.Struct('<d')
+
+def _encode_entry(fetch_seconds: float, body: bytes) -> bytes:
+    """Cache entry bytes for a raw JSON response body and the time it took to fetch"""
+    return _FETCH_SECONDS.pack(fetch_seconds) + _zstd_compress(body)
+
+def _decode_entry(raw: bytes) -> Tuple[float, bytes]:
+    """(fetch_seconds, JSON body) from cache entry bytes"""
+    (fetch_seconds,) = _FETCH_SECONDS.unpack_from(raw)
+    return fetch_seconds, _zstd_decompress(raw[_FETCH_SECONDS.size:])
+
+# Seconds each kind of response stays cached, by how often the data changes;
+# 'neo/' covers lookups of single objects, whose orbital data is effectively fixed
+TTL_TABLE = {
+    'stats': 86400,
+    'neo/browse': 3600,
+    'feed_past': 86400 * 7,
+    'feed_today': 300,
+    'neo/': 86400 * 30
+}
+DEFAULT_TTL = 300
+
+# In-process cache of the hottest responses, checked before Redis
+L1_MAX_ENTRIES = 128
+L1_TTL = 60  # seconds; capped by the endpoint's own TTL
+
+# Redis indexes over browsed NEOs, rebuilt as often as browse pages expire. A rebuild
+# writes fresh keys and renames them into place, so readers never see a partial index
+PHA_SET_KEY = 'nasa:neo:pha'
+DIAMETER_ZSET_KEY = 'nasa:neo:by_diameter'  # scored by estimated max diameter in meters
+OBJECT_HASH_KEY = 'nasa:neo:obj'  # NEO id -> msgpack-encoded browse record
+INDEX_READY_KEY = 'nasa:neo:index_ready'  # set only after a complete rebuild
+INDEX_LOCK_KEY = 'nasa:neo:index_lock'
+INDEX_TTL = TTL_TABLE['neo/browse']
+# The previous index keeps serving while the next one is built
+INDEX_KEYS_TTL = 2 * INDEX_TTL
+INDEX_BUILD_TIMEOUT = 300  # seconds; the rebuild lock expires after this
+INDEX_WAIT_INTERVAL = 0.5
+
+def _max_diameter_m(neo: Dict) -> float:
+    """Estimated maximum diameter in meters, 0 when the record lacks one"""
+    return neo.get('estimated_diameter', {}).get('meters', {}).get('estimated_diameter_max', 0)
+
+# Cache stampede protection: one caller refreshes a key while others wait on it
+CACHE_LOCK_TIMEOUT = 10  # seconds
+CACHE_LOCK_POLL_INTERVAL = 0.05
+CACHE_LOCK_MAX_WAIT = 5.0
+# XFetch aggressiveness; above 1 refreshes earlier
+XFETCH_BETA = 1.0
+
+def _refresh_early(fetch_seconds: float, ttl_ms: int) -> bool:
+    """XFetch: recompute before expiry with a probability that rises as expiry nears"""
+    if ttl_ms < 0:
+        return False
+    return -fetch_seconds * XFETCH_BETA * math.log(1.0 - random.random()) >= ttl_ms / 1000
+
+# NASA's quota is counted over a sliding hour
+RATE_LIMIT_WINDOW = 3600.0
+# Requests held back once the reported remaining quota drops to this level
+RATE_LIMIT_RESERVE = 2
+
+class RateLimitExceeded(aiohttp.ClientResponseError):
+    """HTTP 429 from the NEO API, carrying the server's requested wait in seconds"""
+    
+    def __init__(self, response: aiohttp.ClientResponse, retry_after: float):
+        super().__init__(
+            request_info=response.request_info,
+            history=response.history,
+            status=429,
+            message="Rate limit exceeded"
+        )
+        self.retry_after = retry_after
+
+def _retry_after_seconds(response: aiohttp.ClientResponse, default: float = 1.0) -> float:
+    """Seconds to wait from a Retry-After header given in seconds; default otherwise"""
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', default)))
+    except ValueError:
+        return default
+
+def _is_permanent_error(error: Exception) -> bool:
+    """Client errors other than 429 will fail the same way again, so retrying is pointless"""
+    return (isinstance(error, aiohttp.ClientResponseError)
+            and 400 <= error.status < 500 and error.status != 429)
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the NEO API while repeated server errors have tripped the breaker"""
+
+# Statuses that mean the API is overloaded and concurrency should back off
+OVERLOAD_STATUSES = frozenset((429, 502, 503))
+# Consecutive 5xx responses within CIRCUIT_ERROR_WINDOW seconds that open the circuit
+CIRCUIT_ERROR_THRESHOLD = 3
+CIRCUIT_ERROR_WINDOW = 10.0
+CIRCUIT_OPEN_SECONDS = 30.0
+
+class AIMDLimiter:
+    """Concurrency cap with additive increase on healthy responses and multiplicative decrease on overload"""
+    
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 increase: int = 1, decrease: float = 0.5,
+                 target_latency: float = 2.0, window: int = 20):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._latencies: Deque[float] = deque(maxlen=window)
+        # Waiters and in-flight counts are per event loop, since a Condition is bound to
+        # the loop it first waits on; the limit itself is shared
+        self._conditions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Condition]" = \
+            weakref.WeakKeyDictionary()
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int]" = weakref.WeakKeyDictionary()
+    
+    async def acquire(self):
+        """Wait for a slot under the current limit"""
+        loop = asyncio.get_running_loop()
+        condition = self._conditions.get(loop)
+        if condition is None:
+            condition = self._conditions[loop] = asyncio.Condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight.get(loop, 0) < self.limit)
+            self._in_flight[loop] = self._in_flight.get(loop, 0) + 1
+    
+    async def release(self, latency: float, overloaded: bool):
+        """Free a slot and adapt the limit from the request's outcome"""
+        self._latencies.append(latency)
+        mean_latency = sum(self._latencies) / len(self._latencies)
+        if overloaded or mean_latency > self.target_latency:
+            self.limit = max(self.minimum, int(self.limit * self.decrease))
+        else:
+            self.limit = min(self.maximum, self.limit + self.increase)
+        loop = asyncio.get_running_loop()
+        condition = self._conditions[loop]
+        async with condition:
+            self._in_flight[loop] -= 1
+            condition.notify_all()
+
 class NASANEOClient:
     """Enhanced NASA NEO API client with caching and retry logic"""
     
+    # One keep-alive session and one Redis pool per event loop (both are bound to the loop
+    # that opened them), shared by every client on that loop; closed by close() on that loop
+    _loop_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+        weakref.WeakKeyDictionary()
+    _loop_redis: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = \
+        weakref.WeakKeyDictionary()
+    
+    # Admission control and circuit breaker reflect the API's health, so all clients share them
+    _limiter = AIMDLimiter()
+    _server_errors: Deque[float] = deque(maxlen=CIRCUIT_ERROR_THRESHOLD)
+    _circuit_open_until = 0.0
+    
+    # The API key's quota is process-wide, so the rate-limit state is too
+    rate_limit = int(os.getenv('NASA_RATE_LIMIT', '1000'))  # requests per hour
+    _request_times: Deque[float] = deque()  # monotonic send times within the last hour
+    # Quota reported by the API's X-RateLimit-* headers, when present
+    remaining: Optional[int] = None
+    reset_ts = 0.0  # monotonic time the server asked us to wait until
+    last_success: Optional[datetime] = None
+    
+    # In-process L1 in front of Redis, least recently used first: cache key -> (monotonic
+    # expiry, JSON body). Bodies are parsed per caller, so no caller shares another's objects
+    _l1: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+    # Locks coalescing concurrent L1 misses on a key, per event loop like the session
+    _loop_l1_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, weakref.WeakValueDictionary]" = \
+        weakref.WeakKeyDictionary()
+    
     def __init__(self):
         self.base_url = os.getenv('NASA_NEO_BASE_URL', 'https://api.nasa.gov/neo/rest/v1')
         self.api_key = os.getenv('NASA_API_KEY', 'DEMO_KEY')
         self.redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-        
-        # Initialize Redis connection pool
-        self.redis_pool = redis.ConnectionPool.from_url(self.redis_url)
-        self.session = None
-        
-        # Rate limiting settings
-        self.rate_limit = int(os.getenv('NASA_RATE_LIMIT', '1000'))  # requests per hour
-        self.requests_made = 0
-        self.reset_time = datetime.now()
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        await self.get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit; the shared session and Redis pool stay open for reuse"""
+    
+    @classmethod
+    async def get_session(cls) -> aiohttp.ClientSession:
+        """Return the running loop's shared session, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        session = cls._loop_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=50, ttl_dns_cache=300)
+            session = cls._loop_sessions[loop] = aiohttp.ClientSession(connector=connector)
+        return session
+    
+    @classmethod
+    async def close(cls):
+        """Close this loop's shared session and Redis pool (call on application shutdown)"""
+        await cls._close_session()
+        await cls._close_redis()
     
-    def get_redis_connection(self):
-        """Get Redis connection from pool"""
-        return redis.Redis(connection_pool=self.redis_pool)
+    @classmethod
+    async def _close_session(cls):
+        session = cls._loop_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+    
+    @classmethod
+    async def _close_redis(cls):
+        redis_conn = cls._loop_redis.pop(asyncio.get_running_loop(), None)
+        if redis_conn is not None:
+            await redis_conn.connection_pool.disconnect()
+    
+    def get_redis_connection(self) -> Redis:
+        """Get the running loop's shared async Redis client, creating its pool on first use"""
+        loop = asyncio.get_running_loop()
+        redis_conn = NASANEOClient._loop_redis.get(loop)
+        if redis_conn is None:
+            pool = ConnectionPool.from_url(self.redis_url, max_connections=50)
+            redis_conn = NASANEOClient._loop_redis[loop] = Redis(connection_pool=pool)
+        return redis_conn
+    
+    @property
+    def redis_conn(self) -> Redis:
+        return self.get_redis_connection()
     
     def cache_key(self, endpoint: str, params: Dict) -> str:
-        """Generate cache key from endpoint and parameters"""
-        param_str = json.dumps(params, sort_keys=True)
-        return f"nasa:neo:{endpoint}:{param_str}"
+        """Generate a fixed-length cache key from endpoint and parameters"""
+        payload = _msgpack_encode((endpoint, sorted(params.items())))
+        return CACHE_KEY_PREFIX + hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _ttl_for(self, endpoint: str, params: Dict) -> int:
+        """Cache lifetime for a response from endpoint with params"""
+        if endpoint == 'feed':
+            # Feeds that end before today (UTC) will not change again
+            end_date = params.get('end_date') or params.get('start_date')
+            today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+            return TTL_TABLE['feed_past'] if end_date and end_date < today else TTL_TABLE['feed_today']
+        if endpoint in TTL_TABLE:
+            return TTL_TABLE[endpoint]
+        if endpoint.startswith('neo/'):
+            return TTL_TABLE['neo/']
+        return DEFAULT_TTL
     
     async def check_rate_limit(self):
-        """Check and enforce rate limits"""
-        now = datetime.now()
-        if now >= self.reset_time:
-            self.requests_made = 0
-            self.reset_time = now + timedelta(hours=1)
-        
-        if self.requests_made >= self.rate_limit:
-            wait_time = (self.reset_time - now).total_seconds()
+        """Enforce the hourly quota over a sliding one-hour window of our own requests"""
+        window = NASANEOClient._request_times
+        while True:
+            # Re-prune after every sleep: other requests may have claimed the freed slot meanwhile
+            now = time.monotonic()
+            while window and window[0] <= now - RATE_LIMIT_WINDOW:
+                window.popleft()
+            if len(window) < self.rate_limit:
+                break
+            wait_time = window[0] + RATE_LIMIT_WINDOW - now
             logger.warning(f"Rate limit exceeded. Waiting {wait_time:.2f} seconds")
             await asyncio.sleep(wait_time)
-            self.requests_made = 0
-            self.reset_time = datetime.now() + timedelta(hours=1)
+        window.append(time.monotonic())
+    
+    async def wait_if_throttled(self):
+        """Pause before a request when the API's own headers say the quota is nearly spent"""
+        now = time.monotonic()
+        if self.reset_ts > now:
+            await asyncio.sleep(self.reset_ts - now)
+        elif self.remaining is not None and self.remaining <= RATE_LIMIT_RESERVE and self._request_times:
+            # NASA does not report a reset time; the quota frees up as the oldest request ages out
+            wait_time = self._request_times[0] + RATE_LIMIT_WINDOW - now
+            if wait_time > 0:
+                logger.warning(f"API quota nearly exhausted ({self.remaining} left). Waiting {wait_time:.2f} seconds")
+                await asyncio.sleep(wait_time)
+            NASANEOClient.remaining = None
+        await self.check_rate_limit()
+    
+    def check_circuit(self):
+        """Fail fast while the circuit breaker is open"""
+        remaining = NASANEOClient._circuit_open_until - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpen(f"NEO API circuit open for another {remaining:.1f}s")
+    
+    def record_outcome(self, status: Optional[int]):
+        """Track consecutive server errors and open the circuit when they cluster"""
+        errors = NASANEOClient._server_errors
+        if status is None or status < 500:
+            errors.clear()
+            return
+        now = time.monotonic()
+        errors.append(now)
+        if len(errors) == CIRCUIT_ERROR_THRESHOLD and now - errors[0] <= CIRCUIT_ERROR_WINDOW:
+            logger.error(f"{CIRCUIT_ERROR_THRESHOLD} consecutive server errors; opening circuit for {CIRCUIT_OPEN_SECONDS:.0f}s")
+            NASANEOClient._circuit_open_until = now + CIRCUIT_OPEN_SECONDS
+            errors.clear()
     
-    @backoff.on_exception(backoff.expo, 
+    def quota_remaining(self) -> int:
+        """Requests left this hour, from the API's headers when seen, else our own sliding window"""
+        if self.remaining is not None:
+            return self.remaining
+        cutoff = time.monotonic() - RATE_LIMIT_WINDOW
+        return max(0, self.rate_limit - sum(1 for sent in self._request_times if sent > cutoff))
+    
+    def update_rate_limit(self, headers):
+        """Record the quota reported by a response's rate-limit headers"""
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        if limit is not None and limit.isdigit():
+            NASANEOClient.rate_limit = int(limit)
+        if remaining is not None and remaining.isdigit():
+            NASANEOClient.remaining = int(remaining)
+    
+    # Transient failures retry on a short jittered exponential schedule (0.1s, 0.2s,
+    # 0.4s ... capped at 5s). A 429 also sets reset_ts, so the next attempt first
+    # waits as long as the server asked. Each attempt goes back through _fetch and
+    # so is counted against the rate limiter and the AIMD limiter.
+    @backoff.on_exception(backoff.expo,
                          (aiohttp.ClientError, asyncio.TimeoutError),
-                         max_tries=3,
-                         max_time=30)
+                         giveup=_is_permanent_error,
+                         max_tries=5,
+                         max_time=30,
+                         factor=0.1,
+                         max_value=5,
+                         jitter=backoff.full_jitter)
     async def make_request(self, endpoint: str, params: Dict) -> Dict:
         """Make HTTP request with retry logic and caching"""
-        await self.check_rate_limit()
-        
         cache_key = self.cache_key(endpoint, params)
+        body = self._l1_get(cache_key)
+        if body is None:
+            # Concurrent L1 misses on one key in this process wait for a single Redis/API lookup
+            loop = asyncio.get_running_loop()
+            locks = NASANEOClient._loop_l1_locks.get(loop)
+            if locks is None:
+                locks = NASANEOClient._loop_l1_locks[loop] = weakref.WeakValueDictionary()
+            lock = locks.get(cache_key)
+            if lock is None:
+                lock = locks[cache_key] = asyncio.Lock()
+            async with lock:
+                body = self._l1_get(cache_key)
+                if body is None:
+                    body = await self._get_through_redis(endpoint, params, cache_key)
+                    self._l1_set(cache_key, body, min(L1_TTL, self._ttl_for(endpoint, params)))
+        return orjson.loads(body)
+    
+    def _l1_get(self, cache_key: str) -> Optional[bytes]:
+        l1 = NASANEOClient._l1
+        entry = l1.get(cache_key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            l1.pop(cache_key, None)
+            return None
+        l1.move_to_end(cache_key)
+        return entry[1]
+    
+    def _l1_set(self, cache_key: str, body: bytes, ttl: float):
+        l1 = NASANEOClient._l1
+        l1[cache_key] = (time.monotonic() + ttl, body)
+        l1.move_to_end(cache_key)
+        while len(l1) > L1_MAX_ENTRIES:
+            l1.popitem(last=False)
+    
+    async def _get_through_redis(self, endpoint: str, params: Dict, cache_key: str) -> bytes:
+        """Serve from Redis, or fetch from the API once across all processes on a miss"""
         redis_conn = self.get_redis_connection()
         
-        # Check cache first
-        cached_data = redis_conn.get(cache_key)
+        # Check cache first, reading the entry and its remaining lifetime in one round trip
+        async with redis_conn.pipeline(transaction=False) as pipe:
+            pipe.get(cache_key)
+            pipe.pttl(cache_key)
+            cached_data, ttl_ms = await pipe.execute()
+        stale = None
         if cached_data:
-            logger.info(f"Cache hit for {cache_key}")
-            return json.loads(cached_data)
+            fetch_seconds, body = _decode_entry(cached_data)
+            if not _refresh_early(fetch_seconds, ttl_ms):
+                logger.info(f"Cache hit for {cache_key}")
+                return body
+            stale = body
+        
+        # Coalesce concurrent misses: only the lock holder calls the API
+        lock_key = f"{cache_key}:lock"
+        locked = await redis_conn.set(lock_key, b'1', nx=True, ex=CACHE_LOCK_TIMEOUT)
+        if not locked:
+            if stale is not None:
+                # Someone is already refreshing early; the current entry is still valid
+                return stale
+            body = await self._wait_for_refresh(redis_conn, cache_key)
+            if body is not None:
+                return body
+            logger.warning(f"Timed out waiting for {cache_key} to be refreshed; fetching directly")
+        
+        try:
+            return await self._fetch(endpoint, params, cache_key, redis_conn)
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpen, orjson.JSONDecodeError) as e:
+            if stale is None:
+                raise
+            # Only an early refresh failed; the current entry has not expired yet
+            logger.warning(f"Early refresh of {cache_key} failed; serving the cached entry: {e}")
+            return stale
+        finally:
+            if locked:
+                await redis_conn.delete(lock_key)
+    
+    async def _wait_for_refresh(self, redis_conn: Redis, cache_key: str) -> Optional[bytes]:
+        """Poll for the entry another caller is fetching; None if it does not appear in time"""
+        deadline = time.monotonic() + CACHE_LOCK_MAX_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+            cached_data = await redis_conn.get(cache_key)
+            if cached_data:
+                return _decode_entry(cached_data)[1]
+        return None
+    
+    async def _fetch(self, endpoint: str, params: Dict, cache_key: str, redis_conn: Redis) -> bytes:
+        """Call the API and cache the response along with how long it took to fetch"""
+        # Only requests that reach the API count against the quota
+        self.check_circuit()
+        await self.wait_if_throttled()
         
         # Build URL
         url = f"{self.base_url}/{endpoint}"
-        params['api_key'] = self.api_key
+        params = {**params, 'api_key': self.api_key}
         
+        await self._limiter.acquire()
+        started = time.monotonic()
+        status = None
         try:
-            async with self.session.get(url, params=params, timeout=30) as response:
-                self.requests_made += 1
+            session = await self.get_session()
+            async with session.get(url, params=params, timeout=30) as response:
+                status = response.status
+                self.update_rate_limit(response.headers)
                 
                 if response.status == 200:
-                    data = await response.json()
+                    body = await response.read()
+                    orjson.loads(body)  # reject a malformed body before it reaches the cache
+                    fetch_seconds = time.monotonic() - started
+                    NASANEOClient.last_success = datetime.now(timezone.utc)
                     
-                    # Cache successful response (5 minutes TTL)
-                    redis_conn.setex(cache_key, 300, json.dumps(data))
+                    # Cache successful response for as long as this kind of data stays valid
+                    await redis_conn.setex(cache_key, self._ttl_for(endpoint, params),
+                                           _encode_entry(fetch_seconds, body))
                     logger.info(f"API request successful: {url}")
-                    return data
+                    return body
                 
                 elif response.status == 429:
-                    logger.warning("Rate limit exceeded, backing off")
-                    raise aiohttp.ClientResponseError(
-                        request_info=response.request_info,
-                        history=response.history,
-                        status=429,
-                        message="Rate limit exceeded"
-                    )
+                    retry_after = _retry_after_seconds(response)
+                    NASANEOClient.reset_ts = time.monotonic() + retry_after
+                    logger.warning(f"Rate limit exceeded, retrying after {retry_after:.1f}s")
+                    raise RateLimitExceeded(response, retry_after)
                 
                 else:
                     response.raise_for_status()
@@ -118,6 +488,12 @@ class NASANEOClient:
         except aiohttp.ClientError as e:
             logger.error(f"API request failed: {e}")
             raise
+        
+        finally:
+            # Timeouts and connection failures (no status) count as overload
+            await self._limiter.release(time.monotonic() - started,
+                                        status is None or status in OVERLOAD_STATUSES)
+            self.record_outcome(status)
     
     async def get_neo_feed(self, start_date: str, end_date: str) -> Dict:
         """Get NEO feed for date range"""
@@ -139,49 +515,173 @@ class NASANEOClient:
         }
         return await self.make_request('neo/browse', params)
     
+    async def index_neos(self, neos: List[Dict]):
+        """Replace the Redis PHA set, diameter sorted set and object hash with neos and mark the index ready"""
+        redis_conn = self.redis_conn
+        suffix = f":build:{os.urandom(4).hex()}"
+        pha_ids = [neo['id'] for neo in neos if neo.get('is_potentially_hazardous_asteroid', False)]
+        contents = {PHA_SET_KEY: bool(pha_ids), DIAMETER_ZSET_KEY: bool(neos), OBJECT_HASH_KEY: bool(neos)}
+        
+        async with redis_conn.pipeline(transaction=False) as pipe:
+            if pha_ids:
+                pipe.sadd(PHA_SET_KEY + suffix, *pha_ids)
+            if neos:
+                pipe.zadd(DIAMETER_ZSET_KEY + suffix, {neo['id']: _max_diameter_m(neo) for neo in neos})
+                pipe.hset(OBJECT_HASH_KEY + suffix, mapping={neo['id']: _msgpack_encode(neo) for neo in neos})
+            for key, filled in contents.items():
+                if filled:
+                    pipe.expire(key + suffix, INDEX_KEYS_TTL)
+            await pipe.execute()
+        
+        # Swap all three indexes in at once; RENAME keeps the TTL set above
+        async with redis_conn.pipeline(transaction=True) as pipe:
+            for key, filled in contents.items():
+                if filled:
+                    pipe.rename(key + suffix, key)
+                else:
+                    pipe.delete(key)
+            pipe.set(INDEX_READY_KEY, b'1', ex=INDEX_TTL)
+            await pipe.execute()
+    
+    async def load_indexed_neos(self, neo_ids: List) -> List[Dict]:
+        """Browse records for neo_ids from the Redis object hash"""
+        if not neo_ids:
+            return []
+        records = await self.redis_conn.hmget(OBJECT_HASH_KEY, neo_ids)
+        return [_msgpack_decode(record) for record in records if record is not None]
+    
     async def get_neo_stats(self) -> Dict:
         """Get NEO statistics"""
         return await self.make_request('stats', {})
 
 # Utility functions for common operations
-async def get_potentially_hazardous_asteroids() -> List[Dict]:
+
+# The browse endpoint serves at most 20 objects per page
+BROWSE_PAGE_SIZE = 20
+
+async def browse_all_neos(client: NASANEOClient, max_pages: int = 50,
+                          allow_partial: bool = True) -> List[Dict]:
+    """Objects from up to max_pages browse pages, fetched concurrently after the first.
+
+    Failed pages are skipped with a warning; with allow_partial=False the first
+    failure is raised instead.
+    """
+    first = await client.get_neo_browse(page=0, size=BROWSE_PAGE_SIZE)
+    total_pages = min(first.get('page', {}).get('total_pages', 1), max_pages)
+    
+    # Concurrency is bounded by the client's shared AIMD limiter
+    pages = await asyncio.gather(
+        *(client.get_neo_browse(page=page, size=BROWSE_PAGE_SIZE) for page in range(1, total_pages)),
+        return_exceptions=True
+    )
+    
+    objects = list(first.get('near_earth_objects', []))
+    for page in pages:
+        if isinstance(page, Exception):
+            if not allow_partial:
+                raise page
+            logger.warning(f"Skipping browse page that failed: {page}")
+            continue
+        objects.extend(page.get('near_earth_objects', []))
+    return objects
+
+async def ensure_neo_index(client: NASANEOClient, max_pages: int = 50):
+    """Rebuild the index from a complete browse unless a current one is already in Redis.
+
+    Only one caller rebuilds at a time. Others keep using the previous index, or
+    wait for the first build when there is none yet. A rebuild that fails on any
+    page leaves the previous index (and the not-ready flag) untouched.
+    """
+    redis_conn = client.redis_conn
+    if await redis_conn.exists(INDEX_READY_KEY):
+        return
+    
+    if not await redis_conn.set(INDEX_LOCK_KEY, b'1', nx=True, ex=INDEX_BUILD_TIMEOUT):
+        if await redis_conn.exists(DIAMETER_ZSET_KEY):
+            return
+        deadline = time.monotonic() + INDEX_BUILD_TIMEOUT
+        while time.monotonic() < deadline and await redis_conn.exists(INDEX_LOCK_KEY):
+            await asyncio.sleep(INDEX_WAIT_INTERVAL)
+        return
+    
+    try:
+        neos = await browse_all_neos(client, max_pages, allow_partial=False)
+        await client.index_neos(neos)
+    except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpen) as e:
+        logger.warning(f"NEO index rebuild failed; keeping the previous index: {e}")
+    finally:
+        await redis_conn.delete(INDEX_LOCK_KEY)
+
+async def get_potentially_hazardous_asteroids(max_pages: int = 50) -> List[Dict]:
     """Get all potentially hazardous asteroids"""
     async with NASANEOClient() as client:
         try:
-            data = await client.get_neo_browse(size=1000)
-            pha_asteroids = [
-                neo for neo in data.get('near_earth_objects', [])
-                if neo.get('is_potentially_hazardous_asteroid', False)
-            ]
-            return pha_asteroids
+            await ensure_neo_index(client, max_pages)
+            pha_ids = await client.redis_conn.smembers(PHA_SET_KEY)
+            return await client.load_indexed_neos(list(pha_ids))
         except Exception as e:
             logger.error(f"Error fetching PHAs: {e}")
             return []
 
-async def get_asteroids_by_size(min_diameter: float, max_diameter: float) -> List[Dict]:
-    """Get asteroids filtered by diameter range"""
+async def iter_asteroids_by_size(min_diameter: float, max_diameter: float, max_pages: int = 50,
+                                 chunk_size: int = 100) -> AsyncIterator[Dict]:
+    """Yield asteroids in the diameter range, loading them from the index a chunk at a time"""
     async with NASANEOClient() as client:
-        try:
-            data = await client.get_neo_browse(size=1000)
-            filtered_asteroids = [
-                neo for neo in data.get('near_earth_objects', [])
-                if min_diameter <= neo.get('estimated_diameter', {}).get('meters', {}).get('estimated_diameter_max', 0) <= max_diameter
-            ]
-            return filtered_asteroids
-        except Exception as e:
-            logger.error(f"Error filtering asteroids by size: {e}")
-            return []
+        await ensure_neo_index(client, max_pages)
+        offset = 0
+        while True:
+            neo_ids = await client.redis_conn.zrangebyscore(
+                DIAMETER_ZSET_KEY, min_diameter, max_diameter, start=offset, num=chunk_size
+            )
+            for neo in await client.load_indexed_neos(neo_ids):
+                yield neo
+            if len(neo_ids) < chunk_size:
+                return
+            offset += chunk_size
+
+async def get_asteroids_by_size(min_diameter: float, max_diameter: float, max_pages: int = 50) -> List[Dict]:
+    """Get asteroids filtered by diameter range"""
+    try:
+        return [neo async for neo in iter_asteroids_by_size(min_diameter, max_diameter, max_pages)]
+    except Exception as e:
+        logger.error(f"Error filtering asteroids by size: {e}")
+        return []
 
 # Health check and monitoring
-def check_api_health() -> Dict:
-    """Check API health status"""
-    redis_conn = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
+async def _probe_nasa_api(client: NASANEOClient) -> bool:
+    """True when the NEO API answers at all (no API key, so no quota is spent)"""
+    session = await client.get_session()
+    async with session.head(client.base_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+        return response.status < 500
+
+async def check_api_health(client: Optional[NASANEOClient] = None) -> Dict:
+    """Check API health status, probing Redis and the NEO API concurrently.
+
+    Quota and last-success figures come from the process-wide client state. A
+    session or Redis pool that did not exist before the probe is closed after it.
+    """
+    client = client or NASANEOClient()
+    session = NASANEOClient._loop_sessions.get(asyncio.get_running_loop())
+    owns_session = session is None or session.closed
+    owns_redis = asyncio.get_running_loop() not in NASANEOClient._loop_redis
+    try:
+        redis_ok, api_ok = await asyncio.gather(
+            client.redis_conn.ping(),
+            _probe_nasa_api(client),
+            return_exceptions=True
+        )
+    finally:
+        if owns_session:
+            await NASANEOClient._close_session()
+        if owns_redis:
+            await NASANEOClient._close_redis()
     
     return {
-        'redis_connected': redis_conn.ping(),
+        'redis_connected': redis_ok is True,
+        'api_reachable': api_ok is True,
         'api_key_configured': bool(os.getenv('NASA_API_KEY')),
-        'rate_limit_remaining': 1000,  # This would need actual implementation
-        'last_successful_call': datetime.now().isoformat()
+        'rate_limit_remaining': client.quota_remaining(),
+        'last_successful_call': client.last_success.isoformat() if client.last_success else None
     }
 
 if __name__ == "__main__":
@@ -196,5 +696,14 @@ if __name__ == "__main__":
             # Get potentially hazardous asteroids
             phas = await get_potentially_hazardous_asteroids()
             print(f"Found {len(phas)} potentially hazardous asteroids")
+        
+        await NASANEOClient.close()
+    
+    # libuv-based loop where available (it has no Windows build)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     
     asyncio.run(main())
\ No newline at end of file
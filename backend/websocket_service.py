@@ -340,27 +340,23 @@ class RealTimeDataStreamer:
     
     def _stream_comprehensive_nasa_data(self):
         """Stream comprehensive NASA data using the NASA API service"""
+        # One loop per thread keeps the pooled NASA session alive between cycles
+        loop = asyncio.new_event_loop()
         while self.running:
             try:
-                # Get NEO feed data
-                neo_data = self.nasa_service.get_neo_feed()
-                if neo_data:
-                    self.socketio.emit('comprehensive_neo_data', neo_data, room='mission_control')
-                
-                # Get Mars weather data
-                mars_weather = self.nasa_service.get_mars_weather()
-                if mars_weather:
-                    self.socketio.emit('mars_weather', mars_weather, room='mission_control')
-                
-                # Get Earth imagery
-                earth_imagery = self.nasa_service.get_earth_imagery(lat=40.7128, lon=-74.0060)
-                if earth_imagery:
-                    self.socketio.emit('earth_imagery', earth_imagery, room='mission_control')
-                
-                # Get EPIC images
-                epic_images = self.nasa_service.get_epic_images()
-                if epic_images:
-                    self.socketio.emit('epic_images', epic_images, room='mission_control')
+                # Fetch NEO feed, Mars weather, Earth imagery and EPIC images concurrently
+                bundle = loop.run_until_complete(
+                    self.nasa_service.fetch_bundle(lat=40.7128, lon=-74.0060)
+                )
+                
+                if bundle['neo_feed']:
+                    self.socketio.emit('comprehensive_neo_data', bundle['neo_feed'], room='mission_control')
+                if bundle['mars_weather']:
+                    self.socketio.emit('mars_weather', bundle['mars_weather'], room='mission_control')
+                if bundle['earth_imagery']:
+                    self.socketio.emit('earth_imagery', bundle['earth_imagery'], room='mission_control')
+                if bundle['epic_images']:
+                    self.socketio.emit('epic_images', bundle['epic_images'], room='mission_control')
                 
                 logger.debug("Comprehensive NASA data streamed")
                 
@@ -368,6 +364,9 @@ class RealTimeDataStreamer:
                 logger.error(f"Error streaming comprehensive NASA data: {e}")
             
             time.sleep(60)  # Update every minute
+        
+        loop.run_until_complete(NASAAPIService.close_shared_session())
+        loop.close()
     
     def _stream_advanced_satellite_tracking(self):
         """Stream advanced satellite tracking data"""
@@ -42,12 +42,12 @@ if [ "$FLASK_DEBUG" = "True" ]; then
 else
     echo "Running in production mode..."
     # Use Gunicorn for production
+    # Flask-SocketIO needs a single eventlet worker (no sticky sessions configured)
     gunicorn --bind 0.0.0.0:5000 \
-             --workers 4 \
-             --threads 2 \
+             --worker-class eventlet \
+             --workers 1 \
              --timeout 120 \
              --access-logfile - \
              --error-logfile - \
-             --preload \
              app:app
 fi
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Shared fixtures for the Python backend tests (run with: python -m pytest tests/backend)
+"""
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other as top-level modules, as they do when run from backend/
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'backend')
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+# Importing app must not monkey-patch the stdlib for the whole test session
+os.environ.setdefault('EVENTLET_NO_MONKEY_PATCH', '1')
+
+TEST_REDIS_URL = os.getenv('TEST_REDIS_URL', 'redis://localhost:6379/15')
+
+def _redis_server_reachable(redis) -> bool:
+    client = redis.Redis.from_url(TEST_REDIS_URL)
+    try:
+        client.ping()
+        return True
+    except redis.exceptions.ConnectionError:
+        return False
+    finally:
+        client.close()
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """Client on a scratch Redis database, flushed around each test.
+
+    Uses the server at TEST_REDIS_URL when one answers and fakeredis otherwise;
+    skips when neither is available. Async code under test that builds its pool
+    with redis.asyncio.ConnectionPool.from_url sees the same data.
+    """
+    redis = pytest.importorskip('redis')
+    if _redis_server_reachable(redis):
+        client = redis.Redis.from_url(TEST_REDIS_URL)
+        monkeypatch.setenv('REDIS_URL', TEST_REDIS_URL)
+    else:
+        fakeredis = pytest.importorskip('fakeredis', reason='needs a Redis server at TEST_REDIS_URL or fakeredis')
+        server = fakeredis.FakeServer()
+        client = fakeredis.FakeRedis(server=server)
+        monkeypatch.setattr(redis.asyncio.ConnectionPool, 'from_url', classmethod(
+            lambda cls, url, **kwargs: fakeredis.FakeAsyncRedis(server=server).connection_pool))
+    client.flushdb()
+    yield client
+    client.flushdb()
+    client.close()
@@ -0,0 +1,331 @@
+"""
+Flask app: Redis Lua scripts, rate limiting, authentication and request validation
+"""
+import time
+
+import orjson
+import pytest
+
+msgspec = pytest.importorskip('msgspec')
+app_module = pytest.importorskip('app')
+
+def test_importing_the_app_leaves_the_stdlib_unpatched():
+    eventlet = pytest.importorskip('eventlet')
+    assert not eventlet.patcher.is_monkey_patched('socket')
+    assert not eventlet.patcher.is_monkey_patched('thread')
+
+@pytest.fixture
+def client(redis_client, monkeypatch):
+    """Flask test client whose caches and Lua-script rate limiters use the scratch Redis"""
+    monkeypatch.setattr(app_module, 'redis_client', redis_client)
+    for script in (app_module.TOKEN_BUCKET, app_module.SLIDING_WINDOW, app_module.CACHE_GET_OR_LOCK):
+        monkeypatch.setattr(script, 'registered_client', redis_client)
+    return app_module.app.test_client()
+
+# Token bucket: ARGV = capacity, refill rate (tokens/s), now, cost
+
+def take(redis_client, now, capacity=3, rate=1.0, cost=1, key='test:bucket'):
+    return app_module.TOKEN_BUCKET(keys=[key], args=[capacity, rate, now, cost], client=redis_client)
+
+def test_token_bucket_admits_a_full_burst_then_denies(redis_client):
+    assert [take(redis_client, 1000.0) for _ in range(4)] == [1, 1, 1, 0]
+
+def test_token_bucket_refills_lazily_at_the_configured_rate(redis_client):
+    for _ in range(3):
+        take(redis_client, 1000.0)
+    assert take(redis_client, 1000.5) == 0  # half a token so far
+    assert take(redis_client, 1001.0) == 1
+    assert take(redis_client, 1001.0) == 0
+
+def test_token_bucket_never_refills_past_capacity(redis_client):
+    take(redis_client, 1000.0)
+    results = [take(redis_client, 5000.0) for _ in range(4)]
+    assert results == [1, 1, 1, 0]
+
+def test_token_bucket_charges_the_request_cost(redis_client):
+    assert take(redis_client, 1000.0, cost=2) == 1
+    assert take(redis_client, 1000.0, cost=2) == 0
+    assert take(redis_client, 1000.0, cost=1) == 1
+
+def test_token_bucket_state_expires_once_it_would_be_full(redis_client):
+    take(redis_client, 1000.0, capacity=4, rate=2.0)
+    assert 0 < redis_client.ttl('test:bucket') <= 2
+
+def test_default_limit_answers_429_once_the_bucket_is_empty(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'RATE_LIMIT_CAPACITY', 2)
+    statuses = [client.get('/api/health').status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    assert client.get('/api/health').get_json() == {'error': 'Rate limit exceeded'}
+
+def test_default_limit_is_kept_per_client_address(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'RATE_LIMIT_CAPACITY', 1)
+    assert client.get('/api/health').status_code == 200
+    assert client.get('/api/health').status_code == 429
+    other = client.get('/api/health', environ_overrides={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 200
+
+# Authentication
+
+@pytest.fixture
+def users(monkeypatch):
+    """Private copy of the user store, so registrations do not leak between tests"""
+    for name in ('_PWHASH', '_ROLES', '_EMAILS'):
+        monkeypatch.setattr(app_module, name, dict(getattr(app_module, name)))
+
+def login(client, username, password):
+    return client.post('/api/auth/login', json={'username': username, 'password': password})
+
+def register(client, username, password, email='new@example.com'):
+    return client.post('/api/auth/register', json={'username': username, 'password': password, 'email': email})
+
+def test_login_with_the_seeded_admin_account(client, users):
+    response = login(client, 'admin', 'admin123')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['username'], body['role']) == ('admin', 'admin')
+    assert body['access_token']
+
+@pytest.mark.parametrize('username, password', [('admin', 'wrong'), ('nobody', 'admin123')])
+def test_login_rejects_bad_credentials_with_401(client, users, username, password):
+    response = login(client, username, password)
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Invalid credentials'}
+
+def test_registered_users_can_log_in_with_a_user_role(client, users):
+    assert register(client, 'alice', 's3cret!').status_code == 201
+    assert app_module._PWHASH['alice'] != b's3cret!'
+    response = login(client, 'alice', 's3cret!')
+    assert response.status_code == 200
+    assert response.get_json()['role'] == 'user'
+    assert login(client, 'alice', 'S3cret!').status_code == 401
+
+def test_register_rejects_an_existing_username(client, users):
+    response = register(client, 'admin', 'whatever')
+    assert response.status_code == 409
+    assert login(client, 'admin', 'admin123').status_code == 200
+
+def test_seeded_default_hashes_match_the_default_passwords():
+    bcrypt = pytest.importorskip('bcrypt')
+    assert bcrypt.checkpw(b'admin123', app_module.DEFAULT_PASSWORD_HASHES['ADMIN'])
+    assert bcrypt.checkpw(b'user123', app_module.DEFAULT_PASSWORD_HASHES['USER'])
+
+def test_seeding_does_not_hash_the_default_passwords(monkeypatch):
+    for name in ('ADMIN_PASSWORD', 'ADMIN_PASSWORD_HASH'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(app_module.bcrypt, 'hashpw', lambda *args: pytest.fail('hashed at seed time'))
+    assert app_module._seed_password_hash('ADMIN') == app_module.DEFAULT_PASSWORD_HASHES['ADMIN']
+
+def test_seeding_prefers_a_pre_baked_hash_from_the_environment(monkeypatch):
+    monkeypatch.setenv('ADMIN_PASSWORD_HASH', '$2b$12$pre-baked')
+    assert app_module._seed_password_hash('ADMIN') == b'$2b$12$pre-baked'
+
+LONG_PASSWORD = 'x' * 72 + 'y'
+
+def test_login_rejects_passwords_over_72_bytes_with_400(client, users):
+    response = login(client, 'admin', LONG_PASSWORD)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Password must be at most 72 bytes'}
+
+@pytest.mark.parametrize('password', [LONG_PASSWORD, '\u00e9' * 37])
+def test_register_rejects_passwords_over_72_bytes_with_400(client, users, password):
+    response = register(client, 'bob', password)
+    assert response.status_code == 400
+    assert 'bob' not in app_module._PWHASH
+
+def test_register_accepts_a_72_byte_password(client, users):
+    password = '\u00e9' * 36  # 72 bytes in UTF-8
+    assert register(client, 'bob', password).status_code == 201
+    assert login(client, 'bob', password).status_code == 200
+    assert login(client, 'bob', password[:-1] + 'e').status_code == 401
+
+# Request validation
+
+@pytest.mark.parametrize('body, error', [
+    ({'password': 'x'}, 'Missing required field: username'),
+    ({'username': 'admin'}, 'Missing required field: password'),
+    ({'username': 7, 'password': 'x'}, 'Field username must be str'),
+    ({'username': 'admin', 'password': None}, 'Field password must be str'),
+    ([], 'Request body must be a JSON object'),
+])
+def test_invalid_bodies_are_rejected_with_400(client, body, error):
+    response = client.post('/api/auth/login', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+
+def test_non_json_and_malformed_bodies_are_rejected_with_400(client):
+    response = client.post('/api/auth/login', data='username=admin')
+    assert (response.status_code, response.get_json()) == (400, {'error': 'Request must be JSON'})
+    response = client.post('/api/auth/login', data='{"username": ', content_type='application/json')
+    assert (response.status_code, response.get_json()) == (400, {'error': 'Malformed JSON body'})
+
+def test_compiled_validator_checks_presence_before_exact_type():
+    validate = app_module._compile_validator({'count': int, 'name': str})
+    assert validate({'count': 1, 'name': 'a'}) is None
+    assert validate({'name': 'a'}) == 'Missing required field: count'
+    assert validate({'count': True, 'name': 'a'}) == 'Field count must be int'
+
+# GET-or-lock: KEYS = value key, lock key; ARGV = lock TTL
+
+def get_or_lock(redis_client, key='test:value'):
+    return app_module.CACHE_GET_OR_LOCK(keys=[key, f'lock:{key}'], args=[5], client=redis_client)
+
+def test_get_or_lock_hands_the_fill_lock_to_the_first_caller_only(redis_client):
+    assert get_or_lock(redis_client) is None
+    assert 0 < redis_client.ttl('lock:test:value') <= 5
+    assert get_or_lock(redis_client) == b'WAIT'
+
+def test_get_or_lock_returns_cached_values_without_locking(redis_client):
+    redis_client.set('test:value', b'{"ok":true}')
+    assert get_or_lock(redis_client) == b'{"ok":true}'
+    assert not redis_client.exists('lock:test:value')
+
+@pytest.fixture
+def auth_headers(monkeypatch):
+    """Authorization header of a token cached_jwt_required has already verified"""
+    header = 'Bearer test-token'
+    monkeypatch.setitem(app_module._jwt_cache, header, (time.time() + 3600, {'username': 'user', 'role': 'user'}))
+    return {'Authorization': header}
+
+FEED_URL = '/api/neo/feed?start_date=2023-12-15&end_date=2023-12-16'
+FEED_KEY = 'neo:feed:2023-12-15:2023-12-16'
+
+def test_feed_miss_fills_the_cache_and_releases_the_lock(client, redis_client, auth_headers):
+    response = client.get(FEED_URL, headers=auth_headers)
+    assert response.status_code == 200
+    assert orjson.loads(redis_client.get(FEED_KEY)) == response.get_json()
+    assert redis_client.exists(app_module.NEO_FEED_LAST_GOOD_KEY)
+    assert not redis_client.exists(f'lock:{FEED_KEY}')
+
+def test_feed_hit_is_served_from_the_cache(client, redis_client, auth_headers):
+    redis_client.set(FEED_KEY, b'{"element_count":99}')
+    response = client.get(FEED_URL, headers=auth_headers)
+    assert response.get_json() == {'element_count': 99}
+
+# Sliding window: ARGV = now, window (s), limit, unique member; returns remaining quota or -1
+
+def hit(redis_client, now, member, window=60, limit=3, key='test:window'):
+    return app_module.SLIDING_WINDOW(keys=[key], args=[now, window, limit, member], client=redis_client)
+
+def test_sliding_window_counts_down_then_denies(redis_client):
+    assert [hit(redis_client, 100.0 + i, f'm{i}') for i in range(4)] == [2, 1, 0, -1]
+
+def test_sliding_window_does_not_record_denied_requests(redis_client):
+    for i in range(5):
+        hit(redis_client, 100.0 + i, f'm{i}')
+    assert redis_client.zcard('test:window') == 3
+
+def test_sliding_window_admits_again_as_old_hits_age_out(redis_client):
+    for i in range(3):
+        hit(redis_client, 100.0 + i, f'm{i}')
+    # Only the hit at t=100 has left the 60s window
+    assert hit(redis_client, 160.5, 'late') == 0
+    assert hit(redis_client, 160.6, 'later') == -1
+
+def test_sliding_window_routes_report_remaining_quota_then_429(client, auth_headers):
+    remaining = [client.get('/api/earthquakes', headers=auth_headers).headers['X-RateLimit-Remaining']
+                 for _ in range(15)]
+    assert remaining == [str(n) for n in range(14, -1, -1)]
+
+    response = client.get('/api/earthquakes', headers=auth_headers)
+    assert response.status_code == 429
+    assert response.headers['X-RateLimit-Remaining'] == '0'
+    assert response.get_json() == {'error': 'Rate limit exceeded'}
+
+def test_sliding_window_routes_are_exempt_from_the_global_bucket(client, auth_headers, monkeypatch):
+    views = app_module.app.view_functions
+    assert views['neo_feed'].sliding_window_limited
+    assert not getattr(views['login'], 'sliding_window_limited', False)
+
+    monkeypatch.setattr(app_module, 'RATE_LIMIT_CAPACITY', 1)
+    assert client.get('/api/health').status_code == 200
+    assert client.get('/api/health').status_code == 429
+    assert client.get('/api/earthquakes', headers=auth_headers).status_code == 200
+
+# Date validation
+
+@pytest.mark.parametrize('value', ['2023-12-15', '2024-02-29', '1999-01-31'])
+def test_is_iso_date_accepts_real_dates(value):
+    assert app_module.is_iso_date(value)
+
+@pytest.mark.parametrize('value', [
+    '2023-02-29', '2023-02-30', '2023-04-31', '2023-13-01', '2023-00-10',
+    '2023-1-01', '2023-01-01T00:00', '20230101', ''
+])
+def test_is_iso_date_rejects_malformed_or_impossible_dates(value):
+    assert not app_module.is_iso_date(value)
+
+def test_feed_rejects_impossible_dates_with_400_before_locking(client, redis_client, auth_headers):
+    response = client.get('/api/neo/feed?start_date=2023-02-30&end_date=2023-03-01', headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid date format. Use YYYY-MM-DD'
+    assert not redis_client.exists('lock:neo:feed:2023-02-30:2023-03-01')
+
+# Verified-token cache
+
+def test_protected_routes_answer_401_without_a_token(client):
+    response = client.get('/api/earthquakes')
+    assert response.status_code == 401
+
+def test_verified_tokens_are_cached_until_they_expire(client, monkeypatch):
+    monkeypatch.setattr(app_module, '_jwt_cache', {})
+    with app_module.app.app_context():
+        token = app_module.create_access_token(identity='alice')
+    header = f'Bearer {token}'
+
+    assert client.get('/api/earthquakes', headers={'Authorization': header}).status_code == 200
+    expires, identity = app_module._jwt_cache[header]
+    assert identity == 'alice'
+    assert time.time() < expires <= time.time() + 3600
+
+def test_expired_cache_entries_are_verified_again(client, monkeypatch):
+    header = 'Bearer not-a-jwt'
+    monkeypatch.setitem(app_module._jwt_cache, header, (time.time() - 1, 'alice'))
+    response = client.get('/api/earthquakes', headers={'Authorization': header})
+    assert response.status_code == 422
+
+# Impact simulation request schema
+
+VALID_IMPACT = {
+    'diameter': 120.0,
+    'density': 3000.0,
+    'velocity': 19.5,
+    'angle': 45.0,
+    'latitude': 40.7,
+    'longitude': -74.0
+}
+
+def decode_impact(body):
+    return msgspec.json.decode(orjson.dumps(body), type=app_module.ImpactRequest)
+
+def test_impact_request_decodes_a_valid_body():
+    params = decode_impact(VALID_IMPACT)
+    assert msgspec.structs.asdict(params) == VALID_IMPACT
+
+def test_impact_request_accepts_integers_for_float_fields():
+    assert decode_impact({**VALID_IMPACT, 'angle': 30}).angle == 30.0
+
+def test_impact_request_rejects_a_missing_field():
+    body = {k: v for k, v in VALID_IMPACT.items() if k != 'velocity'}
+    with pytest.raises(msgspec.ValidationError, match='velocity'):
+        decode_impact(body)
+
+def test_impact_request_rejects_a_wrongly_typed_field():
+    with pytest.raises(msgspec.ValidationError, match=r'\$\.diameter'):
+        decode_impact({**VALID_IMPACT, 'diameter': 'large'})
+
+def test_impact_request_rejects_malformed_json():
+    with pytest.raises(msgspec.DecodeError):
+        msgspec.json.decode(b'{"diameter": ', type=app_module.ImpactRequest)
+
+def test_simulate_echoes_the_decoded_parameters(client, auth_headers):
+    response = client.post('/api/impact/simulate', json=VALID_IMPACT, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['input_parameters'] == VALID_IMPACT
+    assert body['impact_energy_megatons'] == pytest.approx(
+        body['impact_energy_joules'] / app_module.JOULES_PER_MEGATON_TNT)
+
+def test_simulate_rejects_invalid_bodies_with_400(client, auth_headers):
+    response = client.post('/api/impact/simulate', json={**VALID_IMPACT, 'diameter': 'large'}, headers=auth_headers)
+    assert response.status_code == 400
+    assert '$.diameter' in response.get_json()['error']
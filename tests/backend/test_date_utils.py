@@ -0,0 +1,16 @@
+"""
+Shared date helpers
+"""
+import time
+
+import date_utils
+
+def test_today_iso_is_the_local_date():
+    assert date_utils.today_iso() == time.strftime('%Y-%m-%d')
+
+def test_today_iso_is_formatted_once_per_second(monkeypatch):
+    monkeypatch.setattr(date_utils, '_today_cache', (1000, 'cached'))
+    monkeypatch.setattr(date_utils.time, 'time', lambda: 1000.9)
+    assert date_utils.today_iso() == 'cached'
+    monkeypatch.setattr(date_utils.time, 'time', lambda: 1001.0)
+    assert date_utils.today_iso() == time.strftime('%Y-%m-%d', time.localtime(1001))
@@ -0,0 +1,110 @@
+"""
+Earth observation service: streaming base64 encoder, the on-disk image cache
+and the GOES/Landsat records
+"""
+import asyncio
+import base64
+import collections
+import hashlib
+import json
+import os
+
+import pytest
+
+eo = pytest.importorskip('earth_observation_service')
+
+class FakeContent:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def iter_chunked(self, size):
+        for chunk in self._chunks:
+            yield chunk
+
+class FakeResponse:
+    def __init__(self, chunks):
+        self.content = FakeContent(chunks)
+
+def split(data, sizes):
+    """Cut data into consecutive chunks of the given sizes, cycling through them"""
+    chunks, offset, i = [], 0, 0
+    while offset < len(data):
+        chunks.append(data[offset:offset + sizes[i % len(sizes)]])
+        offset += sizes[i % len(sizes)]
+        i += 1
+    return chunks
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(eo, 'IMAGE_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(eo.EarthObservationService, '_shared_cache', collections.OrderedDict())
+    monkeypatch.setattr(eo.EarthObservationService, '_image_refs', collections.Counter())
+    return eo.EarthObservationService()
+
+# Chunk sizes that are not multiples of 3 force the encoder to carry bytes between chunks
+SMALL_CASES = [(length, sizes) for length in (0, 1, 2, 3, 4, 5, 100) for sizes in ([1], [2], [4, 7])]
+LARGE_CASES = [(length, sizes) for length in (eo._STREAM_CHUNK_SIZE - 1, eo._STREAM_CHUNK_SIZE + 1, 1_000_003)
+               for sizes in ([eo._STREAM_CHUNK_SIZE], [65537, 1000])]
+
+@pytest.mark.parametrize('length, sizes', SMALL_CASES + LARGE_CASES)
+def test_streamed_base64_matches_one_shot_encoding(service, length, sizes):
+    data = os.urandom(length)
+    encoded, path = asyncio.run(service._stream_image(FakeResponse(split(data, sizes))))
+
+    assert encoded == base64.b64encode(data).decode('ascii')
+    with open(path, 'rb') as f:
+        assert f.read() == data
+    assert os.path.basename(path) == f"{hashlib.sha1(data).hexdigest()}.png"
+
+def test_stream_leaves_no_temporary_files(service, tmp_path):
+    asyncio.run(service._stream_image(FakeResponse([b'abc', b'defg'])))
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+def cached_image(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b'png')
+    return str(path)
+
+def test_image_file_outlives_entries_until_its_last_reference_goes(service, tmp_path):
+    shared = cached_image(tmp_path, 'shared.png')
+    service._cache_data(('earth_imagery', 1), {'_image_path': shared})
+    service._cache_data(('epic_images', 1), {'images': [{'_image_path': shared}]})
+
+    service._drop_cached(('earth_imagery', 1))
+    assert os.path.exists(shared)
+    service._drop_cached(('epic_images', 1))
+    assert not os.path.exists(shared)
+
+def test_lru_eviction_deletes_the_evicted_image(service, tmp_path, monkeypatch):
+    monkeypatch.setattr(eo.EarthObservationService, 'cache_max_entries', 1)
+    first = cached_image(tmp_path, 'first.png')
+    second = cached_image(tmp_path, 'second.png')
+    service._cache_data(('earth_imagery', 1), {'_image_path': first})
+    service._cache_data(('earth_imagery', 2), {'_image_path': second})
+
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+def test_replacing_an_entry_releases_its_previous_image(service, tmp_path):
+    old = cached_image(tmp_path, 'old.png')
+    new = cached_image(tmp_path, 'new.png')
+    service._cache_data(('earth_imagery', 1), {'_image_path': old})
+    service._cache_data(('earth_imagery', 1), {'_image_path': new})
+
+    assert not os.path.exists(old)
+    assert os.path.exists(new)
+
+def test_goes_and_landsat_records_are_plain_dicts(service):
+    goes = asyncio.run(service.get_goes_weather_imagery())
+    landsat = asyncio.run(service.get_landsat_imagery(path=14, row=32, date='2024-05-01'))
+
+    for record in goes['images'] + landsat['scenes']:
+        assert type(record) is dict
+    json.dumps(goes)
+    json.dumps(landsat)
+    assert landsat['scenes'][0]['scene_id'] == 'LC08_014032_20240501_01_T1'
+
+def test_records_do_not_share_the_band_tables(service):
+    landsat = asyncio.run(service.get_landsat_imagery(path=14, row=32, date='2024-05-01'))
+    landsat['scenes'][0]['bands'].clear()
+    assert eo._LANDSAT_BANDS
@@ -0,0 +1,92 @@
+"""
+Meteorological simulation: fused moments kernel, baseline cache and CSV export
+"""
+import asyncio
+import csv
+import io
+
+import pytest
+
+np = pytest.importorskip('numpy')
+meteo = pytest.importorskip('meteorological_simulation_service')
+
+WEATHER_DTYPE = meteo.WEATHER_DTYPE
+
+def make_weather(hours=240, seed=7):
+    rng = np.random.default_rng(seed)
+    weather = np.empty(hours, dtype=WEATHER_DTYPE)
+    weather['temperature'] = rng.normal(15, 8, hours).round(1)
+    weather['pressure'] = rng.normal(1013, 12, hours).round(1)
+    weather['humidity'] = rng.uniform(20, 100, hours).round(1)
+    weather['wind_speed'] = rng.gamma(2, 3, hours).round(1)
+    weather['wind_direction'] = rng.uniform(0, 360, hours).round(1)
+    weather['precipitation'] = np.where(rng.random(hours) < 0.3, rng.exponential(2, hours), 0).round(2)
+    weather['cloud_cover'] = rng.uniform(0, 100, hours).round(1)
+    weather['visibility'] = rng.uniform(0.1, 20, hours).round(1)
+    weather['uv_index'] = rng.uniform(0, 11, hours).round(1)
+    weather['air_quality'] = rng.integers(0, 300, hours)
+    return weather
+
+def test_fused_moments_kernel_matches_numpy():
+    columns = np.random.default_rng(3).normal([[10.0], [1000.0], [-5.0]], [[2.0], [30.0], [0.5]], (3, 1000))
+    means, mins, maxs, covariance = meteo._fused_moments_kernel(columns)
+
+    np.testing.assert_allclose(means, columns.mean(axis=1), rtol=1e-9)
+    np.testing.assert_array_equal(mins, columns.min(axis=1))
+    np.testing.assert_array_equal(maxs, columns.max(axis=1))
+    np.testing.assert_allclose(np.sqrt(np.diag(covariance)), columns.std(axis=1), rtol=1e-9)
+    np.testing.assert_allclose(covariance, np.cov(columns, bias=True), rtol=1e-9, atol=1e-9)
+
+def test_column_moments_match_numpy_statistics():
+    service = meteo.MeteorologicalSimulationService(seed=1)
+    weather = make_weather()
+    moments, correlation = service._column_moments(weather)
+
+    columns = np.vstack([weather[name].astype(np.float64) for name in service._MOMENT_COLUMNS])
+    for name, column in zip(service._MOMENT_COLUMNS, columns):
+        assert moments[name]['mean'] == pytest.approx(np.mean(column), rel=1e-9)
+        assert moments[name]['std'] == pytest.approx(np.std(column), rel=1e-9)
+        assert moments[name]['min'] == column.min()
+        assert moments[name]['max'] == column.max()
+    np.testing.assert_allclose(correlation, np.corrcoef(columns), rtol=1e-9, atol=1e-12)
+
+def test_baseline_runs_share_weather_but_not_memory():
+    service = meteo.MeteorologicalSimulationService(seed=1)
+    location = {'lat': 40.7, 'lon': -74.0}
+    first = asyncio.run(service._generate_baseline_weather(location, 1))
+    second = asyncio.run(service._generate_baseline_weather(location, 1))
+
+    np.testing.assert_array_equal(first, second)
+    first['temperature'] += 10
+    third = asyncio.run(service._generate_baseline_weather(location, 1))
+    np.testing.assert_array_equal(third, second)
+
+def test_baseline_cache_is_bounded():
+    service = meteo.MeteorologicalSimulationService(seed=1)
+    for lon in range(service._BASELINE_CACHE_SIZE + 5):
+        asyncio.run(service._generate_baseline_weather({'lat': 10.0, 'lon': float(lon)}, 1))
+    assert len(service._baseline_cache) == service._BASELINE_CACHE_SIZE
+
+def test_csv_export_writes_one_row_per_hour_at_generator_precision():
+    service = meteo.MeteorologicalSimulationService(seed=1)
+    weather = make_weather(hours=48)
+    service.simulation_cache['sim_test'] = {'scenario_data': weather}
+
+    exported = asyncio.run(service.export_simulation_data('sim_test', format='csv'))
+    rows = list(csv.reader(io.StringIO(exported)))
+
+    assert rows[0] == ['hour', *WEATHER_DTYPE.names]
+    assert len(rows) == 1 + len(weather)
+    precipitation = rows[0].index('precipitation')
+    for hour, (row, record) in enumerate(zip(rows[1:], weather)):
+        assert row[0] == str(hour)
+        assert float(row[1]) == pytest.approx(float(record['temperature']), abs=0.05)
+        assert row[precipitation] == f"{float(record['precipitation']):.2f}"
+        assert row[-1] == str(int(record['air_quality']))
+
+def test_csv_export_of_an_empty_simulation_is_just_the_header():
+    service = meteo.MeteorologicalSimulationService(seed=1)
+    service.simulation_cache['sim_empty'] = {}
+
+    exported = asyncio.run(service.export_simulation_data('sim_empty', format='csv'))
+    assert exported.strip() == ','.join(('hour',) + WEATHER_DTYPE.names)
@@ -0,0 +1,141 @@
+"""
+NASA API service: vectorized NEO risk tiers against the original per-object rules,
+the two-tier response cache and pooled-session shutdown
+"""
+import asyncio
+import itertools
+import sqlite3
+import threading
+
+import pytest
+
+np = pytest.importorskip('numpy')
+nasa_api_service = pytest.importorskip('nasa_api_service')
+
+LABELS = ('low', 'medium', 'high', 'extreme')
+
+def reference_risk(avg_diameter_km, miss_distance_lunar, velocity_kms):
+    """The if/elif classification the searchsorted tiers replaced"""
+    size = 'low'
+    if avg_diameter_km > 1.0:
+        size = 'extreme'
+    elif avg_diameter_km > 0.5:
+        size = 'high'
+    elif avg_diameter_km > 0.1:
+        size = 'medium'
+
+    proximity = 'low'
+    if miss_distance_lunar < 1:
+        proximity = 'extreme'
+    elif miss_distance_lunar < 5:
+        proximity = 'high'
+    elif miss_distance_lunar < 20:
+        proximity = 'medium'
+
+    velocity = 'low'
+    if velocity_kms > 30:
+        velocity = 'high'
+    elif velocity_kms > 20:
+        velocity = 'medium'
+
+    total = sum(LABELS.index(label) + 1 for label in (size, proximity, velocity))
+    overall = 'extreme' if total >= 10 else 'high' if total >= 8 else 'medium' if total >= 6 else 'low'
+    return size, proximity, velocity, overall
+
+# Every threshold plus values just either side of it
+DIAMETERS_KM = [0.0, 0.05, 0.1, 0.1000001, 0.3, 0.5, 0.5000001, 0.75, 1.0, 1.0000001, 5.0]
+MISS_DISTANCES_LUNAR = [0.2, 0.9999999, 1.0, 3.0, 4.9999999, 5.0, 12.0, 19.9999999, 20.0, 60.0]
+VELOCITIES_KMS = [5.0, 20.0, 20.0000001, 25.0, 30.0, 30.0000001, 70.0]
+
+CASES = list(itertools.product(DIAMETERS_KM, MISS_DISTANCES_LUNAR, VELOCITIES_KMS))
+
+def test_risk_tiers_match_the_threshold_rules_at_every_boundary():
+    diameters, distances, velocities = (np.array(column) for column in zip(*CASES))
+    tiers = nasa_api_service._impact_risk_tiers(diameters, distances, velocities)
+
+    assert tiers.shape == (3, len(CASES))
+    for (size, proximity, velocity), case in zip(tiers.T.tolist(), CASES):
+        assert (LABELS[size], LABELS[proximity], LABELS[velocity]) == reference_risk(*case)[:3], case
+
+def test_assessment_matches_the_overall_risk_rules():
+    service = nasa_api_service.NASAAPIService()
+    diameters, distances, velocities = (np.array(column) for column in zip(*CASES))
+    tiers = nasa_api_service._impact_risk_tiers(diameters, distances, velocities)
+
+    for (size, proximity, velocity), case in zip(tiers.T.tolist(), CASES):
+        assessment = service._assess_impact_risk(size, proximity, velocity)
+        assert assessment['overall_risk'] == reference_risk(*case)[3], case
+        assert assessment['potential_damage'] == nasa_api_service._DAMAGE_LABELS[LABELS.index(assessment['overall_risk'])]
+
+# Response cache
+
+@pytest.fixture
+def response_cache(tmp_path):
+    return nasa_api_service._ResponseCache(str(tmp_path / 'cache.sqlite'))
+
+def disk_keys(cache):
+    with sqlite3.connect(cache.path) as db:
+        return {key for (key,) in db.execute('SELECT key FROM responses')}
+
+def test_cached_responses_are_decoded_per_caller(response_cache):
+    async def main():
+        await response_cache.set('k', {'items': [1, 2]}, 60)
+        return await response_cache.get('k'), await response_cache.get('k')
+
+    first, second = asyncio.run(main())
+    assert first == second == {'items': [1, 2]}
+    first['items'].append(3)
+    assert first is not second and second == {'items': [1, 2]}
+
+def test_responses_survive_in_sqlite_for_a_new_process(response_cache):
+    asyncio.run(response_cache.set('k', [{'name': 'Kepler-22 b'}], 60))
+    restarted = nasa_api_service._ResponseCache(response_cache.path)
+    assert asyncio.run(restarted.get('k')) == [{'name': 'Kepler-22 b'}]
+
+def test_reading_an_expired_row_deletes_it(response_cache):
+    asyncio.run(response_cache.set('k', {'old': True}, -1))
+    restarted = nasa_api_service._ResponseCache(response_cache.path)
+    assert asyncio.run(restarted.get('k')) is None
+    assert disk_keys(restarted) == set()
+
+def test_writes_purge_expired_rows_once_per_interval(response_cache):
+    async def main():
+        await response_cache.set('fresh', {}, 60)  # first write sweeps and schedules the next one
+        await response_cache.set('stale', {}, -1)
+        kept_until_next_sweep = disk_keys(response_cache)
+        response_cache._next_purge = 0.0
+        await response_cache.set('other', {}, 60)
+        return kept_until_next_sweep
+
+    assert asyncio.run(main()) == {'stale', 'fresh'}
+    assert disk_keys(response_cache) == {'fresh', 'other'}
+
+# Pooled sessions at interpreter exit
+
+async def open_session():
+    return nasa_api_service.NASAAPIService._get_shared_session()
+
+def test_exit_hook_closes_sessions_on_their_own_running_loops():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        session = asyncio.run_coroutine_threadsafe(open_session(), loop).result(5)
+        nasa_api_service.NASAAPIService._close_shared_session_at_exit()
+        assert session.closed
+        assert loop not in nasa_api_service.NASAAPIService._loop_sessions
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+def test_exit_hook_leaves_idle_loops_to_their_owners():
+    loop = asyncio.new_event_loop()
+    try:
+        session = loop.run_until_complete(open_session())
+        nasa_api_service.NASAAPIService._close_shared_session_at_exit()
+        assert not session.closed
+        loop.run_until_complete(nasa_api_service.NASAAPIService.close_shared_session())
+        assert session.closed
+    finally:
+        loop.close()
@@ -0,0 +1,414 @@
+"""
+NEO client, run against a local fake of the NEO API and the scratch Redis
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+
+import orjson
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+web = pytest.importorskip('aiohttp.web')
+neo_api = pytest.importorskip('neo_api')
+
+NASANEOClient = neo_api.NASANEOClient
+
+class FakeNEOAPI:
+    """NEO API stand-in served from its own thread and event loop.
+
+    Replies come from queue while it has entries, then from reply(request);
+    each is a (status, JSON-able body, headers) tuple.
+    """
+
+    def __init__(self):
+        self.queue = deque()
+        self.reply = lambda request: (200, {'ok': True}, {})
+        self.delay = 0.0
+        self.requests = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def _handle(self, request):
+        self.requests.append((request.method, request.path, dict(request.query)))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status, body, headers = self.queue.popleft() if self.queue else self.reply(request)
+        return web.Response(status=status, body=orjson.dumps(body), headers=headers,
+                            content_type='application/json')
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        return self._runner.addresses[0][1]
+
+    def start(self):
+        self._thread.start()
+        port = asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(5)
+        self.url = f'http://127.0.0.1:{port}/neo/rest/v1'
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop.close()
+
+    def api_calls(self, path_suffix=''):
+        return [r for r in self.requests if r[0] == 'GET' and r[1].endswith(path_suffix)]
+
+@pytest.fixture
+def api():
+    server = FakeNEOAPI()
+    server.start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def client(api, redis_client, monkeypatch):
+    """Client against the fake API and the scratch Redis, with fresh process-wide state"""
+    monkeypatch.setenv('NASA_NEO_BASE_URL', api.url)
+    monkeypatch.setattr(NASANEOClient, '_l1', OrderedDict())
+    monkeypatch.setattr(NASANEOClient, '_limiter', neo_api.AIMDLimiter())
+    monkeypatch.setattr(NASANEOClient, '_server_errors', deque(maxlen=neo_api.CIRCUIT_ERROR_THRESHOLD))
+    monkeypatch.setattr(NASANEOClient, '_circuit_open_until', 0.0)
+    monkeypatch.setattr(NASANEOClient, '_request_times', deque())
+    monkeypatch.setattr(NASANEOClient, 'rate_limit', 1000)
+    monkeypatch.setattr(NASANEOClient, 'remaining', None)
+    monkeypatch.setattr(NASANEOClient, 'reset_ts', 0.0)
+    monkeypatch.setattr(NASANEOClient, 'last_success', None)
+    return NASANEOClient()
+
+def run(coro):
+    """Run coro on a fresh event loop, closing the client's shared resources before the loop ends"""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await NASANEOClient.close()
+    return asyncio.run(main())
+
+
+def test_transient_server_errors_are_retried(client, api):
+    api.queue.extend([(503, {}, {}), (502, {}, {})])
+    assert run(client.get_neo_stats()) == {'ok': True}
+    assert len(api.api_calls('/stats')) == 3
+
+def test_client_errors_are_not_retried(client, api):
+    api.queue.append((404, {'error': 'not found'}, {}))
+    with pytest.raises(aiohttp.ClientResponseError) as excinfo:
+        run(client.get_neo_lookup('3542519'))
+    assert excinfo.value.status == 404
+    assert len(api.api_calls()) == 1
+
+def test_429_waits_for_retry_after_before_the_next_attempt(client, api):
+    api.queue.append((429, {}, {'Retry-After': '0.3'}))
+    started = time.monotonic()
+    assert run(client.get_neo_stats()) == {'ok': True}
+    assert time.monotonic() - started >= 0.3
+    assert len(api.api_calls()) == 2
+
+
+def test_sliding_hour_holds_requests_until_the_oldest_ages_out(client):
+    NASANEOClient.rate_limit = 2
+    now = time.monotonic()
+    NASANEOClient._request_times.extend([now - neo_api.RATE_LIMIT_WINDOW + 0.2, now - 10])
+    started = time.monotonic()
+    asyncio.run(client.check_rate_limit())
+    assert time.monotonic() - started >= 0.15
+    assert len(NASANEOClient._request_times) == 2
+
+def test_quota_headers_are_recorded_process_wide(client, api):
+    api.reply = lambda request: (200, {}, {'X-RateLimit-Limit': '40', 'X-RateLimit-Remaining': '17'})
+    run(client.get_neo_stats())
+    other = NASANEOClient()
+    assert (other.rate_limit, other.quota_remaining()) == (40, 17)
+    assert other.last_success is not None
+
+def test_quota_falls_back_to_the_sliding_window(client):
+    NASANEOClient._request_times.extend([time.monotonic() - neo_api.RATE_LIMIT_WINDOW - 1, time.monotonic()])
+    assert client.quota_remaining() == 999
+
+
+def test_aimd_limit_grows_additively_and_halves_on_overload():
+    limiter = neo_api.AIMDLimiter(initial=4, minimum=1, maximum=6)
+
+    async def outcome(overloaded, latency=0.1):
+        await limiter.acquire()
+        await limiter.release(latency, overloaded)
+        return limiter.limit
+
+    async def main():
+        grown = [await outcome(False) for _ in range(3)]
+        shrunk = [await outcome(True) for _ in range(3)]
+        return grown, shrunk
+
+    assert asyncio.run(main()) == ([5, 6, 6], [3, 1, 1])
+
+def test_aimd_limit_shrinks_when_mean_latency_exceeds_the_target():
+    limiter = neo_api.AIMDLimiter(initial=8, target_latency=1.0, window=2)
+
+    async def main():
+        await limiter.acquire()
+        await limiter.release(3.0, False)
+        return limiter.limit
+
+    assert asyncio.run(main()) == 4
+
+def test_aimd_acquire_waits_for_a_free_slot():
+    limiter = neo_api.AIMDLimiter(initial=1)
+
+    async def main():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.05)
+        blocked = not waiter.done()
+        await limiter.release(0.1, False)
+        await asyncio.wait_for(waiter, 1)
+        return blocked
+
+    assert asyncio.run(main())
+
+def test_clustered_server_errors_open_the_circuit(client, api):
+    api.reply = lambda request: (500, {}, {})
+    with pytest.raises(neo_api.CircuitOpen):
+        run(client.get_neo_stats())
+    assert len(api.api_calls()) == neo_api.CIRCUIT_ERROR_THRESHOLD
+
+    # Open circuits fail fast without touching the API
+    with pytest.raises(neo_api.CircuitOpen):
+        run(client.get_neo_lookup('3542519'))
+    assert len(api.api_calls()) == neo_api.CIRCUIT_ERROR_THRESHOLD
+
+def test_a_success_resets_the_server_error_count(client):
+    client.record_outcome(500)
+    client.record_outcome(500)
+    client.record_outcome(200)
+    client.record_outcome(500)
+    client.check_circuit()
+
+
+def test_cache_key_is_versioned_and_independent_of_param_order():
+    client = NASANEOClient()
+    key = client.cache_key('feed', {'start_date': '2024-01-01', 'end_date': '2024-01-02'})
+    assert key.startswith(neo_api.CACHE_KEY_PREFIX)
+    assert key == client.cache_key('feed', {'end_date': '2024-01-02', 'start_date': '2024-01-01'})
+    assert key != client.cache_key('feed', {'start_date': '2024-01-01', 'end_date': '2024-01-03'})
+
+
+def test_concurrent_misses_share_one_api_call(client, api):
+    api.delay = 0.2
+
+    async def misses():
+        # Separate clients, going straight to Redis, stand in for separate processes
+        key = client.cache_key('stats', {})
+        return await asyncio.gather(*(NASANEOClient()._get_through_redis('stats', {}, key) for _ in range(5)))
+
+    assert run(misses()) == [b'{"ok":true}'] * 5
+    assert len(api.api_calls()) == 1
+
+def test_early_refresh_in_progress_serves_the_current_entry(client, api, redis_client, monkeypatch):
+    monkeypatch.setattr(neo_api, '_refresh_early', lambda fetch_seconds, ttl_ms: True)
+    key = client.cache_key('stats', {})
+    redis_client.set(key, neo_api._encode_entry(0.5, b'{"cached":true}'), ex=60)
+    redis_client.set(f'{key}:lock', b'1', ex=10)
+
+    assert run(client._get_through_redis('stats', {}, key)) == b'{"cached":true}'
+    assert api.api_calls() == []
+
+def test_early_refresh_replaces_the_entry(client, api, redis_client, monkeypatch):
+    monkeypatch.setattr(neo_api, '_refresh_early', lambda fetch_seconds, ttl_ms: True)
+    key = client.cache_key('stats', {})
+    redis_client.set(key, neo_api._encode_entry(0.5, b'{"cached":true}'), ex=60)
+
+    assert run(client._get_through_redis('stats', {}, key)) == b'{"ok":true}'
+    assert neo_api._decode_entry(redis_client.get(key))[1] == b'{"ok":true}'
+    assert not redis_client.exists(f'{key}:lock')
+
+@pytest.mark.parametrize('reply', [(500, {}, {}), (429, {}, {'Retry-After': '60'}), (404, {}, {})])
+def test_failed_early_refresh_serves_the_current_entry(client, api, redis_client, monkeypatch, reply):
+    monkeypatch.setattr(neo_api, '_refresh_early', lambda fetch_seconds, ttl_ms: True)
+    api.reply = lambda request: reply
+    key = client.cache_key('stats', {})
+    redis_client.set(key, neo_api._encode_entry(0.5, b'{"cached":true}'), ex=60)
+
+    assert run(client.get_neo_stats()) == {'cached': True}
+    assert len(api.api_calls()) == 1
+    assert not redis_client.exists(f'{key}:lock')
+
+def test_early_refresh_with_the_circuit_open_serves_the_current_entry(client, api, redis_client, monkeypatch):
+    monkeypatch.setattr(neo_api, '_refresh_early', lambda fetch_seconds, ttl_ms: True)
+    monkeypatch.setattr(NASANEOClient, '_circuit_open_until', time.monotonic() + 60)
+    key = client.cache_key('stats', {})
+    redis_client.set(key, neo_api._encode_entry(0.5, b'{"cached":true}'), ex=60)
+
+    assert run(client.get_neo_stats()) == {'cached': True}
+    assert api.api_calls() == []
+
+@pytest.mark.parametrize('ttl_ms', [-1, -2])
+def test_keys_without_a_ttl_are_never_refreshed_early(ttl_ms):
+    assert not neo_api._refresh_early(1e9, ttl_ms)
+
+
+@pytest.mark.parametrize('body', [
+    b'{}',
+    b'{"element_count":0,"near_earth_objects":{}}',
+    orjson.dumps({'near_earth_objects': [{'id': str(i), 'name': f'({i})'} for i in range(500)]}),
+    orjson.dumps([1, 2]),
+])
+@pytest.mark.parametrize('fetch_seconds', [0.0, 0.25, 12.5])
+def test_entries_round_trip_body_and_fetch_time(body, fetch_seconds):
+    assert neo_api._decode_entry(neo_api._encode_entry(fetch_seconds, body)) == (fetch_seconds, body)
+
+def test_entries_are_compressed():
+    body = orjson.dumps({'near_earth_objects': [{'id': str(i), 'hazardous': False} for i in range(1000)]})
+    assert len(neo_api._encode_entry(1.0, body)) < len(body) // 4
+
+
+def browse_page(neos, total_pages=1):
+    return {'page': {'total_pages': total_pages}, 'near_earth_objects': neos}
+
+def neo(neo_id, hazardous=False, diameter_m=100.0):
+    return {'id': neo_id, 'is_potentially_hazardous_asteroid': hazardous,
+            'estimated_diameter': {'meters': {'estimated_diameter_max': diameter_m}}}
+
+def test_rebuilding_the_index_replaces_it_whole(client, redis_client):
+    run(client.index_neos([neo('1', True, 50.0), neo('2', True, 900.0), neo('3')]))
+    run(client.index_neos([neo('3', True, 120.0)]))
+
+    assert redis_client.smembers(neo_api.PHA_SET_KEY) == {b'3'}
+    assert redis_client.zrange(neo_api.DIAMETER_ZSET_KEY, 0, -1, withscores=True) == [(b'3', 120.0)]
+    assert redis_client.hkeys(neo_api.OBJECT_HASH_KEY) == [b'3']
+    assert redis_client.exists(neo_api.INDEX_READY_KEY)
+    assert redis_client.keys('*:build:*') == []
+
+def test_index_with_no_hazardous_objects_clears_the_pha_set(client, redis_client):
+    run(client.index_neos([neo('1', True)]))
+    run(client.index_neos([neo('2')]))
+    assert not redis_client.exists(neo_api.PHA_SET_KEY)
+
+def test_ensure_index_builds_from_every_browse_page(client, api, redis_client):
+    pages = {'0': [neo('1', True, 40.0)], '1': [neo('2', False, 700.0)]}
+    api.reply = lambda request: (200, browse_page(pages[request.query['page']], total_pages=2), {})
+
+    async def sizes():
+        await neo_api.ensure_neo_index(client)
+        return [record['id'] async for record in neo_api.iter_asteroids_by_size(100, 1000)]
+
+    assert run(sizes()) == ['2']
+    assert redis_client.smembers(neo_api.PHA_SET_KEY) == {b'1'}
+    assert not redis_client.exists(neo_api.INDEX_LOCK_KEY)
+
+def test_failed_rebuild_keeps_the_previous_index(client, api, redis_client):
+    run(client.index_neos([neo('1', True)]))
+    redis_client.delete(neo_api.INDEX_READY_KEY)
+    api.queue.append((200, browse_page([neo('2', True)], total_pages=2), {}))
+    api.reply = lambda request: (404, {}, {})
+
+    run(neo_api.ensure_neo_index(client))
+    assert redis_client.smembers(neo_api.PHA_SET_KEY) == {b'1'}
+    assert not redis_client.exists(neo_api.INDEX_READY_KEY)
+    assert not redis_client.exists(neo_api.INDEX_LOCK_KEY)
+
+def test_ready_index_is_not_rebuilt(client, api, redis_client):
+    redis_client.set(neo_api.INDEX_READY_KEY, b'1')
+    run(neo_api.ensure_neo_index(client))
+    assert api.api_calls() == []
+
+def test_callers_keep_the_old_index_while_another_rebuilds(client, api, redis_client):
+    run(client.index_neos([neo('1', True)]))
+    redis_client.delete(neo_api.INDEX_READY_KEY)
+    redis_client.set(neo_api.INDEX_LOCK_KEY, b'1', ex=60)
+
+    assert [record['id'] for record in run(neo_api.get_potentially_hazardous_asteroids())] == ['1']
+    assert api.api_calls() == []
+
+
+def test_health_check_probes_redis_and_the_api(client, api, monkeypatch):
+    monkeypatch.delenv('NASA_API_KEY', raising=False)
+    health = asyncio.run(neo_api.check_api_health(client))
+
+    assert health['redis_connected'] and health['api_reachable']
+    assert not health['api_key_configured']
+    assert health['rate_limit_remaining'] == 1000
+    assert [method for method, _, _ in api.requests] == ['HEAD']
+
+def test_health_check_reports_an_unreachable_api(client, api):
+    api.reply = lambda request: (503, {}, {})
+    health = asyncio.run(neo_api.check_api_health(client))
+    assert health['redis_connected'] and not health['api_reachable']
+
+
+@pytest.fixture
+def l1(monkeypatch):
+    cache = OrderedDict()
+    monkeypatch.setattr(NASANEOClient, '_l1', cache)
+    monkeypatch.setattr(neo_api, 'L1_MAX_ENTRIES', 2)
+    return cache
+
+def test_l1_evicts_the_least_recently_used_entry(l1):
+    client = NASANEOClient()
+    client._l1_set('a', b'1', 60)
+    client._l1_set('b', b'2', 60)
+    assert client._l1_get('a') == b'1'
+    client._l1_set('c', b'3', 60)
+
+    assert client._l1_get('b') is None
+    assert client._l1_get('a') == b'1'
+    assert client._l1_get('c') == b'3'
+
+def test_l1_drops_expired_entries(l1):
+    client = NASANEOClient()
+    client._l1_set('a', b'1', -1)
+    assert client._l1_get('a') is None
+    assert 'a' not in l1
+
+def test_repeat_requests_are_served_from_l1_as_separate_objects(client, api, redis_client):
+    async def twice():
+        return await client.get_neo_stats(), await client.get_neo_stats()
+
+    first, second = run(twice())
+    assert first == second == {'ok': True}
+    assert first is not second
+    assert len(api.api_calls()) == 1
+
+    # A later caller in this process skips Redis too
+    redis_client.flushdb()
+    assert run(client.get_neo_stats()) == {'ok': True}
+    assert len(api.api_calls()) == 1
+
+# Event loops
+
+def test_each_event_loop_gets_its_own_redis_pool(client):
+    async def ping():
+        redis_conn = client.redis_conn
+        return await redis_conn.ping(), redis_conn
+
+    first_ok, first = asyncio.run(ping())
+    second_ok, second = asyncio.run(ping())
+    assert first_ok and second_ok
+    assert first is not second
+
+def test_requests_work_on_successive_event_loops(client, api):
+    # Nothing bound to the first loop (session, Redis pool, L1 locks) may be reused on the second
+    assert asyncio.run(client.get_neo_lookup('1')) == {'ok': True}
+    assert asyncio.run(client.get_neo_lookup('2')) == {'ok': True}
+    assert len(api.api_calls()) == 2
+
+def test_aimd_limiter_serves_successive_event_loops():
+    limiter = neo_api.AIMDLimiter(initial=1, maximum=1)
+
+    async def contend():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        await limiter.release(0.1, False)
+        await asyncio.wait_for(waiter, 1)
+        await limiter.release(0.1, False)
+
+    asyncio.run(contend())
+    asyncio.run(contend())